@@ -7,7 +7,10 @@ import sys
 import os
 import argparse
 
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Only needed when run as a file (python agents/main.py); under
+# `python -m agents.main` the project root is already importable.
+if __package__ in (None, ""):
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from agents.utils.logger import get_logger, PhaseLogger
 from agents.utils.config import load_config
@@ -17,24 +20,36 @@ from agents.supervisor import get_supervisor
 
 logger = get_logger(__name__, "MAIN")
 
+_RULE = "=" * 60
+_EXIT_COMMANDS = frozenset({"exit", "quit", "q"})
+_THREAD_RULE = "  " + "─" * 50
+
+# Interactive-mode banner, assembled once and written in a single call
+_BANNER = "\n".join([
+    "",
+    _RULE,
+    "🤖 Engineering Intelligence Agent",
+    _RULE,
+    "Ask questions about your engineering organization.",
+    "Conversations are remembered within a thread.",
+    "",
+    "Commands:",
+    "  /new [title]   — Start a new conversation thread",
+    "  /threads       — List all threads",
+    "  /switch <id>   — Switch to a different thread",
+    "  /thread        — Show current thread info",
+    "  /delete <id>   — Delete a thread",
+    "  help           — Show example queries",
+    "  exit / quit    — End session",
+    _RULE,
+    "",
+    "",
+])
+
 
 def run_interactive():
     """Run the agent in interactive CLI mode with conversation memory."""
-    print("\n" + "=" * 60)
-    print("🤖 Engineering Intelligence Agent")
-    print("=" * 60)
-    print("Ask questions about your engineering organization.")
-    print("Conversations are remembered within a thread.")
-    print()
-    print("Commands:")
-    print("  /new [title]   — Start a new conversation thread")
-    print("  /threads       — List all threads")
-    print("  /switch <id>   — Switch to a different thread")
-    print("  /thread        — Show current thread info")
-    print("  /delete <id>   — Delete a thread")
-    print("  help           — Show example queries")
-    print("  exit / quit    — End session")
-    print("=" * 60 + "\n")
+    sys.stdout.write(_BANNER)
     
     supervisor = get_supervisor()
     supervisor.initialize()
@@ -50,7 +65,7 @@ def run_interactive():
             if not user_input:
                 continue
             
-            if user_input.lower() in ['exit', 'quit', 'q']:
+            if user_input.lower() in _EXIT_COMMANDS:
                 print("\n👋 Goodbye!")
                 break
             
@@ -104,15 +119,15 @@ def _handle_slash_command(cmd: str, supervisor, current_thread_id: str) -> str:
         if not threads:
             print("  (no threads)")
         else:
-            print("\n  💬 Conversation Threads:")
-            print("  " + "─" * 50)
+            lines = ["", "  💬 Conversation Threads:", _THREAD_RULE]
             for t in threads:
                 marker = " ◀" if t["thread_id"] == current_thread_id else ""
-                print(
+                lines.append(
                     f"  {t['thread_id']}  │  {t['title']:<24}  │  "
                     f"msgs: {t['message_count']}{marker}"
                 )
-            print("  " + "─" * 50)
+            lines.append(_THREAD_RULE)
+            print("\n".join(lines))
         return current_thread_id
 
     elif command == "/switch":
@@ -16,20 +16,31 @@ Uses ClickHouse for metrics, PostgreSQL for developer/project context.
 
 from __future__ import annotations
 
-import json
 from typing import TypedDict, Optional, Any
 
 from langchain_core.messages import SystemMessage, HumanMessage
 from langchain_openai import ChatOpenAI
-from langgraph.graph import StateGraph, END
+from langgraph.graph import StateGraph, END, START
 
 from agents.utils.logger import get_logger, log_llm_call
 from agents.utils.config import get_config
 from agents.utils.db_clients import get_clickhouse_client, get_postgres_client
 from agents.utils.model_router import get_llm
+from agents.utils.serialization import (
+    to_toon, TOON_LEGEND, parse_json_array, parse_json_object,
+)
 
 logger = get_logger(__name__, "ANOMALY_PIPELINE")
 
+_DETECT_SYSTEM = SystemMessage(content="You detect anomalies in engineering metrics.")
+_INVESTIGATE_SYSTEM = SystemMessage(content="You investigate root causes of engineering anomalies.")
+_ALERT_SYSTEM = SystemMessage(content="You write clear, actionable engineering alerts.")
+_REFINE_SYSTEM = SystemMessage(content="Improve the alert based on feedback.")
+
+# Severity rank and badge used by the alert node
+_SEVERITY_RANK = {"critical": 4, "high": 3, "medium": 2, "low": 1}
+_SEVERITY_EMOJI = {"critical": "🔴", "high": "🟠", "medium": "🟡", "low": "🟢"}
+
 MAX_REFINE_RETRIES = 2
 
 
@@ -40,10 +51,7 @@ def _get_pipeline_llm(temperature: float = 0.2):
 
 def _get_current_model_name() -> str:
     """Get the current model name for logging purposes."""
-    config = get_config()
-    if config.llm_provider == "openai":
-        return config.openai.model
-    return config.featherless.model_primary
+    return get_config().primary_model
 
 
 # ============================================================================
@@ -82,9 +90,11 @@ def fetch_current_node(state: AnomalyState) -> dict:
         days = int(state["days_current"])
         proj = state.get("project_id")
 
-        where = f"WHERE date >= today() - {days}"
+        params = {"days": days}
+        where = "WHERE date >= today() - {days:UInt32}"
         if proj and proj.lower() != "string":
-            where += f" AND project_id = '{proj}'"
+            where += " AND project_id = {proj:String}"
+            params["proj"] = proj
 
         # DORA-style aggregate
         dora_q = f"""
@@ -101,42 +111,53 @@ def fetch_current_node(state: AnomalyState) -> dict:
             GROUP BY project_id
             ORDER BY deployments DESC
         """
-        dora_rows = ch.execute_query(dora_q)
+        dora_rows = ch.execute_query(dora_q, params)
 
         # Event counts by type
-        evt_where = f"WHERE timestamp >= now() - INTERVAL {days} DAY"
+        evt_where = "WHERE timestamp >= now() - INTERVAL {days:UInt32} DAY"
         if proj and proj.lower() != "string":
-            evt_where += f" AND project_id = '{proj}'"
+            evt_where += " AND project_id = {proj:String}"
 
-        evt_q = f"""
+        # Per-project and per-developer activity from a single scan of events:
+        # ARRAY JOIN fans each row out to a ('project', id) and an ('actor', id)
+        # key, and one GROUP BY aggregates both breakdowns.
+        activity_q = f"""
             SELECT
-                project_id,
+                dim.1 AS dimension,
+                dim.2 AS dim_key,
+                count() AS total_events,
                 countIf(event_type='commit') AS commits,
                 countIf(event_type='pr_merged') AS prs_merged,
                 countIf(event_type='pr_reviewed') AS prs_reviewed,
                 countIf(event_type='deploy') AS deploys,
-                count() AS total_events,
-                uniq(actor_id) AS unique_contributors
-            FROM events
-            {evt_where}
-            GROUP BY project_id
-        """
-        evt_rows = ch.execute_query(evt_q)
-
-        # Developer-level activity
-        dev_q = f"""
-            SELECT
-                actor_id,
-                count() AS total_events,
-                countIf(event_type='commit') AS commits,
-                countIf(event_type='deploy') AS deploys,
+                uniq(actor_id) AS unique_contributors,
                 groupUniqArray(project_id) AS projects
             FROM events
+            ARRAY JOIN [('project', project_id), ('actor', actor_id)] AS dim
             {evt_where}
-            GROUP BY actor_id
+            GROUP BY dimension, dim_key
             ORDER BY total_events DESC
         """
-        dev_rows = ch.execute_query(dev_q)
+        evt_rows, dev_rows = [], []
+        for r in ch.execute_query(activity_q, params):
+            if r["dimension"] == "project":
+                evt_rows.append({
+                    "project_id": r["dim_key"],
+                    "commits": r["commits"],
+                    "prs_merged": r["prs_merged"],
+                    "prs_reviewed": r["prs_reviewed"],
+                    "deploys": r["deploys"],
+                    "total_events": r["total_events"],
+                    "unique_contributors": r["unique_contributors"],
+                })
+            else:
+                dev_rows.append({
+                    "actor_id": r["dim_key"],
+                    "total_events": r["total_events"],
+                    "commits": r["commits"],
+                    "deploys": r["deploys"],
+                    "projects": r["projects"],
+                })
 
         current = {
             "period_days": days,
@@ -150,7 +171,9 @@ def fetch_current_node(state: AnomalyState) -> dict:
 
     except Exception as e:
         logger.error(f"Failed to fetch current metrics: {e}")
-        return {"current_metrics": {"error": str(e)}, "status": "error"}
+        # No "status" write here: this node runs in parallel with
+        # fetch_baseline, and detect checks both payloads for "error"
+        return {"current_metrics": {"error": str(e)}}
 
 
 # ============================================================================
@@ -166,9 +189,11 @@ def fetch_baseline_node(state: AnomalyState) -> dict:
         days = int(state["days_baseline"])
         proj = state.get("project_id")
 
-        where = f"WHERE date >= today() - {days}"
+        params = {"days": days}
+        where = "WHERE date >= today() - {days:UInt32}"
         if proj and proj.lower() != "string":
-            where += f" AND project_id = '{proj}'"
+            where += " AND project_id = {proj:String}"
+            params["proj"] = proj
 
         # Per-project weekly averages as baseline
         baseline_q = f"""
@@ -187,24 +212,24 @@ def fetch_baseline_node(state: AnomalyState) -> dict:
             {where}
             GROUP BY project_id
         """
-        rows = ch.execute_query(baseline_q)
+        rows = ch.execute_query(baseline_q, params)
 
         # Developer baseline
-        evt_where = f"WHERE timestamp >= now() - INTERVAL {days} DAY"
+        evt_where = "WHERE timestamp >= now() - INTERVAL {days:UInt32} DAY"
         if proj and proj.lower() != "string":
-            evt_where += f" AND project_id = '{proj}'"
+            evt_where += " AND project_id = {proj:String}"
 
         dev_base_q = f"""
             SELECT
                 actor_id,
-                count() / {days} * 7 AS avg_weekly_events,
-                countIf(event_type='commit') / {days} * 7 AS avg_weekly_commits,
-                countIf(event_type='deploy') / {days} * 7 AS avg_weekly_deploys
+                count() / {{days:UInt32}} * 7 AS avg_weekly_events,
+                countIf(event_type='commit') / {{days:UInt32}} * 7 AS avg_weekly_commits,
+                countIf(event_type='deploy') / {{days:UInt32}} * 7 AS avg_weekly_deploys
             FROM events
             {evt_where}
             GROUP BY actor_id
         """
-        dev_rows = ch.execute_query(dev_base_q)
+        dev_rows = ch.execute_query(dev_base_q, params)
 
         baseline = {
             "period_days": days,
@@ -216,7 +241,7 @@ def fetch_baseline_node(state: AnomalyState) -> dict:
 
     except Exception as e:
         logger.error(f"Failed to fetch baseline: {e}")
-        return {"baseline_metrics": {"error": str(e)}, "status": "error"}
+        return {"baseline_metrics": {"error": str(e)}}
 
 
 # ============================================================================
@@ -227,7 +252,7 @@ def detect_anomalies_node(state: AnomalyState) -> dict:
     """Use LLM to compare current vs baseline and identify anomalies."""
     logger.info("Detecting anomalies via LLM reasoning...")
 
-    if state.get("status") == "error":
+    if "error" in state["current_metrics"] or "error" in state["baseline_metrics"]:
         return {"anomalies": [], "status": "error"}
 
     llm = _get_pipeline_llm(temperature=0.2)
@@ -237,11 +262,13 @@ def detect_anomalies_node(state: AnomalyState) -> dict:
 Compare the CURRENT metrics (last {state['days_current']} days) against the BASELINE (last {state['days_baseline']} days).
 Identify any significant anomalies — deviations that suggest problems or noteworthy changes.
 
+{TOON_LEGEND}
+
 CURRENT METRICS:
-{json.dumps(state['current_metrics'], indent=2, default=str)[:3000]}
+{to_toon(state['current_metrics'])[:3000]}
 
 BASELINE METRICS:
-{json.dumps(state['baseline_metrics'], indent=2, default=str)[:3000]}
+{to_toon(state['baseline_metrics'])[:3000]}
 
 For each anomaly found, provide:
 1. metric_name: Which metric is anomalous
@@ -258,17 +285,21 @@ IMPORTANT: Return ONLY the JSON array, no other text.
 
     try:
         log_llm_call(logger, _get_current_model_name(), prompt_preview=prompt[:200])
-        response = llm.invoke([SystemMessage(content="You detect anomalies in engineering metrics."),
+        response = llm.invoke([_DETECT_SYSTEM,
                                HumanMessage(content=prompt)])
         text = response.content.strip()
         
         # Parse JSON
-        anomalies = _parse_json_array(text)
+        anomalies = parse_json_array(text)
         
         status = "anomalies_found" if anomalies else "ok"
         logger.info(f"Anomaly detection complete: {len(anomalies)} anomalies found")
+        # Per-anomaly detail at DEBUG; the count above is the INFO summary
         for a in anomalies:
-            logger.info(f"  🔴 {a.get('severity', '?').upper()}: {a.get('description', 'Unknown')[:80]}")
+            logger.debug(
+                "  🔴 %s: %.80s",
+                str(a.get("severity", "?")).upper(), a.get("description", "Unknown"),
+            )
 
         return {"anomalies": anomalies, "status": status}
 
@@ -320,18 +351,19 @@ def investigate_node(state: AnomalyState) -> dict:
     llm = _get_pipeline_llm(temperature=0.3)
 
     prompt = f"""You are an engineering root cause investigator.
+{TOON_LEGEND}
 
 ANOMALIES DETECTED:
-{json.dumps(anomalies, indent=2, default=str)[:2000]}
+{to_toon(anomalies)[:2000]}
 
 DEVELOPER CONTEXT (active employees with assignments):
-{json.dumps(dev_context, indent=2, default=str)[:2000]}
+{to_toon(dev_context)[:2000]}
 
 PROJECT CONTEXT:
-{json.dumps(project_context, indent=2, default=str)[:1500]}
+{to_toon(project_context)[:1500]}
 
 DEVELOPER ACTIVITY (current period):
-{json.dumps(state['current_metrics'].get('developer_activity', []), indent=2, default=str)[:1500]}
+{to_toon(state['current_metrics'].get('developer_activity', []))[:1500]}
 
 For each anomaly, investigate the root cause:
 1. Cross-reference the metrics with developer assignments and activity
@@ -345,7 +377,7 @@ Be specific — name developers, projects, and teams when relevant.
     try:
         log_llm_call(logger, _get_current_model_name(), prompt_preview=prompt[:200])
         response = llm.invoke([
-            SystemMessage(content="You investigate root causes of engineering anomalies."),
+            _INVESTIGATE_SYSTEM,
             HumanMessage(content=prompt),
         ])
         investigation = response.content.strip()
@@ -370,15 +402,17 @@ def generate_alert_node(state: AnomalyState) -> dict:
     llm = _get_pipeline_llm(temperature=0.4)
 
     # Determine overall severity
-    severities = [a.get("severity", "low") for a in anomalies]
-    severity_order = {"critical": 4, "high": 3, "medium": 2, "low": 1}
-    max_sev = max(severities, key=lambda s: severity_order.get(s, 0))
-    sev_emoji = {"critical": "🔴", "high": "🟠", "medium": "🟡", "low": "🟢"}.get(max_sev, "⚪")
+    max_sev = max(
+        (a.get("severity", "low") for a in anomalies),
+        key=lambda s: _SEVERITY_RANK.get(s, 0),
+    )
+    sev_emoji = _SEVERITY_EMOJI.get(max_sev, "⚪")
 
     prompt = f"""Generate a professional engineering anomaly alert.
+{TOON_LEGEND}
 
 ANOMALIES:
-{json.dumps(anomalies, indent=2, default=str)[:2000]}
+{to_toon(anomalies)[:2000]}
 
 ROOT CAUSE INVESTIGATION:
 {state.get('investigation', 'Not available')[:2000]}
@@ -397,7 +431,7 @@ Keep it concise but actionable. Max 500 words.
     try:
         log_llm_call(logger, _get_current_model_name(), prompt_preview=prompt[:200])
         response = llm.invoke([
-            SystemMessage(content="You write clear, actionable engineering alerts."),
+            _ALERT_SYSTEM,
             HumanMessage(content=prompt),
         ])
         alert = response.content.strip()
@@ -422,12 +456,13 @@ def evaluate_alert_node(state: AnomalyState) -> dict:
     llm = _get_pipeline_llm(temperature=0.1)
 
     prompt = f"""Evaluate this engineering alert for quality.
+{TOON_LEGEND}
 
 ALERT:
 {alert[:2000]}
 
 ANOMALIES IT SHOULD COVER:
-{json.dumps(state.get('anomalies', []), indent=2, default=str)[:1000]}
+{to_toon(state.get('anomalies', []))[:1000]}
 
 Score from 0.0 to 1.0 on these criteria:
 - Completeness: Does it cover all anomalies?
@@ -444,7 +479,7 @@ Respond with ONLY a JSON object:
         response = llm.invoke([HumanMessage(content=prompt)])
         text = response.content.strip()
 
-        parsed = _parse_json_object(text)
+        parsed = parse_json_object(text)
         score = float(parsed.get("score", 0.5))
         feedback = parsed.get("feedback", "No feedback")
 
@@ -467,6 +502,7 @@ def refine_alert_node(state: AnomalyState) -> dict:
     llm = _get_pipeline_llm(temperature=0.4)
 
     prompt = f"""Improve this engineering alert based on the feedback.
+{TOON_LEGEND}
 
 CURRENT ALERT:
 {state.get('alert_text', '')[:2000]}
@@ -475,7 +511,7 @@ QUALITY FEEDBACK:
 {state.get('quality_feedback', 'No specific feedback')}
 
 ANOMALIES:
-{json.dumps(state.get('anomalies', []), indent=2, default=str)[:1500]}
+{to_toon(state.get('anomalies', []))[:1500]}
 
 INVESTIGATION:
 {state.get('investigation', '')[:1500]}
@@ -486,7 +522,7 @@ Address the feedback and improve the alert. Keep max 500 words.
     try:
         log_llm_call(logger, _get_current_model_name(), prompt_preview=prompt[:200])
         response = llm.invoke([
-            SystemMessage(content="Improve the alert based on feedback."),
+            _REFINE_SYSTEM,
             HumanMessage(content=prompt),
         ])
         refined = response.content.strip()
@@ -547,10 +583,12 @@ def get_anomaly_graph():
     workflow.add_node("evaluate", evaluate_alert_node)
     workflow.add_node("refine", refine_alert_node)
 
-    # Flow
-    workflow.set_entry_point("fetch_current")
-    workflow.add_edge("fetch_current", "fetch_baseline")
-    workflow.add_edge("fetch_baseline", "detect")
+    # Flow: the two ClickHouse fetches are independent, so fan them out and
+    # join before detection
+    fetch_nodes = ["fetch_current", "fetch_baseline"]
+    workflow.add_edge(START, "fetch_current")
+    workflow.add_edge(START, "fetch_baseline")
+    workflow.add_edge(fetch_nodes, "detect")
     workflow.add_conditional_edges("detect", route_after_detection, {
         "investigate": "investigate",
         "done": END,
@@ -641,56 +679,3 @@ def _safe_serialise(rows: list) -> list:
                 clean[k] = v
         out.append(clean)
     return out
-
-
-def _parse_json_array(text: str) -> list:
-    """Extract a JSON array from LLM output."""
-    text = text.strip()
-    # Try direct parse
-    try:
-        result = json.loads(text)
-        if isinstance(result, list):
-            return result
-    except json.JSONDecodeError:
-        pass
-    # Try to find JSON in markdown code block
-    import re
-    match = re.search(r"```(?:json)?\s*(\[.*?\])\s*```", text, re.DOTALL)
-    if match:
-        try:
-            return json.loads(match.group(1))
-        except json.JSONDecodeError:
-            pass
-    # Try to find bare array
-    match = re.search(r"\[.*\]", text, re.DOTALL)
-    if match:
-        try:
-            return json.loads(match.group(0))
-        except json.JSONDecodeError:
-            pass
-    return []
-
-
-def _parse_json_object(text: str) -> dict:
-    """Extract a JSON object from LLM output."""
-    text = text.strip()
-    try:
-        result = json.loads(text)
-        if isinstance(result, dict):
-            return result
-    except json.JSONDecodeError:
-        pass
-    import re
-    match = re.search(r"```(?:json)?\s*(\{.*?\})\s*```", text, re.DOTALL)
-    if match:
-        try:
-            return json.loads(match.group(1))
-        except json.JSONDecodeError:
-            pass
-    match = re.search(r"\{.*\}", text, re.DOTALL)
-    if match:
-        try:
-            return json.loads(match.group(0))
-        except json.JSONDecodeError:
-            pass
-    return {}
@@ -10,9 +10,10 @@ Includes:
 
 from __future__ import annotations
 
-import json
+from concurrent.futures import ThreadPoolExecutor
+from operator import itemgetter
 from typing import List, Dict, Any, Optional
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 
 from langchain_core.messages import SystemMessage, HumanMessage
 from langchain_openai import ChatOpenAI
@@ -21,9 +22,12 @@ from agents.utils.logger import get_logger, log_llm_call
 from agents.utils.config import get_config
 from agents.utils.db_clients import get_postgres_client, get_clickhouse_client
 from agents.utils.model_router import get_llm
+from agents.utils.serialization import to_json, parse_json_object
 
 logger = get_logger(__name__, "EXECUTIVE_PIPELINE")
 
+_REPORT_SYSTEM = SystemMessage(content="You generate structured JSON executive reports.")
+
 _REPORT_MODEL = "gpt-4-turbo"  # Use high-quality model for executive text
 
 # ============================================================================
@@ -48,8 +52,11 @@ def generate_weekly_report(team_id: Optional[int] = None, days_back: int = 7) ->
     pg = get_postgres_client()
     ch = get_clickhouse_client()
     
+    # Window bound server-side so the query text is identical across calls
+    params = {"days": days_back}
+
     # DORA Metrics (Current period)
-    dora_q = f"""
+    dora_q = """
         SELECT 
             sum(sub_deployments) as total_deploys,
             avg(sub_lead_time) as avg_lead_time,
@@ -63,29 +70,36 @@ def generate_weekly_report(team_id: Optional[int] = None, days_back: int = 7) ->
                 sum(failed_deployments) as sub_failed,
                 sum(failed_deployments) / greatest(sum(deployments), 1) as sub_rate
             FROM dora_daily_metrics
-            WHERE date >= today() - {days_back}
+            WHERE date >= today() - {days:UInt32}
             GROUP BY project_id
         )
     """
-    dora_metrics = ch.execute_query(dora_q)
     
     # Activity Trends (vs previous period)
-    activity_q = f"""
+    activity_q = """
         SELECT 
             count() as total_events,
-            countIf(timestamp < now() - INTERVAL {days_back} DAY) as prev_period_events,
-            countIf(timestamp >= now() - INTERVAL {days_back} DAY) as curr_period_events
+            countIf(timestamp < now() - INTERVAL {days:UInt32} DAY) as prev_period_events,
+            countIf(timestamp >= now() - INTERVAL {days:UInt32} DAY) as curr_period_events
         FROM events
-        WHERE timestamp >= now() - INTERVAL {days_back * 2} DAY
+        WHERE timestamp >= now() - toIntervalDay({days:UInt32} * 2)
     """
-    activity_trends = ch.execute_query(activity_q)
     
     # Project Statuses
-    projects = pg.execute_query("""
+    projects_q = """
         SELECT name, status, priority, target_date 
         FROM projects 
         WHERE status IN ('active', 'in_progress', 'delayed')
-    """)
+    """
+
+    # The three reads are independent network round-trips; overlap them
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        dora_future = pool.submit(ch.execute_query, dora_q, params)
+        activity_future = pool.submit(ch.execute_query, activity_q, params)
+        projects_future = pool.submit(pg.execute_query, projects_q)
+        dora_metrics = dora_future.result()
+        activity_trends = activity_future.result()
+        projects = projects_future.result()
     
     # 2. Synthesize with LLM
     llm = get_llm(temperature=0.4)
@@ -94,9 +108,9 @@ def generate_weekly_report(team_id: Optional[int] = None, days_back: int = 7) ->
     
     DATA CONTEXT:
     - Period: Last {days_back} days
-    - DORA Metrics: {json.dumps(dora_metrics, default=str)}
-    - Activity Trends: {json.dumps(activity_trends, default=str)}
-    - Active Projects: {json.dumps(projects, default=str)}
+    - DORA Metrics: {to_json(dora_metrics)}
+    - Activity Trends: {to_json(activity_trends)}
+    - Active Projects: {to_json(projects)}
     
     OUTPUT FORMAT (JSON):
     {{
@@ -110,18 +124,12 @@ def generate_weekly_report(team_id: Optional[int] = None, days_back: int = 7) ->
     
     try:
         response = llm.invoke([
-            SystemMessage(content="You generate structured JSON executive reports."),
+            _REPORT_SYSTEM,
             HumanMessage(content=prompt)
         ])
-        content = response.content.strip()
-        
-        # Clean markdown code blocks if present
-        if content.startswith("```json"):
-            content = content[7:-3].strip()
-        elif content.startswith("```"):
-            content = content[3:-3].strip()
-            
-        report = json.loads(content)
+        report = parse_json_object(response.content)
+        if not report:
+            raise ValueError("LLM response contained no JSON object")
         
         # Add raw metrics for UI
         report["metrics"] = {
@@ -170,7 +178,9 @@ def calculate_risk_scores(project_ids: Optional[List[str]] = None) -> List[Dict[
     else:
         projects = pg.execute_query(query)
         
+    fails_by_project = _recent_failures(ch, projects)
     results = []
+    today = datetime.now().date()  # loop-invariant: one clock read per run
     
     for p in projects:
         score = 0  # 0 = Low Risk, 100 = Critical Risk (Inverted from user prompt? User screenshot shows 85/100 as High Risk)
@@ -182,9 +192,12 @@ def calculate_risk_scores(project_ids: Optional[List[str]] = None) -> List[Dict[
         target = p.get("target_date")
         if target:
             if isinstance(target, str):
-                target = datetime.fromisoformat(target).date()
+                # Only the calendar date matters: parse the YYYY-MM-DD prefix
+                # directly (works for date and datetime strings, with or
+                # without a trailing 'Z') rather than building a datetime first
+                target = date.fromisoformat(target[:10])
             
-            days_left = (target - datetime.now().date()).days
+            days_left = (target - today).days
             if days_left < 7:
                 score += 40
                 drivers.append("Approaching Deadline")
@@ -196,28 +209,14 @@ def calculate_risk_scores(project_ids: Optional[List[str]] = None) -> List[Dict[
                 drivers.append("Overdue")
                 
         # 2. Quality Risk (ClickHouse)
-        # Check failed deployments in last 7 days using ID or Name
-        # Note: ClickHouse project_id might be UUID string or slug
-        proj_id_str = str(p['id'])
-        proj_name_str = p['name']
-        
-        fail_q = f"""
-            SELECT sum(failed_deployments) as fails 
-            FROM dora_daily_metrics 
-            WHERE (project_id = '{proj_name_str}' OR project_id = '{proj_id_str}') 
-              AND date >= today() - 7
-        """
-        try:
-            fails = ch.execute_query(fail_q)
-            fail_count = fails[0]['fails'] if fails else 0
-            if fail_count > 2:
-                score += 30
-                drivers.append("High Failure Rate")
-            elif fail_count > 0:
-                score += 10
-        except Exception as e:
-            logger.warning(f"Risk metric fetch failed for {proj_name_str}: {e}")
-            pass
+        # Failed deployments in last 7 days; ClickHouse project_id may be the
+        # UUID string or the project name (slug)
+        fail_count = sum(fails_by_project.get(k, 0) for k in {str(p["id"]), p["name"]})
+        if fail_count > 2:
+            score += 30
+            drivers.append("High Failure Rate")
+        elif fail_count > 0:
+            score += 10
             
         # 3. Budget Risk
         budget = p.get("budget_amount")
@@ -253,10 +252,33 @@ def calculate_risk_scores(project_ids: Optional[List[str]] = None) -> List[Dict[
         })
         
     # Sort by risk desc
-    results.sort(key=lambda x: x["risk_score"], reverse=True)
+    results.sort(key=itemgetter("risk_score"), reverse=True)
     return results
 
 
+def _recent_failures(ch, projects: List[Dict[str, Any]]) -> Dict[str, int]:
+    """
+    Failed deployments over the last 7 days for every project, keyed by
+    ClickHouse project_id, fetched in one grouped query.
+    """
+    keys = {str(p["id"]) for p in projects} | {p["name"] for p in projects}
+    if not keys:
+        return {}
+    fail_q = """
+        SELECT project_id, sum(failed_deployments) AS fails
+        FROM dora_daily_metrics
+        WHERE project_id IN {keys:Array(String)}
+          AND date >= today() - 7
+        GROUP BY project_id
+    """
+    try:
+        rows = ch.execute_query(fail_q, {"keys": sorted(keys)})
+    except Exception as e:
+        logger.warning(f"Risk metric fetch failed: {e}")
+        return {}
+    return {r["project_id"]: int(r["fails"] or 0) for r in rows}
+
+
 # ============================================================================
 # 3. Strategic Recommendations
 # ============================================================================
@@ -277,7 +299,7 @@ def generate_recommendations() -> List[Dict[str, str]]:
     recs = []
     
     if overworked:
-        names = ", ".join([r["name"] for r in overworked])
+        names = ", ".join(r["name"] for r in overworked)
         recs.append({
             "title": "Rebalance Workload",
             "type": "Resource",
@@ -25,7 +25,7 @@ Public API:
 
 from __future__ import annotations
 
-import json
+import heapq
 import re
 import uuid
 from typing import TypedDict, List, Dict, Any, Optional
@@ -35,7 +35,7 @@ from langchain_openai import ChatOpenAI
 from langgraph.graph import StateGraph, END, START
 
 from agents.utils.logger import get_logger, log_llm_call
-from agents.utils.config import get_config
+from agents.utils.serialization import parse_json_array
 from agents.tools.embedding_tools import get_embedding, format_vector_for_pg
 from agents.utils.db_clients import get_postgres_client, get_neo4j_client
 
@@ -62,16 +62,6 @@ class GraphRAGState(TypedDict):
 # Helpers
 # ============================================================================
 
-_config_cache = None
-
-
-def _get_config():
-    global _config_cache
-    if _config_cache is None:
-        _config_cache = get_config()
-    return _config_cache
-
-
 def _get_llm(model_key: str = "model_primary", temperature: float = 0.3):
     """Create an LLM using the centralized get_llm helper."""
     from agents.utils.model_router import get_llm
@@ -189,6 +179,22 @@ _NEO4J_QUERIES = {
     """,
 }
 
+# Normalise a row of each query to a 0-1 graph score; looked up once per
+# query rather than branching on the query name for every row.
+_GRAPH_SCORERS = {
+    "expertise": lambda r: 0.95 if r.get("level") == "senior" else 0.7,
+    "contribution": lambda r: min(1.0, _safe_float(r.get("commits"), 1) / 50),
+    "collaboration": lambda r: _safe_float(r.get("strength"), 0.5),
+}
+
+
+_QUESTION_WRAPPERS = re.compile(
+    r"(?i)^(who\s+(can|should|could|knows?|is\s+an?\s+expert\s+(in|on|at|with))\s+)"
+    r"|^(find\s+me\s+(a|an|the)\s+)|^(help\s+me\s+with\s+)"
+    r"|^(expert\s+(in|on|for)\s+)"
+    r"|\?\s*$|\bhelp\b|\bwith\b|\babout\b|\bfor\b"
+)
+
 
 def _extract_topic_keywords(query: str) -> str:
     """
@@ -196,14 +202,7 @@ def _extract_topic_keywords(query: str) -> str:
     e.g. "Who can help with payment processing timeout?" → "payment processing"
     """
     # Strip common question wrappers
-    stripped = re.sub(
-        r"(?i)^(who\s+(can|should|could|knows?|is\s+an?\s+expert\s+(in|on|at|with))\s+)"
-        r"|^(find\s+me\s+(a|an|the)\s+)|^(help\s+me\s+with\s+)"
-        r"|^(expert\s+(in|on|for)\s+)"
-        r"|\?\s*$|\bhelp\b|\bwith\b|\babout\b|\bfor\b",
-        "",
-        query,
-    ).strip()
+    stripped = _QUESTION_WRAPPERS.sub("", query).strip()
     # Keep only meaningful words
     words = [w for w in stripped.split() if len(w) > 2]
     return " ".join(words[:4]) if words else query[:40]
@@ -261,50 +260,32 @@ def graph_search_node(state: GraphRAGState) -> dict:
     try:
         neo4j = get_neo4j_client()
 
-        # Quick check: do we have Developer nodes at all?
-        check = neo4j.execute_query("MATCH (n:Developer) RETURN count(n) AS c LIMIT 1")
-        has_graph = check and check[0].get("c", 0) > 0
-
-        if not has_graph:
-            logger.info("No Developer nodes in Neo4j — using synthetic graph data")
-            results = _synthetic_graph_results(query, limit * 2)
-            logger.info(f"✓ graph_search: {len(results)} synthetic results")
-            return {"graph_results": results}
+        # All expertise queries share one session. No separate "any Developer
+        # nodes?" probe: an empty graph simply yields no rows and falls back below.
+        batch = neo4j.execute_many(_NEO4J_QUERIES, {"topic": topic, "limit": limit})
 
-        # Real graph queries ─────────────────────────────────
         all_results: dict[str, dict] = {}
-
-        for qname, cypher in _NEO4J_QUERIES.items():
-            try:
-                rows = neo4j.execute_query(cypher, {"topic": topic, "limit": limit})
-                for r in rows:
-                    name = r.get("name", "")
-                    if not name:
-                        continue
-                    # Normalise a graph score 0-1
-                    if qname == "expertise":
-                        score = 0.95 if r.get("level") == "senior" else 0.7
-                    elif qname == "contribution":
-                        commits = _safe_float(r.get("commits"), 1)
-                        score = min(1.0, commits / 50)
-                    else:
-                        score = _safe_float(r.get("strength"), 0.5)
-
-                    # Keep best score per person
-                    if name not in all_results or score > all_results[name]["graph_score"]:
-                        all_results[name] = {
-                            "name": name,
-                            "graph_score": round(score, 4),
-                            "path": r.get("relationship", qname),
-                            "detail": _safe_serialise(dict(r)),
-                        }
-            except Exception as qe:
-                logger.debug(f"Graph query '{qname}' failed (ok): {qe}")
+        for qname, rows in batch.items():
+            score_row = _GRAPH_SCORERS[qname]
+            for r in rows:
+                name = r.get("name", "")
+                if not name:
+                    continue
+                score = score_row(r)
+
+                # Keep best score per person
+                if name not in all_results or score > all_results[name]["graph_score"]:
+                    all_results[name] = {
+                        "name": name,
+                        "graph_score": round(score, 4),
+                        "path": r.get("relationship", qname),
+                        "detail": _safe_serialise(dict(r)),
+                    }
 
         results = sorted(all_results.values(), key=lambda r: r["graph_score"], reverse=True)[:limit * 2]
 
         if not results:
-            logger.info("Real graph queries returned nothing — falling back to synthetic")
+            logger.info("Graph queries returned nothing — using synthetic graph data")
             results = _synthetic_graph_results(query, limit * 2)
 
         logger.info(f"✓ graph_search: {len(results)} results")
@@ -323,49 +304,40 @@ def graph_search_node(state: GraphRAGState) -> dict:
 VECTOR_WEIGHT = 0.6
 GRAPH_WEIGHT = 0.4
 
+_NO_HIT: dict = {}
+
 
 def fuse_and_rank_node(state: GraphRAGState) -> dict:
     """Combine vector similarity and graph relevance into a single ranked list."""
     limit = state.get("limit", 5)
     logger.info("▶ Starting: fuse_and_rank")
 
-    vec_by_name: dict[str, dict] = {}
-    for v in state.get("vector_results", []):
-        name = v.get("full_name", "")
-        if name:
-            vec_by_name[name] = v
-
-    graph_by_name: dict[str, dict] = {}
-    for g in state.get("graph_results", []):
-        name = g.get("name", "")
-        if name:
-            graph_by_name[name]= g
-
-    # Union of all candidate names
-    all_names = set(vec_by_name.keys()) | set(graph_by_name.keys())
+    vec_by_name = {v["full_name"]: v for v in state.get("vector_results", []) if v.get("full_name")}
+    graph_by_name = {g["name"]: g for g in state.get("graph_results", []) if g.get("name")}
 
+    # One pass over the union of candidates (vector hits first, then graph-only
+    # names), with a single lookup per source per candidate.
     fused: list[dict] = []
-    for name in all_names:
-        vec_score = _safe_float(vec_by_name.get(name, {}).get("similarity"), 0.0)
-        graph_score = _safe_float(graph_by_name.get(name, {}).get("graph_score"), 0.0)
-        combined = round(VECTOR_WEIGHT * vec_score + GRAPH_WEIGHT * graph_score, 4)
-
-        entry = {
+    append = fused.append
+    for name in {**vec_by_name, **graph_by_name}:
+        v = vec_by_name.get(name, _NO_HIT)
+        g = graph_by_name.get(name, _NO_HIT)
+        vec_score = _safe_float(v.get("similarity"), 0.0)
+        graph_score = _safe_float(g.get("graph_score"), 0.0)
+        append({
             "name": name,
             "vector_score": round(vec_score, 4),
             "graph_score": round(graph_score, 4),
-            "combined_score": combined,
+            "combined_score": round(VECTOR_WEIGHT * vec_score + GRAPH_WEIGHT * graph_score, 4),
             # Carry forward profile data from vector results if available
-            "title": vec_by_name.get(name, {}).get("title", ""),
-            "role": vec_by_name.get(name, {}).get("role", ""),
-            "team": vec_by_name.get(name, {}).get("team_name", ""),
-            "profile": vec_by_name.get(name, {}).get("profile_content", ""),
-            "graph_path": graph_by_name.get(name, {}).get("path", ""),
-        }
-        fused.append(entry)
+            "title": v.get("title", ""),
+            "role": v.get("role", ""),
+            "team": v.get("team_name", ""),
+            "profile": v.get("profile_content", ""),
+            "graph_path": g.get("path", ""),
+        })
 
-    fused.sort(key=lambda r: r["combined_score"], reverse=True)
-    fused = fused[:limit]
+    fused = heapq.nlargest(limit, fused, key=lambda r: r["combined_score"])
 
     logger.info(f"✓ fuse_and_rank: {len(fused)} candidates (top={fused[0]['combined_score'] if fused else 'N/A'})")
     return {"fused_ranking": fused}
@@ -375,26 +347,14 @@ def fuse_and_rank_node(state: GraphRAGState) -> dict:
 # Node 4 — Explain Recommendations  (LLM narration per candidate)
 # ============================================================================
 
-def explain_recommendations_node(state: GraphRAGState) -> dict:
-    """Have the LLM write a short explanation for each recommended expert."""
-    fused = state.get("fused_ranking", [])
-    query = state["query"]
-
-    if not fused:
-        return {"explanations": [], "status": "no_candidates"}
+_CANDIDATE_ENTRY = (
+    "  {rank}. **{name}** — {title} ({team})\n"
+    "     Vector similarity: {vector} | Graph relevance: {graph} | Combined: {combined}\n"
+    "     Graph path: {path}\n"
+    "     Profile: {profile}"
+)
 
-    logger.info("▶ Starting: explain_recommendations")
-
-    # Build a single prompt with all candidates for efficiency
-    candidate_block = "\n".join(
-        f"  {i+1}. **{c['name']}** — {c['title'] or 'Engineer'} ({c['team'] or 'N/A'})\n"
-        f"     Vector similarity: {c['vector_score']} | Graph relevance: {c['graph_score']} | Combined: {c['combined_score']}\n"
-        f"     Graph path: {c['graph_path'] or 'none'}\n"
-        f"     Profile: {(c.get('profile') or 'N/A')[:200]}"
-        for i, c in enumerate(fused)
-    )
-
-    prompt = f"""You are an engineering expert recommender.
+_EXPLAIN_PROMPT = """You are an engineering expert recommender.
 
 The user asked: "{query}"
 
@@ -402,7 +362,7 @@ Here are the top candidate experts, ranked by a fusion of semantic similarity
 (how well their profile matches the query) and graph relevance
 (their Neo4j relationships — expertise, contributions, collaborations):
 
-{candidate_block}
+{candidates}
 
 For EACH candidate write 2-3 sentences explaining **why** they are recommended
 for this query. Reference their skills, graph connections, or profile content.
@@ -414,6 +374,34 @@ Return a JSON array (no markdown fences, no extra text):
 ]
 """
 
+
+def explain_recommendations_node(state: GraphRAGState) -> dict:
+    """Have the LLM write a short explanation for each recommended expert."""
+    fused = state.get("fused_ranking", [])
+    query = state["query"]
+
+    if not fused:
+        return {"explanations": [], "status": "no_candidates"}
+
+    logger.info("▶ Starting: explain_recommendations")
+
+    # Build a single prompt with all candidates for efficiency
+    candidate_block = "\n".join(
+        _CANDIDATE_ENTRY.format(
+            rank=i,
+            name=c["name"],
+            title=c["title"] or "Engineer",
+            team=c["team"] or "N/A",
+            vector=c["vector_score"],
+            graph=c["graph_score"],
+            combined=c["combined_score"],
+            path=c["graph_path"] or "none",
+            profile=(c.get("profile") or "N/A")[:200],
+        )
+        for i, c in enumerate(fused, 1)
+    )
+    prompt = _EXPLAIN_PROMPT.format(query=query, candidates=candidate_block)
+
     try:
         llm = _get_llm("model_primary", temperature=0.3)
         log_llm_call(logger, model="model_primary", prompt_preview=f"explain {len(fused)} candidates")
@@ -421,7 +409,7 @@ Return a JSON array (no markdown fences, no extra text):
         text = resp.content.strip()
 
         # Parse JSON array
-        explanations = _parse_json_array(text)
+        explanations = parse_json_array(text)
 
         if not explanations:
             # Fallback: generate basic explanations
@@ -451,32 +439,6 @@ Return a JSON array (no markdown fences, no extra text):
         return {"explanations": enriched}
 
 
-def _parse_json_array(text: str) -> list:
-    """Robustly extract a JSON array from LLM output."""
-    # Try direct parse
-    text = text.strip()
-    if text.startswith("```"):
-        text = re.sub(r"^```\w*\n?", "", text)
-        text = re.sub(r"\n?```$", "", text)
-        text = text.strip()
-    try:
-        parsed = json.loads(text)
-        if isinstance(parsed, list):
-            return parsed
-    except json.JSONDecodeError:
-        pass
-
-    # Try to find [...] block
-    match = re.search(r"\[[\s\S]*\]", text)
-    if match:
-        try:
-            return json.loads(match.group())
-        except json.JSONDecodeError:
-            pass
-
-    return []
-
-
 # ============================================================================
 # Node 5 — Synthesize Final Report  (LLM summary)
 # ============================================================================
@@ -557,9 +519,11 @@ def get_graph_rag_graph():
     builder.add_node("explain_recommendations", explain_recommendations_node)
     builder.add_node("synthesize", synthesize_node)
 
+    # Vector (pgvector) and graph (Neo4j) retrieval are independent: run them
+    # in the same step and join at fusion
     builder.add_edge(START, "vector_search")
-    builder.add_edge("vector_search", "graph_search")
-    builder.add_edge("graph_search", "fuse_and_rank")
+    builder.add_edge(START, "graph_search")
+    builder.add_edge(["vector_search", "graph_search"], "fuse_and_rank")
     builder.add_edge("fuse_and_rank", "explain_recommendations")
     builder.add_edge("explain_recommendations", "synthesize")
     builder.add_edge("synthesize", END)
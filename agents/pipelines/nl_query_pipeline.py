@@ -13,7 +13,6 @@ Pipeline:
 
 from __future__ import annotations
 
-import json
 import re
 from typing import TypedDict, Optional, Any
 
@@ -24,9 +23,17 @@ from langgraph.graph import StateGraph, END
 from agents.utils.logger import get_logger, log_llm_call
 from agents.utils.config import get_config
 from agents.utils.db_clients import get_postgres_client, get_clickhouse_client
+from agents.utils.serialization import to_json, parse_json_object
 
 logger = get_logger(__name__, "NL_QUERY")
 
+_GENERATE_SYSTEM = {
+    lang: SystemMessage(content=f"You generate precise {lang.upper()} queries. Output ONLY the query in a code block.")
+    for lang in ("sql", "cypher")
+}
+_FIX_SYSTEM = SystemMessage(content="Fix the database query. Output ONLY the corrected query.")
+_SUMMARY_SYSTEM = SystemMessage(content="You create clear, data-driven executive summaries from database results.")
+
 
 # ============================================================================
 # Database Schema Context (embedded for prompt injection)
@@ -83,6 +90,22 @@ Relationships: (Developer)-[:WORKS_ON]->(Project),
 Note: Neo4j may have limited data — prefer PostgreSQL/ClickHouse.
 """
 
+# Per-database generation context: (schema, query language, dialect notes)
+_DB_CONTEXT = {
+    "clickhouse": (
+        CLICKHOUSE_SCHEMA, "sql",
+        "Use ClickHouse SQL syntax. Functions: countIf(), sumIf(), toDate(), now(), INTERVAL. No ILIKE — use lower() + LIKE.",
+    ),
+    "neo4j": (
+        NEO4J_SCHEMA, "cypher",
+        "Use Cypher query syntax. MATCH, WHERE, RETURN, ORDER BY, LIMIT.",
+    ),
+    "postgres": (
+        POSTGRES_SCHEMA, "sql",
+        "Use PostgreSQL syntax. Supports ILIKE, ARRAY_AGG, window functions. UUIDs are TEXT.",
+    ),
+}
+
 
 # ============================================================================
 # State
@@ -113,19 +136,31 @@ MAX_RETRIES = 3
 # ============================================================================
 
 def _get_llm(model_key: str = "primary", temperature: float = 0.0):
-    \"\"\"Create an LLM instance using the centralized get_llm helper.\"\"\"
+    """Create an LLM instance using the centralized get_llm helper."""
     from agents.utils.model_router import get_llm
     return get_llm(temperature=temperature)
 
 
+_FENCED_CODE = re.compile(r"```(?:sql|cypher|)?\s*\n?(.*?)```", re.DOTALL | re.IGNORECASE)
+_INLINE_CODE = re.compile(r"`([^`]+)`")
+_TABLE_REF = re.compile(r"(?:FROM|JOIN)\s+(\w+)", re.IGNORECASE)
+
+# Validation vocabularies, built once rather than on every validate call.
+# Whole-word matches, so columns like updated_at don't read as an UPDATE.
+_SQL_WRITE = re.compile(r"\b(?:DROP|DELETE|TRUNCATE|ALTER|INSERT|UPDATE)\b", re.IGNORECASE)
+_CYPHER_WRITE = re.compile(r"\b(?:DELETE|DETACH|REMOVE|SET)\b", re.IGNORECASE)
+_POSTGRES_TABLES = frozenset({"employees", "teams", "projects", "project_assignments", "embeddings"})
+_CLICKHOUSE_TABLES = frozenset({"events", "dora_daily_metrics"})
+
+
 def _extract_code_block(text: str) -> str:
     """Extract SQL/Cypher from markdown code blocks or raw text."""
     # Try ```sql ... ``` or ```cypher ... ``` or ``` ... ```
-    m = re.search(r"```(?:sql|cypher|)?\s*\n?(.*?)```", text, re.DOTALL | re.IGNORECASE)
+    m = _FENCED_CODE.search(text)
     if m:
         return m.group(1).strip()
     # Try single-line code
-    m = re.search(r"`([^`]+)`", text)
+    m = _INLINE_CODE.search(text)
     if m and len(m.group(1)) > 10:
         return m.group(1).strip()
     # Return the text after common prefixes
@@ -135,7 +170,11 @@ def _extract_code_block(text: str) -> str:
     return text.strip()
 
 
-def _safe_serialise(rows: list, max_rows: int = 50) -> list:
+# Rows of a generated query's result that are read and shown to the LLM
+_MAX_RESULT_ROWS = 50
+
+
+def _safe_serialise(rows: list, max_rows: int = _MAX_RESULT_ROWS) -> list:
     """Safely serialise query results for LLM consumption."""
     import math
     from datetime import datetime, date as date_type
@@ -159,11 +198,39 @@ def _safe_serialise(rows: list, max_rows: int = 50) -> list:
 # Node 1: Identify data sources
 # ============================================================================
 
+# Whole-word hint families, one per database. Word boundaries keep
+# "commitment"/"over-committed" or "prevent" from reading as event data.
+_KEYWORD_FAMILIES = {
+    "postgres": re.compile(
+        r"\b(?:employees?|teams?|projects?|allocations?|workloads?)\b", re.IGNORECASE,
+    ),
+    "clickhouse": re.compile(
+        r"\b(?:deploy(?:s|ed|ments?)?|commits?|events?|dora|metrics?|velocity|prs?)\b",
+        re.IGNORECASE,
+    ),
+    "neo4j": re.compile(
+        r"\b(?:collaborat(?:e|es|ed|ing|ion|ions|ors?)|graph|network)\b", re.IGNORECASE,
+    ),
+}
+
+
+def _keyword_route(question: str) -> Optional[str]:
+    """Return the target DB when exactly one keyword family matches, else None."""
+    matched = [db for db, pattern in _KEYWORD_FAMILIES.items() if pattern.search(question)]
+    return matched[0] if len(matched) == 1 else None
+
+
 def identify_sources_node(state: NLQueryState) -> dict:
     """Determine which database to query based on the question."""
     question = state["question"]
     logger.info(f"Identifying data source for: {question[:100]}")
 
+    # Unambiguous keyword match — no need to ask the router LLM
+    db = _keyword_route(question)
+    if db:
+        logger.info(f"Target DB: {db} (keyword match)")
+        return {"target_db": db, "db_reason": "Keyword match"}
+
     llm = _get_llm("fast", temperature=0.0)
 
     prompt = f"""You are a database routing expert. Given a natural language question, determine
@@ -185,7 +252,7 @@ Respond with ONLY a JSON object (no other text):
         response = llm.invoke([HumanMessage(content=prompt)])
         text = response.content.strip()
         # Parse JSON
-        data = _parse_json_object(text)
+        data = parse_json_object(text)
         db = data.get("database", "postgres").lower()
         if db not in ("postgres", "clickhouse", "neo4j"):
             db = "postgres"
@@ -194,12 +261,9 @@ Respond with ONLY a JSON object (no other text):
         return {"target_db": db, "db_reason": reason}
     except Exception as e:
         logger.error(f"Source identification failed: {e}")
-        # Heuristic fallback
-        q_lower = question.lower()
-        if any(w in q_lower for w in ["deploy", "commit", "event", "dora", "metric", "velocity", "pr "]):
+        # Heuristic fallback (reached only when keywords were absent or mixed)
+        if _KEYWORD_FAMILIES["clickhouse"].search(question):
             return {"target_db": "clickhouse", "db_reason": "Keyword match fallback"}
-        if any(w in q_lower for w in ["collaborat", "graph", "relationship", "network"]):
-            return {"target_db": "neo4j", "db_reason": "Keyword match fallback"}
         return {"target_db": "postgres", "db_reason": "Default fallback"}
 
 
@@ -214,18 +278,7 @@ def generate_query_node(state: NLQueryState) -> dict:
     logger.info(f"Generating query for {target_db}: {question[:80]}")
 
     # Select schema context
-    if target_db == "clickhouse":
-        schema = CLICKHOUSE_SCHEMA
-        query_lang = "sql"
-        db_notes = "Use ClickHouse SQL syntax. Functions: countIf(), sumIf(), toDate(), now(), INTERVAL. No ILIKE — use lower() + LIKE."
-    elif target_db == "neo4j":
-        schema = NEO4J_SCHEMA
-        query_lang = "cypher"
-        db_notes = "Use Cypher query syntax. MATCH, WHERE, RETURN, ORDER BY, LIMIT."
-    else:
-        schema = POSTGRES_SCHEMA
-        query_lang = "sql"
-        db_notes = "Use PostgreSQL syntax. Supports ILIKE, ARRAY_AGG, window functions. UUIDs are TEXT."
+    schema, query_lang, db_notes = _DB_CONTEXT.get(target_db, _DB_CONTEXT["postgres"])
 
     llm = _get_llm("primary", temperature=0.0)
 
@@ -249,7 +302,7 @@ Generate ONLY the query inside a code block. No explanation.
     try:
         log_llm_call(logger, "query-gen", prompt_preview=question[:100])
         response = llm.invoke([
-            SystemMessage(content=f"You generate precise {query_lang.upper()} queries. Output ONLY the query in a code block."),
+            _GENERATE_SYSTEM[query_lang],
             HumanMessage(content=prompt),
         ])
         query = _extract_code_block(response.content)
@@ -275,35 +328,33 @@ def validate_query_node(state: NLQueryState) -> dict:
 
     # Basic structural validation
     issues = []
-    q_upper = query.upper()
 
     if state.get("query_language") == "sql":
         # Check for dangerous operations
-        if any(kw in q_upper for kw in ["DROP", "DELETE", "TRUNCATE", "ALTER", "INSERT", "UPDATE"]):
+        if _SQL_WRITE.search(query):
             issues.append("Query contains destructive operations (DROP/DELETE/ALTER)")
 
         # Check table references against schema
         if target_db == "postgres":
-            valid_tables = {"employees", "teams", "projects", "project_assignments", "embeddings"}
             # Simple check: extract FROM/JOIN table names
-            table_refs = re.findall(r"(?:FROM|JOIN)\s+(\w+)", query, re.IGNORECASE)
+            table_refs = _TABLE_REF.findall(query)
             for t in table_refs:
-                if t.lower() not in valid_tables:
+                if t.lower() not in _POSTGRES_TABLES:
                     issues.append(f"Unknown table: {t}")
 
             # Check for common schema errors
-            if "team_id" in query.lower() and "projects" in query.lower() and "employees" not in query.lower():
+            q_lower = query.lower()
+            if "team_id" in q_lower and "projects" in q_lower and "employees" not in q_lower:
                 issues.append("projects table has NO team_id column — only employees has team_id")
 
         elif target_db == "clickhouse":
-            valid_tables = {"events", "dora_daily_metrics"}
-            table_refs = re.findall(r"(?:FROM|JOIN)\s+(\w+)", query, re.IGNORECASE)
+            table_refs = _TABLE_REF.findall(query)
             for t in table_refs:
-                if t.lower() not in valid_tables:
+                if t.lower() not in _CLICKHOUSE_TABLES:
                     issues.append(f"Unknown ClickHouse table: {t}")
 
     elif state.get("query_language") == "cypher":
-        if any(kw in q_upper for kw in ["DELETE", "DETACH", "REMOVE", "SET "]):
+        if _CYPHER_WRITE.search(query):
             issues.append("Cypher query contains mutating operations")
 
     if issues:
@@ -356,29 +407,42 @@ Respond with ONLY: "VALID" if correct, or "INVALID: [specific issues]" if wrong.
 # Node 4: Execute query
 # ============================================================================
 
+def _run_postgres(query: str) -> list:
+    rows = get_postgres_client().execute_query(query, max_rows=_MAX_RESULT_ROWS)
+    return _safe_serialise(rows)
+
+
+def _run_clickhouse(query: str) -> list:
+    rows = get_clickhouse_client().execute_query(query, max_rows=_MAX_RESULT_ROWS)
+    return _safe_serialise(rows)
+
+
+def _run_neo4j(query: str) -> list:
+    # Neo4j execution — try if available
+    from agents.utils.db_clients import get_neo4j_client
+    rows = get_neo4j_client().execute_query(query)
+    return _safe_serialise(rows) if rows else []
+
+
+_EXECUTORS = {
+    "postgres": _run_postgres,
+    "clickhouse": _run_clickhouse,
+    "neo4j": _run_neo4j,
+}
+
+
 def execute_query_node(state: NLQueryState) -> dict:
     """Execute the validated query against the target database."""
     query = state["generated_query"]
     target_db = state["target_db"]
     logger.info(f"Executing {state.get('query_language')} on {target_db}")
 
+    run = _EXECUTORS.get(target_db)
+    if run is None:
+        return {"execution_error": f"Unknown database: {target_db}", "status": "error"}
+
     try:
-        if target_db == "postgres":
-            pg = get_postgres_client()
-            rows = pg.execute_query(query)
-            results = _safe_serialise(rows)
-        elif target_db == "clickhouse":
-            ch = get_clickhouse_client()
-            rows = ch.execute_query(query)
-            results = _safe_serialise(rows)
-        elif target_db == "neo4j":
-            # Neo4j execution — try if available
-            from agents.utils.db_clients import get_neo4j_client
-            neo4j = get_neo4j_client()
-            rows = neo4j.execute_query(query)
-            results = _safe_serialise(rows) if rows else []
-        else:
-            return {"execution_error": f"Unknown database: {target_db}", "status": "error"}
+        results = run(query)
 
         logger.info(f"Query returned {len(results)} rows")
         return {"query_results": results, "execution_error": ""}
@@ -401,9 +465,7 @@ def fix_query_node(state: NLQueryState) -> dict:
 
     llm = _get_llm("primary", temperature=0.0)
 
-    schema = (POSTGRES_SCHEMA if state["target_db"] == "postgres"
-              else CLICKHOUSE_SCHEMA if state["target_db"] == "clickhouse"
-              else NEO4J_SCHEMA)
+    schema = _DB_CONTEXT.get(state["target_db"], _DB_CONTEXT["neo4j"])[0]
 
     prompt = f"""The following {state.get('query_language', 'sql').upper()} query has an error.
 Fix it based on the error message.
@@ -426,7 +488,7 @@ Generate ONLY the corrected query inside a code block. No explanation.
     try:
         log_llm_call(logger, "query-fix", prompt_preview=f"Retry {retry}: {error[:80]}")
         response = llm.invoke([
-            SystemMessage(content="Fix the database query. Output ONLY the corrected query."),
+            _FIX_SYSTEM,
             HumanMessage(content=prompt),
         ])
         fixed = _extract_code_block(response.content)
@@ -460,7 +522,7 @@ def summarize_node(state: NLQueryState) -> dict:
     llm = _get_llm("primary", temperature=0.3)
 
     # Truncate results for prompt
-    results_str = json.dumps(results[:30], indent=2, default=str)[:3000]
+    results_str = to_json(results[:30])[:3000]
 
     prompt = f"""Summarize these database query results as a clear, executive-level answer
 to the original question.
@@ -488,7 +550,7 @@ Guidelines:
     try:
         log_llm_call(logger, "summarize", prompt_preview=question[:100])
         response = llm.invoke([
-            SystemMessage(content="You create clear, data-driven executive summaries from database results."),
+            _SUMMARY_SYSTEM,
             HumanMessage(content=prompt),
         ])
         summary = response.content.strip()
@@ -500,7 +562,7 @@ Guidelines:
         summary = f"**Results for:** {question}\n\n"
         summary += f"Query returned {len(results)} rows from {state['target_db']}.\n\n"
         for i, row in enumerate(results[:10]):
-            summary += f"- {json.dumps(row, default=str)}\n"
+            summary += f"- {to_json(row)}\n"
         if len(results) > 10:
             summary += f"\n... and {len(results) - 10} more rows."
         return {"summary": summary, "status": "ok"}
@@ -646,30 +708,3 @@ def nl_query(question: str) -> dict:
         "retry_count": final_state.get("retry_count", 0),
     }
 
-
-# ============================================================================
-# Helpers
-# ============================================================================
-
-def _parse_json_object(text: str) -> dict:
-    """Robustly parse a JSON object from LLM output."""
-    # Try direct parse
-    try:
-        return json.loads(text)
-    except json.JSONDecodeError:
-        pass
-    # Try extracting from code block
-    m = re.search(r"```(?:json)?\s*\n?(.*?)```", text, re.DOTALL)
-    if m:
-        try:
-            return json.loads(m.group(1).strip())
-        except json.JSONDecodeError:
-            pass
-    # Try finding a JSON object
-    m = re.search(r"\{[^}]+\}", text)
-    if m:
-        try:
-            return json.loads(m.group(0))
-        except json.JSONDecodeError:
-            pass
-    return {}
@@ -6,13 +6,17 @@ for managers by gathering developer activity, workload, collaboration
 patterns, and synthesizing actionable talking points.
 
 Pipeline:
-    resolve_developer → gather_activity → gather_workload
-        → gather_collaboration → synthesize_briefing → END
+    resolve_developer → ┬ gather_activity      ┬ → synthesize_briefing → END
+                        ├ gather_workload      ┤
+                        └ gather_collaboration ┘
+
+The three gather nodes are independent I/O-bound lookups and run as
+parallel branches of the same LangGraph superstep.
 """
 
 from __future__ import annotations
 
-import json
+import re
 from typing import TypedDict, Optional, Any
 
 from langchain_core.messages import SystemMessage, HumanMessage
@@ -22,10 +26,13 @@ from langgraph.graph import StateGraph, END
 from agents.utils.logger import get_logger, log_llm_call
 from agents.utils.config import get_config
 from agents.utils.model_router import get_llm
+from agents.utils.serialization import to_json
 from agents.utils.db_clients import get_postgres_client, get_clickhouse_client
 
 logger = get_logger(__name__, "PREP_PIPELINE")
 
+_BRIEFING_SYSTEM = SystemMessage(content="You create insightful, empathetic 1:1 meeting briefings for engineering managers.")
+
 _BRIEFING_MODEL = "gpt-4-turbo"
 
 
@@ -63,6 +70,16 @@ class PrepState(TypedDict):
 # Node 1: Resolve developer identity
 # ============================================================================
 
+_RESOLVE_SQL = """
+    SELECT e.id, e.name as full_name, e.email, e.role, e.role as title, 
+           0.0 as hourly_rate, 'Unknown' as level, 'Unknown' as location, 
+           'UTC' as timezone, 'Full-time' as employment_type,
+           e.hire_date as start_date, true as active, t.name AS team_name
+    FROM employees e
+    LEFT JOIN teams t ON e.team_id = t.id
+"""
+
+
 def resolve_developer_node(state: PrepState) -> dict:
     """Look up the developer in PostgreSQL."""
     name = state["developer_name"]
@@ -70,16 +87,18 @@ def resolve_developer_node(state: PrepState) -> dict:
 
     try:
         pg = get_postgres_client()
-        rows = pg.execute_query("""
-            SELECT e.id, e.name as full_name, e.email, e.role, e.role as title, 
-                   0.0 as hourly_rate, 'Unknown' as level, 'Unknown' as location, 
-                   'UTC' as timezone, 'Full-time' as employment_type,
-                   e.hire_date as start_date, true as active, t.name AS team_name
-            FROM employees e
-            LEFT JOIN teams t ON e.team_id = t.id
-            WHERE e.name ILIKE %s OR e.email ILIKE %s
-            LIMIT 1
-        """, (f"%{name}%", f"%{name}%"))
+        # Exact (case-insensitive) name/email match first: served by the
+        # lower() expression indexes and avoids "Ann" resolving to "Joanna".
+        # Only fall back to the substring search when nothing matches exactly.
+        rows = pg.execute_query(
+            _RESOLVE_SQL + "WHERE lower(e.email) = lower(%s) OR lower(e.name) = lower(%s) LIMIT 1",
+            (name, name),
+        )
+        if not rows:
+            rows = pg.execute_query(
+                _RESOLVE_SQL + "WHERE e.name ILIKE %s OR e.email ILIKE %s LIMIT 1",
+                (f"%{name}%", f"%{name}%"),
+            )
 
         if not rows:
             logger.warning(f"Developer not found: {name}")
@@ -131,7 +150,7 @@ def gather_activity_node(state: PrepState) -> dict:
         ch = get_clickhouse_client()
 
         # Activity summary for last 14 days
-        activity_q = f"""
+        activity_q = """
             SELECT
                 countIf(event_type = 'commit') AS commits,
                 countIf(event_type = 'pr_merged') AS prs_merged,
@@ -142,35 +161,46 @@ def gather_activity_node(state: PrepState) -> dict:
                 min(timestamp) AS first_event,
                 max(timestamp) AS last_event
             FROM events
-            WHERE actor_id = '{email}'
+            WHERE actor_id = {email:String}
               AND timestamp >= now() - INTERVAL 14 DAY
         """
-        summary = ch.execute_query(activity_q)
+        summary = ch.execute_query(activity_q, {"email": email})
 
         # Daily breakdown for last 7 days
-        daily_q = f"""
+        daily_q = """
             SELECT
                 toDate(timestamp) AS date,
                 count() AS events,
                 countIf(event_type = 'commit') AS commits,
                 countIf(event_type = 'pr_merged') AS prs_merged
             FROM events
-            WHERE actor_id = '{email}'
+            WHERE actor_id = {email:String}
               AND timestamp >= now() - INTERVAL 7 DAY
             GROUP BY date
             ORDER BY date DESC
         """
-        daily = ch.execute_query(daily_q)
-
-        # Recent events (last 10)
-        recent_q = f"""
-            SELECT event_type, project_id, timestamp, metadata
+        daily = ch.execute_query(daily_q, {"email": email})
+
+        # Recent events (last 10). The metadata fields the briefing uses are
+        # extracted by ClickHouse as typed columns (NULL when absent) instead
+        # of shipping the raw JSON string back to be parsed here.
+        recent_q = """
+            SELECT event_type, project_id, timestamp,
+                if(JSONHas(metadata, 'lines_added'), JSONExtractInt(metadata, 'lines_added'), NULL) AS lines_added,
+                if(JSONHas(metadata, 'lines_deleted'), JSONExtractInt(metadata, 'lines_deleted'), NULL) AS lines_deleted,
+                if(JSONHas(metadata, 'review_time_hours'), JSONExtractFloat(metadata, 'review_time_hours'), NULL) AS review_time_hours,
+                if(JSONHas(metadata, 'lead_time_seconds'), JSONExtractFloat(metadata, 'lead_time_seconds'), NULL) AS lead_time_seconds,
+                if(JSONHas(metadata, 'is_failure'), JSONExtractBool(metadata, 'is_failure'), NULL) AS is_failure,
+                if(JSONHas(metadata, 'story_points'), JSONExtractInt(metadata, 'story_points'), NULL) AS story_points
             FROM events
-            WHERE actor_id = '{email}'
+            WHERE actor_id = {email:String}
             ORDER BY timestamp DESC
             LIMIT 10
         """
-        recent_events = ch.execute_query(recent_q)
+        recent_events = [
+            {k: v for k, v in evt.items() if v is not None}
+            for evt in ch.execute_query(recent_q, {"email": email})
+        ]
 
         activity = {
             "summary_14d": _safe_serialise(summary),
@@ -207,16 +237,13 @@ def gather_workload_node(state: PrepState) -> dict:
         active_projects = [a for a in assignments
                           if a.get("status") in ("active", "in_progress", None)]
 
-        # Get project-level DORA metrics for their projects
-        ch = get_clickhouse_client()
-        project_ids = [a.get("project_name", "") for a in assignments]
-
+        # Project-level DORA metrics. The query is not per-project (events use
+        # slugs, assignments carry names), so run it once instead of once per
+        # assignment, which also stops the same rows being appended N times.
         project_metrics = []
-        for proj in project_ids[:5]:  # limit to top 5
-            if not proj:
-                continue
-            # Use project_id from events (slug format)
-            rows = ch.execute_query(f"""
+        if any(a.get("project_name") for a in assignments):
+            ch = get_clickhouse_client()
+            rows = ch.execute_query("""
                 SELECT
                     project_id,
                     sum(deployments) AS deployments,
@@ -227,7 +254,7 @@ def gather_workload_node(state: PrepState) -> dict:
                 WHERE date >= today() - 14
                 GROUP BY project_id
             """)
-            project_metrics.extend(_safe_serialise(rows))
+            project_metrics = _safe_serialise(rows)
 
         workload = {
             "total_allocation_pct": total_alloc,
@@ -264,7 +291,7 @@ def gather_collaboration_node(state: PrepState) -> dict:
         ch = get_clickhouse_client()
 
         # Find co-contributors on same projects
-        collab_q = f"""
+        collab_q = """
             SELECT
                 b.actor_id AS collaborator,
                 count() AS shared_events,
@@ -273,19 +300,21 @@ def gather_collaboration_node(state: PrepState) -> dict:
             JOIN events b ON a.project_id = b.project_id
                 AND a.actor_id != b.actor_id
                 AND abs(dateDiff('day', a.timestamp, b.timestamp)) <= 3
-            WHERE a.actor_id = '{email}'
+            WHERE a.actor_id = {email:String}
               AND a.timestamp >= now() - INTERVAL 30 DAY
             GROUP BY b.actor_id
             ORDER BY shared_events DESC
             LIMIT 10
         """
-        collabs = ch.execute_query(collab_q)
+        collabs = ch.execute_query(collab_q, {"email": email})
         collab_patterns = _safe_serialise(collabs)
 
-        # Get skill context from embeddings
+        # Get skill context from embeddings. metadata stays in Postgres: the
+        # seeded profile text in `content` already carries it, and fetching it
+        # only meant a JSONB decode here and a re-encode into the prompt.
         pg = get_postgres_client()
         skill_rows = pg.execute_query("""
-            SELECT title, content, source_table, metadata
+            SELECT title, content, source_table
             FROM embeddings
             WHERE source_table = 'employees' AND title ILIKE %s
             LIMIT 5
@@ -331,22 +360,22 @@ def synthesize_briefing_node(state: PrepState) -> dict:
     prompt = f"""You are preparing a 1:1 meeting briefing for a manager meeting with their developer.
 
 DEVELOPER PROFILE:
-{json.dumps(dev, indent=2, default=str)[:1000]}
+{to_json(dev)[:1000]}
 
 PROJECT ASSIGNMENTS:
-{json.dumps(state.get('project_assignments', []), indent=2, default=str)[:1200]}
+{to_json(state.get('project_assignments', []))[:1200]}
 
 RECENT ACTIVITY (last 14 days):
-{json.dumps(state.get('recent_activity', {}), indent=2, default=str)[:1500]}
+{to_json(state.get('recent_activity', {}))[:1500]}
 
 WORKLOAD:
-{json.dumps(state.get('workload_info', {}), indent=2, default=str)[:800]}
+{to_json(state.get('workload_info', {}))[:800]}
 
 COLLABORATION PATTERNS:
-{json.dumps(state.get('collaboration_patterns', []), indent=2, default=str)[:800]}
+{to_json(state.get('collaboration_patterns', []))[:800]}
 
 SKILLS & CONTEXT:
-{json.dumps(state.get('skill_context', []), indent=2, default=str)[:800]}
+{to_json(state.get('skill_context', []))[:800]}
 
 {f"MANAGER'S NOTES: {state.get('manager_context', '')}" if state.get('manager_context') else ""}
 
@@ -366,7 +395,7 @@ Keep it under 600 words.
     try:
         log_llm_call(logger, _BRIEFING_MODEL, prompt_preview=prompt[:200])
         response = llm.invoke([
-            SystemMessage(content="You create insightful, empathetic 1:1 meeting briefings for engineering managers."),
+            _BRIEFING_SYSTEM,
             HumanMessage(content=prompt),
         ])
         briefing = response.content.strip()
@@ -411,12 +440,12 @@ def get_prep_graph():
     workflow.add_node("gather_collaboration", gather_collaboration_node)
     workflow.add_node("synthesize", synthesize_briefing_node)
 
-    # Linear pipeline
+    # Fan out the independent gather steps, then join before synthesis
+    gather_nodes = ["gather_activity", "gather_workload", "gather_collaboration"]
     workflow.set_entry_point("resolve")
-    workflow.add_edge("resolve", "gather_activity")
-    workflow.add_edge("gather_activity", "gather_workload")
-    workflow.add_edge("gather_workload", "gather_collaboration")
-    workflow.add_edge("gather_collaboration", "synthesize")
+    for node in gather_nodes:
+        workflow.add_edge("resolve", node)
+    workflow.add_edge(gather_nodes, "synthesize")
     workflow.add_edge("synthesize", END)
 
     _graph = workflow.compile()
@@ -509,25 +538,33 @@ def _safe_serialise(rows: list) -> list:
     return out
 
 
+# A bullet ("-", "•", "*") or numbered ("3.") line; group 1 is the text after
+# the marker, so one match both recognises the item and strips its prefix
+_LIST_ITEM = re.compile(r"(?=[-•*]|\d+\.)[-•*\d.]+\s*(.*)")
+_MAX_TALKING_POINTS = 8
+
+
 def _extract_talking_points(briefing: str) -> list:
     """Extract talking points from the briefing text."""
-    import re
     points = []
     # Look for lines that start with bullet points or numbered items under talking points section
     in_section = False
     for line in briefing.split("\n"):
-        if "talking point" in line.lower() or "conversation" in line.lower():
+        lowered = line.lower()
+        if "talking point" in lowered or "conversation" in lowered:
             in_section = True
             continue
         if in_section:
             stripped = line.strip()
-            if stripped.startswith(("-", "•", "*")) or re.match(r"^\d+\.", stripped):
-                # Clean up the point
-                point = re.sub(r"^[-•*\d.]+\s*", "", stripped).strip()
-                if point and len(point) > 10:
+            item = _LIST_ITEM.match(stripped)
+            if item:
+                point = item.group(1).strip()
+                if len(point) > 10:
                     points.append(point)
+                    if len(points) == _MAX_TALKING_POINTS:
+                        break  # nothing after the cap can be returned
             elif stripped.startswith("#") or stripped.startswith("**") and not stripped.startswith("**Q"):
                 # New section header — stop extracting
                 if points:  # only stop if we already found some
                     in_section = False
-    return points[:8]  # cap at 8
+    return points
@@ -17,7 +17,7 @@ Graph:
 
 from __future__ import annotations
 
-import json
+import logging
 from typing import TypedDict, List
 
 from langchain_core.messages import HumanMessage
@@ -27,6 +27,7 @@ from langgraph.graph import StateGraph, END, START
 from agents.utils.logger import get_logger, PhaseLogger, log_llm_call
 from agents.utils.config import get_config
 from agents.utils.model_router import get_llm
+from agents.utils.serialization import parse_json_object
 from agents.tools.embedding_tools import get_embedding
 from agents.utils.db_clients import get_postgres_client
 
@@ -61,6 +62,23 @@ class RAGState(TypedDict):
 # Node: Retrieve from pgvector
 # ============================================================================
 
+# Prepared once per connection; the ~10 KB vector literal is sent once per call.
+# metadata is not selected: nothing downstream reads it, and psycopg2 would
+# decode every JSONB value only for it to be dropped.
+_RETRIEVE_SQL = """
+    SELECT
+        e.id,
+        e.source_table,
+        e.source_id,
+        e.title,
+        e.content,
+        1 - (e.embedding <=> $1::vector) AS similarity
+    FROM embeddings e
+    ORDER BY e.embedding <=> $1::vector
+    LIMIT 8
+"""
+
+
 def retrieve_node(state: RAGState) -> dict:
     """Embed the current query and retrieve top-k from pgvector."""
     query = state["current_query"]
@@ -69,31 +87,11 @@ def retrieve_node(state: RAGState) -> dict:
     embedding = get_embedding(query)
     vec_literal = "[" + ",".join(f"{v:.8f}" for v in embedding) + "]"
 
-    sql = """
-        SELECT
-            e.id,
-            e.source_table,
-            e.source_id,
-            e.title,
-            e.content,
-            e.metadata,
-            1 - (e.embedding <=> %s::vector) AS similarity
-        FROM embeddings e
-        ORDER BY e.embedding <=> %s::vector
-        LIMIT 8
-    """
-
     pg = get_postgres_client()
-    rows = pg.execute_query(sql, (vec_literal, vec_literal))
+    rows = pg.execute_prepared("rag_retrieve", _RETRIEVE_SQL, (vec_literal,))
 
     docs = []
     for r in rows:
-        meta = r.get("metadata") or {}
-        if isinstance(meta, str):
-            try:
-                meta = json.loads(meta)
-            except json.JSONDecodeError:
-                meta = {}
         docs.append({
             "id": str(r.get("id", "")),
             "entity_type": r.get("source_table", ""),
@@ -101,7 +99,6 @@ def retrieve_node(state: RAGState) -> dict:
             "title": r.get("title", ""),
             "content": r.get("content", ""),
             "similarity": float(r.get("similarity", 0)),
-            "metadata": meta,
         })
 
     if docs:
@@ -116,20 +113,21 @@ def retrieve_node(state: RAGState) -> dict:
 # Node: Grade Documents for Relevance
 # ============================================================================
 
-_GRADING_PROMPT = """You are a relevance grader. Given a user question and a retrieved document,
-decide if the document is relevant to answering the question.
+_GRADING_PROMPT = """You are a relevance grader. Given a user question and a numbered list of
+retrieved documents, decide which documents are relevant to answering the question.
 
-Respond with ONLY a JSON object: {{"relevant": true}} or {{"relevant": false}}
+Respond with ONLY a JSON object listing the numbers of the relevant documents,
+e.g. {{"relevant": [1, 3]}}, or {{"relevant": []}} if none are relevant.
 
 User question: {question}
 
-Document:
-{document}
+Documents:
+{documents}
 """
 
 
 def grade_documents_node(state: RAGState) -> dict:
-    """Use a fast LLM to grade each retrieved document for relevance."""
+    """Use a fast LLM to grade all retrieved documents for relevance in one call."""
     query = state["current_query"]
     docs = state["retrieved_docs"]
 
@@ -137,35 +135,35 @@ def grade_documents_node(state: RAGState) -> dict:
         logger.warning("No documents to grade")
         return {"relevant_docs": [], "status": "no_docs"}
 
-    grader_llm = _get_pipeline_llm(temperature=0.0)
+    # Skip very low similarity docs
+    candidates = [doc for doc in docs if doc["similarity"] >= 0.25]
+    if not candidates:
+        logger.info(f"Grading: 0/{len(docs)} above similarity floor")
+        return {"relevant_docs": [], "status": "no_relevant"}
 
-    relevant = []
-    for doc in docs:
-        # Skip very low similarity docs
-        if doc["similarity"] < 0.25:
-            continue
+    grader_llm = _get_pipeline_llm(temperature=0.0)
 
-        prompt = _GRADING_PROMPT.format(
-            question=query,
-            document=doc["content"][:1500],
-        )
+    prompt = _GRADING_PROMPT.format(
+        question=query,
+        documents="\n\n".join(
+            f"[{i}] {doc['content'][:1500]}" for i, doc in enumerate(candidates, 1)
+        ),
+    )
 
-        try:
-            resp = grader_llm.invoke([HumanMessage(content=prompt)])
-            text = resp.content.strip()
-
-            log_llm_call(logger, model="Hermes-3-8B (grader)", prompt_preview=query[:80])
-
-            if '"relevant": true' in text.lower() or '"relevant":true' in text.lower():
-                relevant.append(doc)
-                logger.debug(f"  ✅ Relevant: {doc['entity_type']}/{doc['entity_id']} (sim={doc['similarity']:.3f})")
-            else:
-                logger.debug(f"  ❌ Irrelevant: {doc['entity_type']}/{doc['entity_id']} (sim={doc['similarity']:.3f})")
-        except Exception as e:
-            logger.warning(f"Grading failed for {doc['entity_id']}: {e}")
-            # Fallback: include docs with decent similarity
-            if doc["similarity"] >= 0.40:
-                relevant.append(doc)
+    try:
+        resp = grader_llm.invoke([HumanMessage(content=prompt)])
+        log_llm_call(logger, model="Hermes-3-8B (grader)", prompt_preview=query[:80])
+
+        picked = {int(i) for i in parse_json_object(resp.content).get("relevant", [])}
+        relevant = [doc for i, doc in enumerate(candidates, 1) if i in picked]
+        if logger.isEnabledFor(logging.DEBUG):
+            for i, doc in enumerate(candidates, 1):
+                mark = "✅ Relevant" if i in picked else "❌ Irrelevant"
+                logger.debug(f"  {mark}: {doc['entity_type']}/{doc['entity_id']} (sim={doc['similarity']:.3f})")
+    except Exception as e:
+        logger.warning(f"Batch grading failed: {e}")
+        # Fallback: include docs with decent similarity
+        relevant = [doc for doc in candidates if doc["similarity"] >= 0.40]
 
     status = "relevant_found" if relevant else "no_relevant"
     logger.info(f"Grading: {len(relevant)}/{len(docs)} relevant (status={status})")
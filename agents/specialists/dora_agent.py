@@ -6,12 +6,9 @@ Default model: Llama 3.1 70B (can be overridden by multi-model router).
 
 from typing import Optional
 
-from langchain_openai import ChatOpenAI
 from langgraph.prebuilt import create_react_agent
-from langchain_core.prompts import ChatPromptTemplate
 
 from agents.utils.logger import get_logger
-from agents.utils.config import get_config
 from agents.utils.model_router import get_llm
 from agents.tools.clickhouse_tools import CLICKHOUSE_TOOLS
 from agents.tools.anomaly_tools import ANOMALY_TOOLS
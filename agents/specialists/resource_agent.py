@@ -6,12 +6,9 @@ Default model: Qwen 2.5 72B (can be overridden by multi-model router).
 
 from typing import Optional
 
-from langchain_openai import ChatOpenAI
 from langgraph.prebuilt import create_react_agent
-from langchain_core.prompts import ChatPromptTemplate
 
 from agents.utils.logger import get_logger
-from agents.utils.config import get_config
 from agents.utils.model_router import get_llm
 from agents.tools.postgres_tools import get_project, list_projects, get_developer_workload, list_developers
 from agents.tools.prep_tools import PREP_TOOLS
@@ -7,19 +7,22 @@ with intelligent model routing (OpenAI or Featherless).
 
 from typing import Annotated, TypedDict, Sequence, Literal, List, Optional, Generator
 import operator
+import asyncio
 import functools
+import importlib
+import inspect
 import time
-import uuid
+import secrets
 
 from langchain_core.messages import BaseMessage, HumanMessage, AIMessage, SystemMessage, ToolMessage
-from langchain_openai import ChatOpenAI
+from langchain_core.runnables import RunnableLambda
 from pydantic import BaseModel
 from langgraph.graph import StateGraph, END, START
 
 from agents.utils.logger import get_logger, PhaseLogger, log_agent_decision, log_llm_call
 from agents.utils.config import get_config
 from agents.utils.model_router import (
-    route_query, classify_task, select_model, get_llm,
+    route_query, classify_task, select_model, get_llm, count_tokens,
     ModelSelection, TaskType,
 )
 from agents.utils.memory import get_conversation_memory, ConversationMemory
@@ -27,11 +30,6 @@ from agents.utils.streaming import (
     StreamEvent, StreamEventType, StreamBuffer, render_stream_to_console,
 )
 
-# Import specialist agent *factories* (not singletons — we now create with dynamic models)
-from agents.specialists.dora_agent import create_dora_agent
-from agents.specialists.resource_agent import create_resource_agent
-from agents.specialists.insights_agent import create_insights_agent
-
 logger = get_logger(__name__, "SUPERVISOR")
 
 
@@ -52,6 +50,8 @@ class AgentState(TypedDict):
 
 members = ["DORA_Pro", "Resource_Planner", "Insights_Specialist"]
 options = ["FINISH"] + members
+# Hashed membership for the per-message / per-update "is this a specialist" checks
+_MEMBER_NAMES = frozenset(members)
 
 class RouteResponse(BaseModel):
     """Structured response for routing."""
@@ -77,12 +77,46 @@ You must respond with a valid JSON object {"next": "AGENT_NAME"}.
 Do not add any conversational text.
 """
 
+_SYSTEM_MESSAGE = SystemMessage(content=SYSTEM_PROMPT)
+
+# Only the most recent turns of a thread are sent to the router / specialists;
+# the checkpointer still keeps the full history.
+_CONTEXT_MESSAGES = 20
+
+_CONVERSATIONAL_PROMPT = """You are a helpful engineering intelligence assistant. 
+The user said: "{user_query}"
+
+This appears to be a greeting or general question that doesn't require data analysis.
+Respond in a friendly, concise way. If they're asking about your capabilities, briefly explain you can:
+- Analyze DORA metrics (deployment frequency, lead time, etc.)
+- Find experts and developers with specific skills
+- Prepare 1:1 meeting briefings
+- Detect anomalies in engineering metrics
+- Search for developers and projects
+
+Keep your response under 100 words."""
+
+
+# Task types whose keyword match is unambiguous enough to pick a specialist
+# without asking the routing LLM. CODE_ANALYSIS and GENERAL still go to the LLM.
+_RULE_ROUTES: dict[TaskType, str] = {
+    TaskType.ANALYTICS: "DORA_Pro",
+    TaskType.PLANNING: "Resource_Planner",
+    TaskType.QUICK_LOOKUP: "Insights_Specialist",
+}
+
 
 def create_supervisor_llm():
     """Create the supervisor LLM using centralized routing."""
     return get_llm(temperature=0.0)
 
 
+@functools.lru_cache(maxsize=1)
+def _get_router_llm():
+    """Supervisor LLM bound to the RouteResponse schema (built once)."""
+    return create_supervisor_llm().with_structured_output(RouteResponse)
+
+
 def _extract_user_query(messages: Sequence[BaseMessage]) -> str:
     """Pull the latest HumanMessage text for task classification."""
     for msg in reversed(messages):
@@ -91,11 +125,12 @@ def _extract_user_query(messages: Sequence[BaseMessage]) -> str:
     return ""
 
 
-def supervisor_node(state: AgentState):
-    """The supervisor decides which agent calls next AND selects the optimal model."""
-    messages = state["messages"]
+def _plan_route(messages: Sequence[BaseMessage]) -> tuple[ModelSelection, str, Optional[str]]:
+    """Classify the task, select the model, and try the rule-based fast path.
 
-    # ── 1. Classify the task & select model ─────────────────
+    Returns ``(model_selection, user_query, next_agent)``; ``next_agent`` is
+    None when the supervisor LLM has to decide.
+    """
     user_query = _extract_user_query(messages)
     model_sel: ModelSelection = route_query(user_query)
 
@@ -105,18 +140,32 @@ def supervisor_node(state: AgentState):
         prompt_preview=f"task={model_sel.task_type.value} | {model_sel.reason}",
     )
 
-    # ── 2. Ask supervisor LLM to pick next agent ───────────
-    llm = create_supervisor_llm()
-    full_messages = [SystemMessage(content=SYSTEM_PROMPT)] + list(messages)
+    next_agent = None
+    if messages and isinstance(messages[-1], HumanMessage):
+        next_agent = _RULE_ROUTES.get(model_sel.task_type)
+        if next_agent:
+            logger.debug("Rule-based routing (%s) → %s", model_sel.task_type.value, next_agent)
+    return model_sel, user_query, next_agent
 
-    try:
-        logger.debug("Supervisor deciding next step...")
-        response = llm.with_structured_output(RouteResponse).invoke(full_messages)
-        next_agent = response.next
-    except Exception as e:
-        logger.error(f"Routing failed, defaulting to FINISH: {e}")
-        next_agent = "FINISH"
 
+def _router_messages(messages: Sequence[BaseMessage]) -> list[BaseMessage]:
+    """System prompt plus the recent thread history for the routing LLM."""
+    recent = ConversationMemory.trim_messages(list(messages), _CONTEXT_MESSAGES)
+    return [_SYSTEM_MESSAGE, *recent]
+
+
+def _finish_route(
+    messages: Sequence[BaseMessage],
+    model_sel: ModelSelection,
+    next_agent: str,
+) -> tuple[dict, bool]:
+    """
+    Apply loop prevention and pack the routing result.
+
+    Returns ``(result, needs_reply)``; ``needs_reply`` is True when routing to
+    FINISH before any specialist has answered, so the supervisor must reply
+    conversationally itself.
+    """
     # ── Loop Prevention ─────────────────────────────────────
     # If the LLM tries to route back to the same agent that just spoke, force FINISH.
     if len(messages) > 0 and isinstance(messages[-1], AIMessage):
@@ -125,7 +174,6 @@ def supervisor_node(state: AgentState):
             logger.warning(f"Supervisor tried to route back to {last_sender} immediately. Forcing FINISH.")
             next_agent = "FINISH"
 
-
     log_agent_decision(logger, "SUPERVISOR", f"Routing to {next_agent}")
 
     # Pack model selection into state so the agent node can use it
@@ -137,41 +185,79 @@ def supervisor_node(state: AgentState):
         "temperature": model_sel.temperature,
         "emoji": model_sel.emoji,
     }
-
-    # If routing to FINISH but no specialist has responded yet, generate a conversational response
     result = {"next": next_agent, "model_selection": model_info}
-    
-    if next_agent == "FINISH":
-        # Check if there's already a response from a specialist
-        has_specialist_response = any(
-            isinstance(msg, AIMessage) and msg.name in members
-            for msg in messages
-        )
-        
-        if not has_specialist_response:
-            # Generate a friendly conversational response for greetings/general questions
-            try:
-                conversational_prompt = f"""You are a helpful engineering intelligence assistant. 
-The user said: "{user_query}"
 
-This appears to be a greeting or general question that doesn't require data analysis.
-Respond in a friendly, concise way. If they're asking about your capabilities, briefly explain you can:
-- Analyze DORA metrics (deployment frequency, lead time, etc.)
-- Find experts and developers with specific skills
-- Prepare 1:1 meeting briefings
-- Detect anomalies in engineering metrics
-- Search for developers and projects
+    needs_reply = next_agent == "FINISH" and not any(
+        isinstance(msg, AIMessage) and msg.name in _MEMBER_NAMES
+        for msg in messages
+    )
+    return result, needs_reply
 
-Keep your response under 100 words."""
-                
-                conversational_response = llm.invoke([HumanMessage(content=conversational_prompt)])
-                result["messages"] = [AIMessage(content=conversational_response.content, name="supervisor")]
-            except Exception as e:
-                logger.warning(f"Failed to generate conversational response: {e}")
-                result["messages"] = [AIMessage(
-                    content="Hello! I'm an engineering intelligence assistant. I can help you with DORA metrics, finding experts, meeting prep, and more. What would you like to know?",
-                    name="supervisor"
-                )]
+
+def _conversational_request(user_query: str) -> list[BaseMessage]:
+    return [HumanMessage(content=_CONVERSATIONAL_PROMPT.format(user_query=user_query))]
+
+
+_FALLBACK_REPLY = (
+    "Hello! I'm an engineering intelligence assistant. I can help you with DORA metrics, "
+    "finding experts, meeting prep, and more. What would you like to know?"
+)
+
+
+def supervisor_node(state: AgentState):
+    """The supervisor decides which agent calls next AND selects the optimal model."""
+    messages = state["messages"]
+
+    # ── 1. Classify the task, select model, try the rules fast path ──
+    model_sel, user_query, next_agent = _plan_route(messages)
+
+    # ── 2. Otherwise ask the supervisor LLM ─────────────────
+    if next_agent is None:
+        try:
+            logger.debug("Supervisor deciding next step...")
+            next_agent = _get_router_llm().invoke(_router_messages(messages)).next
+        except Exception as e:
+            logger.error(f"Routing failed, defaulting to FINISH: {e}")
+            next_agent = "FINISH"
+
+    result, needs_reply = _finish_route(messages, model_sel, next_agent)
+
+    # Nothing from a specialist yet: answer greetings/general questions directly
+    if needs_reply:
+        try:
+            reply = create_supervisor_llm().invoke(_conversational_request(user_query))
+            result["messages"] = [AIMessage(content=reply.content, name="supervisor")]
+        except Exception as e:
+            logger.warning(f"Failed to generate conversational response: {e}")
+            result["messages"] = [AIMessage(content=_FALLBACK_REPLY, name="supervisor")]
+
+    return result
+
+
+async def asupervisor_node(state: AgentState):
+    """Async twin of ``supervisor_node``, used when the graph runs via ``ainvoke``."""
+    messages = state["messages"]
+
+    model_sel, user_query, next_agent = _plan_route(messages)
+
+    if next_agent is None:
+        try:
+            logger.debug("Supervisor deciding next step...")
+            response = await _get_router_llm().ainvoke(_router_messages(messages))
+            next_agent = response.next
+        except Exception as e:
+            logger.error(f"Routing failed, defaulting to FINISH: {e}")
+            next_agent = "FINISH"
+
+    result, needs_reply = _finish_route(messages, model_sel, next_agent)
+
+    if needs_reply:
+        try:
+            reply = await create_supervisor_llm().ainvoke(_conversational_request(user_query))
+            result["messages"] = [AIMessage(content=reply.content, name="supervisor")]
+        except Exception as e:
+            logger.warning(f"Failed to generate conversational response: {e}")
+            result["messages"] = [AIMessage(content=_FALLBACK_REPLY, name="supervisor")]
 
     return result
 
@@ -180,13 +266,20 @@ Keep your response under 100 words."""
 # Sub-Agent Nodes (with dynamic model selection)
 # ============================================================================
 
-# Map agent name → factory function
+# Map agent name → (module, factory). Specialist modules pull in every tool,
+# pipeline and DB driver, so they are imported on first handoff, not at startup.
 _AGENT_FACTORIES = {
-    "DORA_Pro": create_dora_agent,
-    "Resource_Planner": create_resource_agent,
-    "Insights_Specialist": create_insights_agent,
+    "DORA_Pro": ("agents.specialists.dora_agent", "create_dora_agent"),
+    "Resource_Planner": ("agents.specialists.resource_agent", "create_resource_agent"),
+    "Insights_Specialist": ("agents.specialists.insights_agent", "create_insights_agent"),
 }
 
+
+@functools.lru_cache(maxsize=None)
+def _load_factory(name: str):
+    module_name, attr = _AGENT_FACTORIES[name]
+    return getattr(importlib.import_module(module_name), attr)
+
 # Cache: (agent_name, model_name) → compiled agent
 _agent_cache: dict[tuple[str, str], object] = {}
 
@@ -195,7 +288,7 @@ def _get_or_create_agent(name: str, model_name: str, temperature: float):
     """Get a cached agent or create one with the specified model."""
     cache_key = (name, model_name)
     if cache_key not in _agent_cache:
-        factory = _AGENT_FACTORIES[name]
+        factory = _load_factory(name)
         _agent_cache[cache_key] = factory(
             model_override=model_name,
             temperature_override=temperature,
@@ -204,70 +297,99 @@ def _get_or_create_agent(name: str, model_name: str, temperature: float):
     return _agent_cache[cache_key]
 
 
-def create_agent_node(name: str):
-    """
-    Create a graph node for a specialist agent.
-    The model is determined dynamically from state['model_selection'].
+def _prepare_agent_call(name: str, state: AgentState) -> tuple[object, dict, str, str]:
+    """Resolve the specialist for this turn and build its input.
+
+    Returns ``(agent, agent_input, display_name, emoji)``.
     """
-    def agent_node(state: AgentState):
-        model_info = state.get("model_selection") or {}
-        model_name = model_info.get("model_name")
-        temperature = model_info.get("temperature", 0.1)
-        display_name = model_info.get("display_name", "default")
-        emoji = model_info.get("emoji", "🤖")
+    model_info = state.get("model_selection") or {}
+    model_name = model_info.get("model_name")
+    temperature = model_info.get("temperature", 0.1)
+    display_name = model_info.get("display_name", "default")
+    emoji = model_info.get("emoji", "🤖")
+
+    logger.info(
+        f"▶ Handoff to {name}  |  {emoji} Model: {display_name}"
+    )
 
-        logger.info(
-            f"▶ Handoff to {name}  |  {emoji} Model: {display_name}"
+    # Get (or create) the agent compiled with the chosen model
+    if model_name:
+        agent = _get_or_create_agent(name, model_name, temperature)
+    else:
+        # Fallback: use default model for this agent
+        agent = _get_or_create_agent(
+            name,
+            _get_default_model(name),
+            temperature,
         )
 
-        # Get (or create) the agent compiled with the chosen model
-        if model_name:
-            agent = _get_or_create_agent(name, model_name, temperature)
-        else:
-            # Fallback: use default model for this agent
-            agent = _get_or_create_agent(
-                name,
-                _get_default_model(name),
-                temperature,
+    # The ReAct sub-agent only reads the conversation; don't hand it the
+    # supervisor's routing fields.
+    recent = ConversationMemory.trim_messages(list(state["messages"]), _CONTEXT_MESSAGES)
+    return agent, {"messages": recent}, display_name, emoji
+
+
+def _agent_reply(name: str, result: dict, display_name: str, emoji: str) -> dict:
+    """Wrap the specialist's final message with model attribution."""
+    last_message = result["messages"][-1]
+
+    if not isinstance(last_message, AIMessage):
+        last_message = AIMessage(content=str(last_message.content))
+
+    # Prepend model attribution to the response
+    header = f"{emoji} *[{display_name}]*\n\n"
+
+    logger.info(f"✓ {name} completed task ({display_name})")
+    return {
+        "messages": [
+            AIMessage(
+                content=header + last_message.content,
+                name=name,
             )
+        ]
+    }
 
-        result = agent.invoke(state)
-        last_message = result["messages"][-1]
 
-        if not isinstance(last_message, AIMessage):
-            last_message = AIMessage(content=str(last_message.content))
+def create_agent_node(name: str) -> RunnableLambda:
+    """
+    Create a graph node for a specialist agent.
+    The model is determined dynamically from state['model_selection'].
 
-        # Prepend model attribution to the response
-        header = f"{emoji} *[{display_name}]*\n\n"
+    The node has both a sync and an async implementation, so the graph
+    works with ``invoke``/``stream`` as well as ``ainvoke``.
+    """
+    def agent_node(state: AgentState):
+        agent, agent_input, display_name, emoji = _prepare_agent_call(name, state)
+        result = agent.invoke(agent_input)
+        return _agent_reply(name, result, display_name, emoji)
 
-        logger.info(f"✓ {name} completed task ({display_name})")
-        return {
-            "messages": [
-                AIMessage(
-                    content=header + last_message.content,
-                    name=name,
-                )
-            ]
-        }
+    async def aagent_node(state: AgentState):
+        agent, agent_input, display_name, emoji = _prepare_agent_call(name, state)
+        result = await agent.ainvoke(agent_input)
+        return _agent_reply(name, result, display_name, emoji)
+
+    return RunnableLambda(agent_node, afunc=aagent_node, name=name)
 
-    return agent_node
+
+# Featherless model field each specialist defaults to (others use the primary)
+_DEFAULT_MODEL_FIELDS = {
+    "DORA_Pro": "model_analytics",
+    "Resource_Planner": "model_primary",
+    "Insights_Specialist": "model_fast",
+}
 
 
 def _get_default_model(agent_name: str) -> str:
     """Return the default model for an agent when no routing info is present."""
     config = get_config()
     
-    # If using OpenAI, return the configured OpenAI model
+    # If using OpenAI, every agent runs the configured OpenAI model
     if config.llm_provider == "openai":
-        return config.openai.model
+        return config.primary_model
     
-    # Fallback to Featherless models
-    defaults = {
-        "DORA_Pro": config.featherless.model_analytics,
-        "Resource_Planner": config.featherless.model_primary,
-        "Insights_Specialist": config.featherless.model_fast,
-    }
-    return defaults.get(agent_name, config.featherless.model_primary)
+    # Featherless: per-agent specialised models
+    field = _DEFAULT_MODEL_FIELDS.get(agent_name)
+    return getattr(config.featherless, field) if field else config.primary_model
 
 
 # ============================================================================
@@ -288,7 +410,10 @@ def create_supervisor_graph(checkpointer=None):
         workflow = StateGraph(AgentState)
         
         # Add supervisor node
-        workflow.add_node("supervisor", supervisor_node)
+        workflow.add_node(
+            "supervisor",
+            RunnableLambda(supervisor_node, afunc=asupervisor_node, name="supervisor"),
+        )
         
         # Add specialist nodes — agents are now created dynamically inside the node
         workflow.add_node("DORA_Pro", create_agent_node("DORA_Pro"))
@@ -322,10 +447,54 @@ def create_supervisor_graph(checkpointer=None):
     return graph
 
 
+@functools.lru_cache(maxsize=4)
+def _get_compiled_graph(checkpointer=None):
+    """Compile the supervisor graph once per checkpointer and share it.
+
+    The compiled graph holds no per-run state (it is passed in on each
+    invoke/stream), so every SupervisorAgent can reuse the same instance.
+    """
+    return create_supervisor_graph(checkpointer=checkpointer)
+
+
 # ============================================================================
 # Main Interface (Preserved)
 # ============================================================================
 
+def _ephemeral_thread_id() -> str:
+    """Throwaway checkpointer thread for a call made without a thread_id."""
+    return f"_ephemeral_{secrets.token_hex(4)}"
+
+
+# Seconds between non-blocking attempts on a thread lock from async code
+_LOCK_POLL_INTERVAL = 0.05
+
+
+def _serialised_per_thread(method):
+    """
+    Run turns on the same conversation thread one at a time, in arrival order,
+    while turns on different threads proceed concurrently. Ephemeral
+    (thread_id=None) calls get a unique thread and need no lock.
+    """
+    if inspect.isgeneratorfunction(method):
+        @functools.wraps(method)
+        def gen_wrapper(self, user_message: str, thread_id: Optional[str] = None):
+            if not thread_id:
+                yield from method(self, user_message, thread_id)
+                return
+            with self.memory.thread_lock(thread_id):
+                yield from method(self, user_message, thread_id)
+        return gen_wrapper
+
+    @functools.wraps(method)
+    def wrapper(self, user_message: str, thread_id: Optional[str] = None):
+        if not thread_id:
+            return method(self, user_message, thread_id)
+        with self.memory.thread_lock(thread_id):
+            return method(self, user_message, thread_id)
+    return wrapper
+
+
 class SupervisorAgent:
     """
     High-level interface for the supervisor agent.
@@ -345,9 +514,7 @@ class SupervisorAgent:
         if not self._initialized:
             with PhaseLogger(logger, "Supervisor Initialization"):
                 self._memory = get_conversation_memory()
-                self.graph = create_supervisor_graph(
-                    checkpointer=self._memory.checkpointer
-                )
+                self.graph = _get_compiled_graph(self._memory.checkpointer)
                 self._initialized = True
                 logger.info("✓ Supervisor ready with conversation memory")
         return self
@@ -371,6 +538,7 @@ class SupervisorAgent:
         """Delete a conversation thread."""
         return self.memory.delete_thread(thread_id)
 
+    @_serialised_per_thread
     def query(self, user_message: str, thread_id: Optional[str] = None) -> str:
         """
         Process a user query.
@@ -385,7 +553,7 @@ class SupervisorAgent:
 
         # When a checkpointer is attached, LangGraph always needs a thread_id.
         # Generate an ephemeral one for stateless calls so callers don't have to.
-        effective_thread = thread_id or f"_ephemeral_{uuid.uuid4().hex[:8]}"
+        effective_thread = thread_id or _ephemeral_thread_id()
             
         logger.info(
             f"Processing query (thread={thread_id or 'ephemeral'}): "
@@ -415,6 +583,57 @@ class SupervisorAgent:
             logger.error(f"Query failed: {e}", exc_info=True)
             return f"Error: {str(e)}"
 
+    async def aquery(self, user_message: str, thread_id: Optional[str] = None) -> str:
+        """
+        Async ``query``: runs the graph with ``ainvoke`` so LLM and tool I/O
+        awaits on the event loop instead of occupying a worker thread.
+        Turns on the same thread are still taken one at a time.
+        """
+        if not self._initialized:
+            self.initialize()
+        if not thread_id:
+            return await self._aquery(user_message, None)
+        # Same per-thread lock as the sync and streaming turns. Polled from
+        # the event loop rather than waited on in an executor thread, so a
+        # burst of waiters can't exhaust the pool the lock holder runs on.
+        lock = self._memory.thread_lock(thread_id)
+        while not lock.acquire(blocking=False):
+            await asyncio.sleep(_LOCK_POLL_INTERVAL)
+        try:
+            return await self._aquery(user_message, thread_id)
+        finally:
+            lock.release()
+
+    async def _aquery(self, user_message: str, thread_id: Optional[str]) -> str:
+        effective_thread = thread_id or _ephemeral_thread_id()
+
+        logger.info(
+            f"Processing async query (thread={thread_id or 'ephemeral'}): "
+            f"{user_message[:100]}..."
+        )
+
+        try:
+            initial_state = {
+                "messages": [HumanMessage(content=user_message)],
+                "next": "supervisor"
+            }
+
+            config = self._memory.get_config(effective_thread)
+            final_state = await self.graph.ainvoke(initial_state, config=config)
+
+            if thread_id:
+                msg_count = len(final_state.get("messages", []))
+                self._memory.touch_thread(thread_id, msg_count)
+            else:
+                self._memory.delete_thread(effective_thread)
+
+            return final_state["messages"][-1].content
+
+        except Exception as e:
+            logger.error(f"Async query failed: {e}", exc_info=True)
+            return f"Error: {str(e)}"
+
+    @_serialised_per_thread
     def stream_query(
         self,
         user_message: str,
@@ -436,7 +655,7 @@ class SupervisorAgent:
         if not self._initialized:
             self.initialize()
 
-        effective_thread = thread_id or f"_ephemeral_{uuid.uuid4().hex[:8]}"
+        effective_thread = thread_id or _ephemeral_thread_id()
         config = self._memory.get_config(effective_thread)
 
         initial_state = {"messages": [HumanMessage(content=user_message)]}
@@ -466,7 +685,7 @@ class SupervisorAgent:
                         for msg in supervisor_messages:
                             if isinstance(msg, AIMessage) and msg.content:
                                 content = str(msg.content)
-                                total_tokens += len(content.split())
+                                total_tokens += count_tokens(content)
                                 yield StreamEvent.response(content=content)
 
                         # Emit model selection (always emit when we have model info)
@@ -483,7 +702,7 @@ class SupervisorAgent:
                             yield StreamEvent.routing(agent=next_agent)
 
                     # ── Specialist agent node ───────────────────
-                    elif node_name in members:
+                    elif node_name in _MEMBER_NAMES:
                         messages = state_update.get("messages", [])
                         if not messages:
                             continue
@@ -518,7 +737,7 @@ class SupervisorAgent:
                             # ── AI messages ────────────────────
                             elif isinstance(msg, AIMessage):
                                 # Check for tool_calls (tool invocations)
-                                if hasattr(msg, "tool_calls") and msg.tool_calls:
+                                if msg.tool_calls:
                                     for tc in msg.tool_calls:
                                         yield StreamEvent.tool_start(
                                             tool_name=tc.get("name", "unknown"),
@@ -532,7 +751,7 @@ class SupervisorAgent:
                                 #  stream_query_tokens() below.)
                                 if msg.content:
                                     content = str(msg.content)
-                                    total_tokens += len(content.split())
+                                    total_tokens += count_tokens(content)
                                     yield StreamEvent.response(content=content)
 
             # Close last agent
@@ -556,6 +775,7 @@ class SupervisorAgent:
         else:
             self._memory.delete_thread(effective_thread)
 
+    @_serialised_per_thread
     def stream_query_tokens(
         self,
         user_message: str,
@@ -574,7 +794,7 @@ class SupervisorAgent:
         if not self._initialized:
             self.initialize()
 
-        effective_thread = thread_id or f"_ephemeral_{uuid.uuid4().hex[:8]}"
+        effective_thread = thread_id or _ephemeral_thread_id()
         config = self._memory.get_config(effective_thread)
         initial_state = {"messages": [HumanMessage(content=user_message)]}
 
@@ -583,6 +803,7 @@ class SupervisorAgent:
         stream_start_time = time.time()
         total_tokens = 0
         active_tools: dict[str, float] = {}  # tool_name → start_time
+        started_calls: set[str] = set()  # tool-call ids already announced
 
         try:
             for msg, metadata in self.graph.stream(
@@ -593,11 +814,25 @@ class SupervisorAgent:
                 node = metadata.get("langgraph_node", "")
 
                 # ── AI message chunks (tokens) ─────────────────
-                if hasattr(msg, "content") and isinstance(msg, AIMessage):
+                # AIMessage (and its chunk subclass) always defines content
+                # and tool_calls, so no hasattr probes on this per-token path
+                if isinstance(msg, AIMessage):
                     # Check for tool calls in the chunk
-                    if hasattr(msg, "tool_calls") and msg.tool_calls:
-                        for tc in msg.tool_calls:
-                            t_name = tc.get("name", "unknown")
+                    if msg.tool_calls:
+                        for i, tc in enumerate(msg.tool_calls):
+                            t_name = tc.get("name")
+                            # Continuation chunks of a streamed call carry
+                            # neither id nor name: nothing new to announce
+                            if not t_name and not tc.get("id"):
+                                continue
+                            t_name = t_name or "unknown"
+                            # A call can surface in several chunks (and again in
+                            # the final message); announce each call id once.
+                            # Id-less calls are told apart by their position.
+                            call_id = tc.get("id") or f"{t_name}#{i}"
+                            if call_id in started_calls:
+                                continue
+                            started_calls.add(call_id)
                             active_tools[t_name] = time.time()
                             yield StreamEvent.tool_start(
                                 tool_name=t_name,
@@ -627,7 +862,8 @@ class SupervisorAgent:
                 "stream_mode='messages' not supported — "
                 "falling back to stream_query()"
             )
-            yield from self.stream_query(user_message, thread_id=thread_id)
+            # Already holding this thread's lock: call the undecorated method
+            yield from SupervisorAgent.stream_query.__wrapped__(self, user_message, thread_id)
             return
         except Exception as e:
             logger.error(f"Token streaming failed: {e}", exc_info=True)
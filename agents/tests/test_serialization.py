@@ -0,0 +1,104 @@
+"""
+Tests for prompt serialization helpers.
+Pure functions — no database or LLM access needed.
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agents.utils.serialization import (
+    to_toon,
+    to_json,
+    prune_payload,
+    parse_metadata,
+    parse_json_object,
+    parse_json_array,
+)
+
+
+# ── to_toon ─────────────────────────────────────────────────
+
+def test_toon_uniform_list_is_table():
+    out = to_toon({"dora": [{"project_id": "api", "deployments": 4},
+                            {"project_id": "web", "deployments": 2}]})
+    assert out == "dora[2]{project_id|deployments}:\n  api|4\n  web|2"
+
+
+def test_toon_mixed_list_is_not_table():
+    # Differing keys → one item per "-" entry instead of a table header
+    out = to_toon({"rows": [{"a": 1}, {"b": 2}]})
+    assert out.splitlines() == ["rows[2]:", "  -", "    a: 1", "  -", "    b: 2"]
+
+
+def test_toon_scalar_list_is_inline():
+    assert to_toon({"ids": [1, 2, 3]}) == "ids[3]: 1,2,3"
+
+
+def test_toon_quotes_delimiters_and_newlines():
+    out = to_toon({"rows": [{"name": "a|b"}, {"name": "c,d"}, {"name": "e\nf"}]})
+    assert out.splitlines() == [
+        "rows[3]{name}:",
+        '  "a|b"',
+        '  "c,d"',
+        '  "e\\nf"',
+    ]
+
+
+def test_toon_scalars():
+    assert to_toon({"x": None, "y": True, "z": 1.50, "s": ""}) == 'x: null\ny: true\nz: 1.5\ns: ""'
+
+
+def test_to_json_compact():
+    assert to_json({"a": [1, 2]}) == '{"a":[1,2]}'
+
+
+# ── parse_json_object / parse_json_array ────────────────────
+
+def test_parse_object_from_fenced_reply():
+    text = 'Here you go:\n```json\n{"next": "DORA_Pro"}\n```'
+    assert parse_json_object(text) == {"next": "DORA_Pro"}
+
+
+def test_parse_object_skips_invalid_candidates():
+    text = "Set {not json} aside; answer: {\"ok\": true, \"note\": \"a } b\"}"
+    assert parse_json_object(text) == {"ok": True, "note": "a } b"}
+
+
+def test_parse_object_bare_and_missing():
+    assert parse_json_object('  {"a": 1}  ') == {"a": 1}
+    assert parse_json_object("no json here") == {}
+    assert parse_json_object("[1, 2]") == {}
+
+
+def test_parse_array_from_prose():
+    assert parse_json_array('Points: ["one", "two"] done') == ["one", "two"]
+    assert parse_json_array('{"items": [3]}') == [3]
+    assert parse_json_array("nothing") == []
+
+
+# ── prune_payload / parse_metadata ──────────────────────────
+
+def test_prune_limits():
+    pruned = prune_payload({"s": "x" * 10, "l": list(range(5))}, max_items=2, max_str=4)
+    assert pruned == {"s": "xxxx…", "l": [0, 1, "… +3 more"]}
+
+
+def test_prune_depth():
+    pruned = prune_payload({"a": {"b": {"c": 1}}, "l": [[1, 2]]}, max_depth=1)
+    assert pruned == {"a": "{…1 keys}", "l": "[…1 items]"}
+
+
+def test_parse_metadata_json_string():
+    assert parse_metadata('{"lines_added": 12}') == {"lines_added": 12}
+
+
+def test_parse_metadata_plain_text():
+    assert parse_metadata("") == ""
+    assert parse_metadata("plain note") == "plain note"
+
+
+def test_parse_metadata_bytes():
+    assert parse_metadata(b'{"a": 1}') == {"a": 1}
+    assert parse_metadata(b"raw blob") == "raw blob"
@@ -9,13 +9,15 @@ Tables:
     dora_daily_metrics  – 65 rows of daily DORA-style aggregates per project
 """
 
-import json
 from typing import Optional, List, Dict, Any
 from datetime import datetime, date
 from langchain_core.tools import tool
 
 from agents.utils.logger import get_logger, log_tool_call, log_db_query
 from agents.utils.db_clients import get_clickhouse_client
+from agents.utils.serialization import parse_metadata
+
+_INF = float("inf")
 
 logger = get_logger(__name__, "CLICKHOUSE_TOOLS")
 
@@ -39,6 +41,33 @@ def _serialise_ch(rows: List[Dict]) -> List[Dict]:
     return out
 
 
+def _column_converter(values: list):
+    """Pick the JSON-safety conversion for a column from its first non-null value."""
+    sample = next((v for v in values if v is not None), None)
+    if isinstance(sample, (datetime, date)):
+        return lambda v: v.isoformat() if v is not None else None
+    if isinstance(sample, float):  # before the hex check: floats have .hex()
+        return lambda v: None if v is None or v != v or v in (_INF, -_INF) else v
+    if hasattr(sample, "hex"):
+        return lambda v: str(v) if v is not None else None
+    return None
+
+
+def _rows_from_columns(columns: Dict[str, list]) -> List[Dict]:
+    """
+    Convert a column-oriented result to JSON-safe row dicts.
+
+    Same conversions as ``_serialise_ch``, but the type check runs once per
+    column rather than once per cell; rows are only assembled at the end.
+    """
+    for name, values in columns.items():
+        convert = _column_converter(values)
+        if convert is not None:
+            columns[name] = [convert(v) for v in values]
+    names = list(columns)
+    return [dict(zip(names, row)) for row in zip(*columns.values())]
+
+
 @tool
 def query_events(
     event_type: Optional[str] = None,
@@ -63,35 +92,38 @@ def query_events(
         List of event records with event_id, timestamp, source, event_type,
         project_id, actor_id, entity_id, entity_type, and metadata.
     """
-    logger.debug(f"query_events: type={event_type}, actor={actor_id}, project={project_id}, days={days_back}")
+    logger.debug("query_events: type=%s, actor=%s, project=%s, days=%s", event_type, actor_id, project_id, days_back)
 
     try:
         ch = get_clickhouse_client()
 
-        query = f"SELECT * FROM events WHERE timestamp >= now() - INTERVAL {int(days_back)} DAY"
+        # Values are bound server-side ({name:Type}), never spliced into the SQL
+        query = "SELECT * FROM events WHERE timestamp >= now() - INTERVAL {days:UInt32} DAY"
+        params: Dict[str, Any] = {"days": int(days_back), "limit": int(limit)}
 
         if event_type:
-            query += f" AND event_type = '{event_type}'"
+            query += " AND event_type = {event_type:String}"
+            params["event_type"] = event_type
         if actor_id:
-            query += f" AND actor_id = '{actor_id}'"
+            query += " AND actor_id = {actor_id:String}"
+            params["actor_id"] = actor_id
         if project_id and project_id.lower() != "string":
-            query += f" AND project_id = '{project_id}'"
+            query += " AND project_id = {project_id:String}"
+            params["project_id"] = project_id
         if source:
-            query += f" AND source = '{source}'"
+            query += " AND source = {source:String}"
+            params["source"] = source
 
-        query += f" ORDER BY timestamp DESC LIMIT {int(limit)}"
+        query += " ORDER BY timestamp DESC LIMIT {limit:UInt32}"
 
-        log_db_query(logger, "clickhouse", query, {})
-        results = ch.execute_query(query)
+        log_db_query(logger, "clickhouse", query, params)
+        columns = ch.execute_columns(query, params)
 
-        events = _serialise_ch(results)
-        # Parse metadata JSON strings
-        for evt in events:
-            if isinstance(evt.get("metadata"), str):
-                try:
-                    evt["metadata"] = json.loads(evt["metadata"])
-                except (json.JSONDecodeError, TypeError):
-                    pass
+        # Parse metadata JSON strings; raw webhook blobs are pruned so a
+        # 100-event result doesn't flood the agent's context
+        if "metadata" in columns:
+            columns["metadata"] = [parse_metadata(m) for m in columns["metadata"]]
+        events = _rows_from_columns(columns)
 
         log_tool_call(logger, "query_events", {"type": event_type, "days": days_back}, f"{len(events)} events")
         return events
@@ -122,37 +154,55 @@ def get_deployment_metrics(
     Returns:
         Dict with DORA metrics and a per-project breakdown.
     """
-    logger.debug(f"get_deployment_metrics: project={project_id}, days={days_back}")
+    logger.debug("get_deployment_metrics: project=%s, days=%s", project_id, days_back)
 
     try:
         ch = get_clickhouse_client()
 
-        where = f"WHERE date >= today() - {int(days_back)}"
+        where = "WHERE date >= today() - {days:UInt32}"
+        params: Dict[str, Any] = {"days": int(days_back)}
         if project_id and project_id.lower() != "string":
-            where += f" AND project_id = '{project_id}'"
+            where += " AND project_id = {project_id:String}"
+            params["project_id"] = project_id
 
-        # Aggregate metrics
+        # Aggregate metrics. Per-project derived values (failure rate, weekly
+        # frequency, NaN/Inf-safe lead time) are computed by ClickHouse.
         agg_query = f"""
             SELECT
                 project_id,
-                sum(deployments)                AS total_deployments,
-                sum(failed_deployments)         AS total_failed,
-                avg(avg_lead_time_hours)        AS avg_lead_time_hours,
-                sum(prs_merged)                 AS total_prs_merged,
-                sum(commits)                    AS total_commits,
-                sum(story_points_completed)     AS total_story_points,
-                count()                         AS days_tracked
-            FROM dora_daily_metrics
-            {where}
-            GROUP BY project_id
-            ORDER BY total_deployments DESC
+                deployments,
+                failed_deployments,
+                round(if(deployments > 0, failed_deployments / deployments * 100, 0), 1)
+                                                AS change_failure_rate_pct,
+                round(deployments / greatest(days_tracked / 7, 1), 1)
+                                                AS deployment_freq_per_week,
+                if(isFinite(lead_time), round(lead_time, 1), NULL)
+                                                AS avg_lead_time_hours,
+                if(isFinite(lead_time), lead_time, NULL) AS raw_lead_time,
+                prs_merged,
+                commits,
+                story_points
+            FROM (
+                SELECT
+                    project_id,
+                    toInt64(sum(deployments))             AS deployments,
+                    toInt64(sum(failed_deployments))      AS failed_deployments,
+                    avg(avg_lead_time_hours)              AS lead_time,
+                    toInt64(sum(prs_merged))              AS prs_merged,
+                    toInt64(sum(commits))                 AS commits,
+                    toInt64(sum(story_points_completed))  AS story_points,
+                    count()                               AS days_tracked
+                FROM dora_daily_metrics
+                {where}
+                GROUP BY project_id
+            )
+            ORDER BY deployments DESC
         """
 
         log_db_query(logger, "clickhouse", "DORA metrics aggregate", {"project": project_id, "days": days_back})
-        rows = ch.execute_query(agg_query)
-        rows = _serialise_ch(rows)
+        rows = ch.execute_query(agg_query, params)
 
-        # Build per-project breakdown
+        # Per-project breakdown comes back ready to use; only totals are summed here
         projects: List[Dict] = []
         total_deps = 0
         total_failed = 0
@@ -162,48 +212,20 @@ def get_deployment_metrics(
         lead_times: List[float] = []
 
         for r in rows:
-            deps = int(r.get("total_deployments", 0))
-            failed = int(r.get("total_failed", 0))
-            days_tracked = int(r.get("days_tracked", 1))
-            lt_raw = r.get("avg_lead_time_hours")
-
-            # ClickHouse may return NaN as None (after _serialise_ch) or as str
-            import math
-            try:
-                lt = float(lt_raw) if lt_raw is not None else None
-                if lt is not None and (math.isnan(lt) or math.isinf(lt)):
-                    lt = None
-            except (ValueError, TypeError):
-                lt = None
-
-            cfr = (failed / deps * 100) if deps > 0 else 0.0
-            freq_per_week = deps / max(days_tracked / 7, 1)
-
-            proj_metrics = {
-                "project_id": r["project_id"],
-                "deployments": deps,
-                "failed_deployments": failed,
-                "change_failure_rate_pct": round(cfr, 1),
-                "deployment_freq_per_week": round(freq_per_week, 1),
-                "avg_lead_time_hours": round(lt, 1) if lt is not None else None,
-                "prs_merged": int(r.get("total_prs_merged", 0)),
-                "commits": int(r.get("total_commits", 0)),
-                "story_points": int(r.get("total_story_points", 0)),
-            }
-            projects.append(proj_metrics)
-
-            total_deps += deps
-            total_failed += failed
-            total_prs += int(r.get("total_prs_merged", 0))
-            total_commits += int(r.get("total_commits", 0))
-            total_sp += int(r.get("total_story_points", 0))
+            lt = r.pop("raw_lead_time")
+            projects.append(r)
+
+            total_deps += r["deployments"]
+            total_failed += r["failed_deployments"]
+            total_prs += r["prs_merged"]
+            total_commits += r["commits"]
+            total_sp += r["story_points"]
             if lt is not None:
                 lead_times.append(lt)
 
         # Overall summary
         overall_cfr = (total_failed / total_deps * 100) if total_deps > 0 else 0.0
-        valid_lead_times = [lt for lt in lead_times if lt is not None]
-        overall_lt = sum(valid_lead_times) / len(valid_lead_times) if valid_lead_times else None
+        overall_lt = sum(lead_times) / len(lead_times) if lead_times else None
 
         result = {
             "period_days": days_back,
@@ -225,6 +247,48 @@ def get_deployment_metrics(
         return {"error": str(e)}
 
 
+# Per-actor activity breakdown. Each row is weighted by {n}: 1 over raw
+# events (so sumIf == countIf) or cnt over the events_daily_by_actor rollup.
+_ACTIVITY_QUERY = """
+    SELECT
+        actor_id,
+        sumIf({n}, event_type = 'commit')      AS commits,
+        sumIf({n}, event_type = 'pr_merged')   AS prs_merged,
+        sumIf({n}, event_type = 'pr_reviewed') AS prs_reviewed,
+        sumIf({n}, event_type = 'deploy')      AS deploys,
+        sum({n})                               AS total_events,
+        groupUniqArray(project_id)             AS active_projects,
+        groupUniqArray(source)                 AS sources
+    FROM {source}
+    {where}
+    GROUP BY actor_id
+    ORDER BY total_events DESC
+"""
+
+_ROLLUP_TABLE = "events_daily_by_actor"
+_rollup_available: Optional[bool] = None
+
+
+def _has_rollup(ch) -> bool:
+    """
+    Whether the daily rollup exists (scripts/create_clickhouse_rollups.py).
+
+    Looked up in system.tables once per process, so a deployment without the
+    rollup never pays a failing query, and errors from a real rollup query
+    are not mistaken for "table missing". Restart after creating it.
+    """
+    global _rollup_available
+    if _rollup_available is None:
+        rows = ch.execute_query(
+            "SELECT count() AS c FROM system.tables "
+            "WHERE database = currentDatabase() AND name = {name:String}",
+            {"name": _ROLLUP_TABLE},
+        )
+        _rollup_available = bool(rows and rows[0]["c"])
+        logger.info(f"Activity rollup {'found' if _rollup_available else 'not found'}: {_ROLLUP_TABLE}")
+    return _rollup_available
+
+
 @tool
 def get_developer_activity(
     actor_id: Optional[str] = None,
@@ -244,35 +308,38 @@ def get_developer_activity(
     Returns:
         List of activity summaries per developer with event breakdowns.
     """
-    logger.debug(f"get_developer_activity: actor={actor_id}, project={project_id}, days={days_back}")
+    logger.debug("get_developer_activity: actor=%s, project=%s, days=%s", actor_id, project_id, days_back)
 
     try:
         ch = get_clickhouse_client()
 
-        where = f"WHERE timestamp >= now() - INTERVAL {int(days_back)} DAY"
+        params: Dict[str, Any] = {"days": int(days_back)}
+        filters = ""
         if actor_id:
-            where += f" AND actor_id = '{actor_id}'"
+            filters += " AND actor_id = {actor_id:String}"
+            params["actor_id"] = actor_id
         if project_id and project_id.lower() != "string":
-            where += f" AND project_id = '{project_id}'"
-
-        query = f"""
-            SELECT
-                actor_id,
-                countIf(event_type = 'commit')      AS commits,
-                countIf(event_type = 'pr_merged')    AS prs_merged,
-                countIf(event_type = 'pr_reviewed')  AS prs_reviewed,
-                countIf(event_type = 'deploy')       AS deploys,
-                count()                              AS total_events,
-                groupUniqArray(project_id)           AS active_projects,
-                groupUniqArray(source)               AS sources
-            FROM events
-            {where}
-            GROUP BY actor_id
-            ORDER BY total_events DESC
-        """
+            filters += " AND project_id = {project_id:String}"
+            params["project_id"] = project_id
 
         log_db_query(logger, "clickhouse", "developer activity aggregate", {"actor": actor_id, "days": days_back})
-        rows = ch.execute_query(query)
+        # Both paths cut off on whole calendar days, so the counts are the
+        # same whether or not the rollup exists
+        if _has_rollup(ch):
+            # Daily rollup: a handful of pre-counted rows per actor-day
+            # instead of every raw event
+            query = _ACTIVITY_QUERY.format(
+                n="cnt",
+                source=_ROLLUP_TABLE,
+                where="WHERE day >= today() - {days:UInt32}" + filters,
+            )
+        else:
+            query = _ACTIVITY_QUERY.format(
+                n="1",
+                source="events",
+                where="WHERE toDate(timestamp) >= today() - {days:UInt32}" + filters,
+            )
+        rows = ch.execute_query(query, params)
         activities = _serialise_ch(rows)
 
         log_tool_call(
@@ -16,9 +16,16 @@ Usage:
     vecs = get_embeddings(["text1", "text2", "text3"])
 """
 
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Optional
+import hashlib
 import os
-import numpy as np
+import random
+import threading
+import time
+
+from urllib3.exceptions import HTTPError as TransportError
 
 from agents.utils.logger import get_logger, log_embedding_call
 
@@ -29,6 +36,19 @@ logger = get_logger(__name__, "EMBEDDINGS")
 EMBEDDING_MODEL_NAME = "llama-text-embed-v2"
 EMBEDDING_DIM = 1024
 
+# Max embed requests in flight at once when a call spans several batches
+_MAX_CONCURRENT_BATCHES = max(1, int(os.getenv("EMBEDDING_MAX_CONCURRENCY", "4")))
+
+# Each batch request is retried on its own (rate limits, transient 5xx)
+_BATCH_ATTEMPTS = 3
+_RETRY_BASE_DELAY = 0.5  # seconds, doubled per attempt
+
+# Embeddings are deterministic, so vectors are cached in-process keyed by
+# the SHA-256 of the text (a fixed 32-byte key however long the passage is)
+_CACHE_SIZE = int(os.getenv("EMBEDDING_CACHE_SIZE", "4096"))
+_vector_cache: "OrderedDict[bytes, tuple]" = OrderedDict()
+_cache_lock = threading.Lock()
+
 # Lazy-loaded Pinecone client
 _pinecone_client = None
 
@@ -53,7 +73,8 @@ def get_embedding(text: str) -> List[float]:
     """
     Generate a single embedding vector for a text string.
 
-    Uses the Pinecone Inference API with llama-text-embed-v2.
+    Uses the Pinecone Inference API with llama-text-embed-v2. Repeated texts
+    (the same search query asked again) are served from the vector cache.
 
     Args:
         text: The text to embed.
@@ -61,14 +82,89 @@ def get_embedding(text: str) -> List[float]:
     Returns:
         List of floats with length EMBEDDING_DIM (1024).
     """
-    vecs = get_embeddings([text])
-    return vecs[0]
+    return get_embeddings([text])[0]
+
+
+def _text_key(text: str) -> bytes:
+    return hashlib.sha256(text.encode("utf-8")).digest()
+
+
+def _cache_get(keys: List[bytes]) -> dict:
+    """Return ``{key: vector}`` for the keys already cached, refreshing their recency."""
+    hits = {}
+    with _cache_lock:
+        for key in keys:
+            vec = _vector_cache.get(key)
+            if vec is not None:
+                _vector_cache.move_to_end(key)
+                hits[key] = vec
+    return hits
+
+
+def _cache_put(items) -> None:
+    with _cache_lock:
+        for key, vec in items:
+            # Stored as a tuple so callers can't mutate a cached vector
+            _vector_cache[key] = tuple(vec)
+            _vector_cache.move_to_end(key)
+        while len(_vector_cache) > _CACHE_SIZE:
+            _vector_cache.popitem(last=False)
+
+
+def _is_retryable(e: Exception) -> bool:
+    """Rate limits, 5xx and connection failures; other 4xx and bad input never succeed."""
+    status = getattr(e, "status", None)
+    if isinstance(status, int):
+        return status == 429 or status >= 500
+    return isinstance(e, (ConnectionError, TimeoutError, TransportError))
+
+
+def _embed_request(texts: List[str]) -> List[List[float]]:
+    for attempt in range(_BATCH_ATTEMPTS):
+        try:
+            response = _get_client().inference.embed(
+                model=EMBEDDING_MODEL_NAME,
+                inputs=[{"text": t} for t in texts],
+                parameters={"input_type": "passage", "truncate": "END"},
+            )
+            return [item["values"] for item in response.data]
+        except Exception as e:
+            if attempt == _BATCH_ATTEMPTS - 1 or not _is_retryable(e):
+                raise
+            # Jitter keeps concurrent batches from retrying in lockstep
+            delay = _RETRY_BASE_DELAY * 2 ** attempt + random.uniform(0, 0.05)
+            logger.warning(f"Embed request failed ({e}); retrying in {delay:.2f}s")
+            time.sleep(delay)
+
+
+def _embed_batch(texts: List[str]) -> List[List[float]]:
+    """
+    One Pinecone Inference request for up to 96 texts.
+
+    If the response doesn't carry exactly one vector per input, the vectors
+    can't be matched back to their texts, so the batch is re-sent one text
+    at a time.
+    """
+    vecs = _embed_request(texts)
+    if len(vecs) == len(texts):
+        return vecs
+    logger.warning(
+        f"Batch embed returned {len(vecs)} vectors for {len(texts)} inputs; "
+        f"retrying per text"
+    )
+    return [_embed_request([t])[0] for t in texts]
 
 
 def get_embeddings(texts: List[str], batch_size: int = 96) -> List[List[float]]:
     """
     Generate embedding vectors for multiple texts via Pinecone Inference.
 
+    Batches are I/O-bound HTTP calls, so when there is more than one they
+    are dispatched concurrently (up to ``_MAX_CONCURRENT_BATCHES`` in flight);
+    the output order always matches ``texts``. Repeated texts are sent to
+    the API once and their vector is reused for every occurrence; texts
+    embedded by an earlier call are served from the vector cache.
+
     Args:
         texts: List of texts to embed.
         batch_size: Texts per API call (Pinecone supports up to 96).
@@ -79,27 +175,38 @@ def get_embeddings(texts: List[str], batch_size: int = 96) -> List[List[float]]:
     if not texts:
         return []
 
-    pc = _get_client()
-
-    all_vecs: List[List[float]] = []
-
-    # Process in batches (Pinecone limit is 96 inputs per request)
-    for i in range(0, len(texts), batch_size):
-        batch = texts[i : i + batch_size]
-        response = pc.inference.embed(
-            model=EMBEDDING_MODEL_NAME,
-            inputs=[{"text": t} for t in batch],
-            parameters={"input_type": "passage", "truncate": "END"},
-        )
-        for item in response.data:
-            all_vecs.append(item["values"])
-
-    log_embedding_call(logger, EMBEDDING_MODEL_NAME, len(texts), EMBEDDING_DIM)
+    # Embed each distinct text once (dict keeps first-seen order)
+    keys = {t: _text_key(t) for t in texts}
+    by_key = _cache_get(list(keys.values()))
+    missing = [t for t, k in keys.items() if k not in by_key]
+
+    if missing:
+        # Initialise the client up front so worker threads never race on it
+        _get_client()
+
+        # Process in batches (Pinecone limit is 96 inputs per request)
+        batches = [missing[i : i + batch_size] for i in range(0, len(missing), batch_size)]
+        if len(batches) == 1:
+            results = [_embed_batch(batches[0])]
+        else:
+            workers = min(len(batches), _MAX_CONCURRENT_BATCHES)
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(_embed_batch, batches))
+
+        fresh = [(keys[t], vec) for t, vec in zip(missing, (v for b in results for v in b))]
+        _cache_put(fresh)
+        by_key.update(fresh)
+        log_embedding_call(logger, EMBEDDING_MODEL_NAME, len(missing), EMBEDDING_DIM)
+
+    all_vecs: List[List[float]] = [list(by_key[keys[t]]) for t in texts]
     return all_vecs
 
 
 def cosine_similarity(a: List[float], b: List[float]) -> float:
     """Compute cosine similarity between two vectors (for debugging/validation)."""
+    # Only this debugging helper needs numpy; keep it out of module import
+    import numpy as np
+
     a_np = np.array(a)
     b_np = np.array(b)
     return float(np.dot(a_np, b_np) / (np.linalg.norm(a_np) * np.linalg.norm(b_np)))
@@ -24,19 +24,13 @@ def get_collaborators(developer_name: str, relationship_type: Optional[str] = No
     Returns:
         List of collaborators with collaboration strength and type.
     """
-    logger.debug(f"get_collaborators called: name={developer_name}, type={relationship_type}")
+    logger.debug("get_collaborators called: name=%s, type=%s", developer_name, relationship_type)
     
     try:
         neo4j = get_neo4j_client()
         
-        # Check if we have developer nodes
-        check_query = "MATCH (n) RETURN labels(n) as labels LIMIT 5"
-        check_results = neo4j.execute_query(check_query)
-        
-        if not check_results or not any('Developer' in str(r.get('labels', [])) for r in check_results):
-            logger.info("No Developer nodes found, returning synthetic collaboration data")
-            return _get_synthetic_collaborators(developer_name)
-        
+        # No separate label probe: without Developer nodes the match is empty
+        # and we fall back to synthetic data below.
         query = """
             MATCH (d:Developer {name: $name})-[r:COLLABORATES_WITH]-(other:Developer)
             RETURN other.name as collaborator, 
@@ -60,29 +54,31 @@ def get_collaborators(developer_name: str, relationship_type: Optional[str] = No
         return _get_synthetic_collaborators(developer_name)
 
 
+# Demo fallback data, keyed by a lowercase name fragment
+_SYNTHETIC_COLLABORATORS = {
+    "priya": [
+        {"collaborator": "Alex Kumar", "strength": 0.92, "collaboration_type": "code_review", "shared_projects": ["API Gateway v2"]},
+        {"collaborator": "Rahul Verma", "strength": 0.78, "collaboration_type": "pr_collaboration", "shared_projects": ["Auth Service"]},
+        {"collaborator": "Sarah Chen", "strength": 0.65, "collaboration_type": "mentioned", "shared_projects": ["Customer Dashboard"]},
+    ],
+    "alex": [
+        {"collaborator": "Priya Sharma", "strength": 0.92, "collaboration_type": "code_review", "shared_projects": ["API Gateway v2"]},
+        {"collaborator": "Rahul Verma", "strength": 0.85, "collaboration_type": "pair_programming", "shared_projects": ["API Gateway v2", "Infrastructure"]},
+    ],
+    "rahul": [
+        {"collaborator": "Alex Kumar", "strength": 0.85, "collaboration_type": "pair_programming", "shared_projects": ["Infrastructure"]},
+        {"collaborator": "Priya Sharma", "strength": 0.78, "collaboration_type": "pr_collaboration", "shared_projects": ["Auth Service"]},
+        {"collaborator": "Mike Johnson", "strength": 0.72, "collaboration_type": "code_review", "shared_projects": ["Customer Dashboard"]},
+    ],
+}
+
+
 def _get_synthetic_collaborators(developer_name: str) -> List[Dict[str, Any]]:
     """Generate synthetic collaboration data for demo."""
-    collaborations = {
-        "priya": [
-            {"collaborator": "Alex Kumar", "strength": 0.92, "collaboration_type": "code_review", "shared_projects": ["API Gateway v2"]},
-            {"collaborator": "Rahul Verma", "strength": 0.78, "collaboration_type": "pr_collaboration", "shared_projects": ["Auth Service"]},
-            {"collaborator": "Sarah Chen", "strength": 0.65, "collaboration_type": "mentioned", "shared_projects": ["Customer Dashboard"]},
-        ],
-        "alex": [
-            {"collaborator": "Priya Sharma", "strength": 0.92, "collaboration_type": "code_review", "shared_projects": ["API Gateway v2"]},
-            {"collaborator": "Rahul Verma", "strength": 0.85, "collaboration_type": "pair_programming", "shared_projects": ["API Gateway v2", "Infrastructure"]},
-        ],
-        "rahul": [
-            {"collaborator": "Alex Kumar", "strength": 0.85, "collaboration_type": "pair_programming", "shared_projects": ["Infrastructure"]},
-            {"collaborator": "Priya Sharma", "strength": 0.78, "collaboration_type": "pr_collaboration", "shared_projects": ["Auth Service"]},
-            {"collaborator": "Mike Johnson", "strength": 0.72, "collaboration_type": "code_review", "shared_projects": ["Customer Dashboard"]},
-        ],
-    }
-    
     name_lower = developer_name.lower()
-    for key in collaborations:
+    for key, collaborators in _SYNTHETIC_COLLABORATORS.items():
         if key in name_lower:
-            return collaborations[key]
+            return [dict(c) for c in collaborators]
     
     # Default
     return [
@@ -101,7 +97,7 @@ def get_team_collaboration_graph(team_name: str) -> Dict[str, Any]:
     Returns:
         Graph structure with nodes (developers) and edges (collaborations).
     """
-    logger.debug(f"get_team_collaboration_graph called: team={team_name}")
+    logger.debug("get_team_collaboration_graph called: team=%s", team_name)
     
     try:
         neo4j = get_neo4j_client()
@@ -181,7 +177,7 @@ def find_knowledge_experts(topic: str, limit: int = 5) -> List[Dict[str, Any]]:
     Returns:
         List of experts with their expertise level and relevant contributions.
     """
-    logger.debug(f"find_knowledge_experts called: topic={topic}, limit={limit}")
+    logger.debug("find_knowledge_experts called: topic=%s, limit=%s", topic, limit)
     
     try:
         neo4j = get_neo4j_client()
@@ -210,35 +206,36 @@ def find_knowledge_experts(topic: str, limit: int = 5) -> List[Dict[str, Any]]:
         return _get_synthetic_experts(topic)
 
 
+# Demo fallback data, keyed by a lowercase topic fragment
+_SYNTHETIC_EXPERTS = {
+    "api": [
+        {"expert": "Priya Sharma", "topic": "API Design", "expertise_level": "senior", "contributions": 45},
+        {"expert": "Alex Kumar", "topic": "REST APIs", "expertise_level": "intermediate", "contributions": 28},
+    ],
+    "kubernetes": [
+        {"expert": "Rahul Verma", "topic": "Kubernetes", "expertise_level": "senior", "contributions": 52},
+    ],
+    "react": [
+        {"expert": "Priya Sharma", "topic": "React/TypeScript", "expertise_level": "senior", "contributions": 67},
+        {"expert": "Sarah Chen", "topic": "React Components", "expertise_level": "intermediate", "contributions": 34},
+    ],
+    "database": [
+        {"expert": "Alex Kumar", "topic": "PostgreSQL", "expertise_level": "senior", "contributions": 38},
+        {"expert": "Rahul Verma", "topic": "Database Optimization", "expertise_level": "intermediate", "contributions": 22},
+    ],
+    "auth": [
+        {"expert": "Priya Sharma", "topic": "Authentication", "expertise_level": "senior", "contributions": 29},
+        {"expert": "Alex Kumar", "topic": "OAuth/JWT", "expertise_level": "intermediate", "contributions": 15},
+    ],
+}
+
+
 def _get_synthetic_experts(topic: str) -> List[Dict[str, Any]]:
     """Generate synthetic expert data for demo."""
     topic_lower = topic.lower()
-    
-    expert_map = {
-        "api": [
-            {"expert": "Priya Sharma", "topic": "API Design", "expertise_level": "senior", "contributions": 45},
-            {"expert": "Alex Kumar", "topic": "REST APIs", "expertise_level": "intermediate", "contributions": 28},
-        ],
-        "kubernetes": [
-            {"expert": "Rahul Verma", "topic": "Kubernetes", "expertise_level": "senior", "contributions": 52},
-        ],
-        "react": [
-            {"expert": "Priya Sharma", "topic": "React/TypeScript", "expertise_level": "senior", "contributions": 67},
-            {"expert": "Sarah Chen", "topic": "React Components", "expertise_level": "intermediate", "contributions": 34},
-        ],
-        "database": [
-            {"expert": "Alex Kumar", "topic": "PostgreSQL", "expertise_level": "senior", "contributions": 38},
-            {"expert": "Rahul Verma", "topic": "Database Optimization", "expertise_level": "intermediate", "contributions": 22},
-        ],
-        "auth": [
-            {"expert": "Priya Sharma", "topic": "Authentication", "expertise_level": "senior", "contributions": 29},
-            {"expert": "Alex Kumar", "topic": "OAuth/JWT", "expertise_level": "intermediate", "contributions": 15},
-        ],
-    }
-    
-    for key, experts in expert_map.items():
+    for key, experts in _SYNTHETIC_EXPERTS.items():
         if key in topic_lower:
-            return experts
+            return [dict(e) for e in experts]
     
     return [{"message": f"No specific experts found for '{topic}'", "suggestion": "Try related terms or check team expertise"}]
 
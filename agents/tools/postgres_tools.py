@@ -67,7 +67,7 @@ def get_developer(
         Developer information including id, full_name, email, title, role,
         team, hourly_rate, level, and location.  Returns empty dict if not found.
     """
-    logger.debug(f"get_developer called: id={developer_id}, email={email}, name={name}")
+    logger.debug("get_developer called: id=%s, email=%s, name=%s", developer_id, email, name)
 
     try:
         pg = get_postgres_client()
@@ -122,7 +122,7 @@ def list_developers(
     Returns:
         List of developer records with their team information.
     """
-    logger.debug(f"list_developers called: team={team_name}, role={role}, limit={limit}")
+    logger.debug("list_developers called: team=%s, role=%s, limit=%s", team_name, role, limit)
 
     try:
         pg = get_postgres_client()
@@ -179,7 +179,7 @@ def get_project(
         Project information including id, name, description, status, priority,
         target_date, and list of assigned developers with their allocation.
     """
-    logger.debug(f"get_project called: id={project_id}, name={name}, jira_key={jira_key}")
+    logger.debug("get_project called: id=%s, name=%s, jira_key=%s", project_id, name, jira_key)
 
     try:
         pg = get_postgres_client()
@@ -191,14 +191,20 @@ def get_project(
             query = "SELECT * FROM projects WHERE jira_project_key = %s"
             params = (jira_key,)
         elif name:
-            query = "SELECT * FROM projects WHERE name ILIKE %s"
-            params = (f"%{name}%",)
+            # Exact case-insensitive name (lower(name) index) before substring
+            query = "SELECT * FROM projects WHERE lower(name) = lower(%s)"
+            params = (name,)
         else:
             logger.warning("get_project called without any search criteria")
             return {"error": "Must provide project_id, name, or jira_key"}
 
         log_db_query(logger, "postgres", query, params)
         results = pg.execute_query(query, params)
+        if not results and name and not (project_id or jira_key):
+            query = "SELECT * FROM projects WHERE name ILIKE %s"
+            params = (f"%{name}%",)
+            log_db_query(logger, "postgres", query, params)
+            results = pg.execute_query(query, params)
 
         if results:
             project = _serialise(dict(results[0]))
@@ -239,7 +245,7 @@ def list_projects(status: Optional[str] = None, priority: Optional[str] = None,
     Returns:
         List of projects with basic information.
     """
-    logger.debug(f"list_projects called: status={status}, priority={priority}, limit={limit}")
+    logger.debug("list_projects called: status=%s, priority=%s, limit=%s", status, priority, limit)
     
     try:
         pg = get_postgres_client()
@@ -255,9 +261,10 @@ def list_projects(status: Optional[str] = None, priority: Optional[str] = None,
             query += " AND priority = %s"
             params.append(priority)
         
-        query += f" ORDER BY priority DESC, target_date ASC LIMIT {limit}"
+        query += " ORDER BY priority DESC, target_date ASC LIMIT %s"
+        params.append(limit)
         
-        results = pg.execute_query(query, tuple(params) if params else None)
+        results = pg.execute_query(query, tuple(params))
         
         projects = [{**dict(r), 'id': str(r['id'])} for r in results]
         log_tool_call(logger, "list_projects", {"status": status, "priority": priority}, f"{len(projects)} results")
@@ -283,7 +290,7 @@ def get_team(
     Returns:
         Team information including id, name, list of members, and member count.
     """
-    logger.debug(f"get_team called: id={team_id}, name={name}")
+    logger.debug("get_team called: id=%s, name=%s", team_id, name)
 
     try:
         pg = get_postgres_client()
@@ -339,7 +346,7 @@ def get_developer_workload(developer_id: str) -> Dict[str, Any]:
         Developer info with list of project assignments, total allocation
         percentage, and capacity flags.
     """
-    logger.debug(f"get_developer_workload called: developer_id={developer_id}")
+    logger.debug("get_developer_workload called: developer_id=%s", developer_id)
 
     try:
         pg = get_postgres_client()
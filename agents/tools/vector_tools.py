@@ -39,6 +39,21 @@ def _serialise(row: Dict) -> Dict:
     return out
 
 
+# Cosine similarity search, prepared once per connection.
+# pgvector <=> gives cosine DISTANCE; similarity = 1 - distance
+_SEARCH_COLUMNS = """
+    SELECT id, embedding_type, source_id, source_table,
+           title, content, metadata, created_at,
+           1 - (embedding <=> $1::vector) AS similarity
+    FROM embeddings
+"""
+_SEARCH_SQL = _SEARCH_COLUMNS + " ORDER BY embedding <=> $1::vector LIMIT $2"
+_SEARCH_TYPED_SQL = (
+    _SEARCH_COLUMNS
+    + " WHERE embedding_type = $2 ORDER BY embedding <=> $1::vector LIMIT $3"
+)
+
+
 @tool
 def semantic_search(
     query: str,
@@ -63,7 +78,7 @@ def semantic_search(
         List of matching records with title, content, metadata, and
         a similarity score (0-1, higher is better).
     """
-    logger.debug(f"semantic_search: query='{query}', type={embedding_type}, limit={limit}")
+    logger.debug("semantic_search: query='%s', type=%s, limit=%s", query, embedding_type, limit)
 
     try:
         pg = get_postgres_client()
@@ -72,26 +87,13 @@ def semantic_search(
         query_vec = get_embedding(query)
         vec_literal = format_vector_for_pg(query_vec)
 
-        # Build cosine similarity search
-        # pgvector <=> gives cosine DISTANCE; similarity = 1 - distance
-        search_query = f"""
-            SELECT id, embedding_type, source_id, source_table,
-                   title, content, metadata, created_at,
-                   1 - (embedding <=> '{vec_literal}'::vector) AS similarity
-            FROM embeddings
-            WHERE 1=1
-        """
-        params: list = []
-
-        if embedding_type:
-            search_query += " AND embedding_type = %s"
-            params.append(embedding_type)
-
-        search_query += f" ORDER BY embedding <=> '{vec_literal}'::vector LIMIT %s"
-        params.append(limit)
-
         log_db_query(logger, "pgvector", "cosine similarity search", {"type": embedding_type, "limit": limit})
-        results = pg.execute_query(search_query, tuple(params))
+        if embedding_type:
+            results = pg.execute_prepared(
+                "semantic_search_typed", _SEARCH_TYPED_SQL, (vec_literal, embedding_type, limit)
+            )
+        else:
+            results = pg.execute_prepared("semantic_search", _SEARCH_SQL, (vec_literal, limit))
 
         matches = []
         for r in results:
@@ -133,7 +135,7 @@ def find_developer_by_skills(
         List of developers with full_name, email, title, team_name,
         matched profile content, and similarity score.
     """
-    logger.debug(f"find_developer_by_skills: skills='{skills}', limit={limit}")
+    logger.debug("find_developer_by_skills: skills='%s', limit=%s", skills, limit)
 
     try:
         pg = get_postgres_client()
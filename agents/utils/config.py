@@ -5,15 +5,16 @@ Loads all environment variables and provides typed access to configuration.
 
 import os
 from dataclasses import dataclass
+from functools import cached_property, lru_cache
 from typing import Optional
 from dotenv import load_dotenv
 
-from agents.utils.logger import get_logger
+from agents.utils.logger import get_logger, set_log_level, DEFAULT_LOG_LEVEL
 
 logger = get_logger(__name__, "CONFIG")
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class PostgresConfig:
     """PostgreSQL connection configuration."""
     host: str
@@ -27,7 +28,7 @@ class PostgresConfig:
         return f"postgresql://{self.user}:{self.password}@{self.host}:{self.port}/{self.database}"
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Neo4jConfig:
     """Neo4j connection configuration."""
     uri: str
@@ -36,7 +37,7 @@ class Neo4jConfig:
     database: str
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ClickHouseConfig:
     """ClickHouse connection configuration."""
     host: str
@@ -46,7 +47,7 @@ class ClickHouseConfig:
     password: str
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class FeatherlessConfig:
     """Featherless.ai LLM configuration."""
     api_key: str
@@ -57,7 +58,7 @@ class FeatherlessConfig:
     model_analytics: str
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class OpenAIConfig:
     """OpenAI LLM configuration."""
     api_key: str
@@ -65,17 +66,120 @@ class OpenAIConfig:
     model: str  # gpt-4o-mini, gpt-4o, etc.
 
 
-@dataclass
+def _required(key: str) -> str:
+    """Read a required env var; raises ValueError when unset or empty."""
+    value = os.getenv(key)
+    if not value:
+        logger.error(f"Configuration error: Required environment variable '{key}' is not set")
+        raise ValueError(f"Required environment variable '{key}' is not set")
+    return value
+
+
+def _optional(key: str, default: str = "") -> str:
+    return os.getenv(key, default)
+
+
 class Config:
-    """Main configuration container for all services."""
-    postgres: PostgresConfig
-    neo4j: Neo4jConfig
-    clickhouse: ClickHouseConfig
-    featherless: FeatherlessConfig
-    openai: OpenAIConfig
-    llm_provider: str = "openai"  # "openai" or "featherless"
-    debug: bool = False
-    log_level: str = "INFO"
+    """
+    Main configuration container for all services.
+
+    Each service section is read from the environment on first access and
+    then cached, so a process that only talks to Postgres never reads (or
+    requires) the Neo4j / ClickHouse variables. A missing required variable
+    raises ValueError when its section is first used.
+    """
+
+    def __init__(self, llm_provider: str = "openai", debug: bool = False, log_level: str = DEFAULT_LOG_LEVEL):
+        self.llm_provider = llm_provider  # "openai" or "featherless"
+        self.debug = debug
+        self.log_level = log_level
+
+    @cached_property
+    def postgres(self) -> PostgresConfig:
+        postgres = PostgresConfig(
+            host=_required("POSTGRES_HOST"),
+            port=int(_optional("POSTGRES_PORT", "5432")),
+            database=_required("POSTGRES_DATABASE"),
+            user=_required("POSTGRES_USER"),
+            password=_required("POSTGRES_PASSWORD")
+        )
+        logger.debug(f"PostgreSQL config loaded: {postgres.host}:{postgres.port}/{postgres.database}")
+        return postgres
+
+    @cached_property
+    def neo4j(self) -> Neo4jConfig:
+        neo4j = Neo4jConfig(
+            uri=_required("NEO4J_URI"),
+            username=_required("NEO4J_USERNAME"),
+            password=_required("NEO4J_PASSWORD"),
+            database=_optional("NEO4J_DATABASE", "neo4j")
+        )
+        logger.debug(f"Neo4j config loaded: {neo4j.uri}")
+        return neo4j
+
+    @cached_property
+    def clickhouse(self) -> ClickHouseConfig:
+        clickhouse = ClickHouseConfig(
+            host=_required("CLICKHOUSE_HOST"),
+            port=int(_optional("CLICKHOUSE_PORT", "8443")),
+            database=_optional("CLICKHOUSE_DATABASE", "default"),
+            username=_optional("CLICKHOUSE_USERNAME", "default"),
+            password=_required("CLICKHOUSE_PASSWORD")
+        )
+        logger.debug(f"ClickHouse config loaded: {clickhouse.host}:{clickhouse.port}")
+        return clickhouse
+
+    @cached_property
+    def featherless(self) -> FeatherlessConfig:
+        featherless = FeatherlessConfig(
+            api_key=_optional("FEATHERLESS_API_KEY", ""),
+            base_url=_optional("FEATHERLESS_BASE_URL", "https://api.featherless.ai/v1"),
+            model_primary=_optional("FEATHERLESS_MODEL_PRIMARY", "Qwen/Qwen2.5-72B-Instruct"),
+            model_code=_optional("FEATHERLESS_MODEL_CODE", "deepseek-ai/DeepSeek-Coder-V2-Instruct"),
+            model_fast=_optional("FEATHERLESS_MODEL_FAST", "NousResearch/Hermes-3-Llama-3.1-8B"),
+            model_analytics=_optional("FEATHERLESS_MODEL_ANALYTICS", "meta-llama/Llama-3.1-70B-Instruct")
+        )
+        logger.debug(f"Featherless config loaded: {featherless.base_url}")
+        return featherless
+
+    @cached_property
+    def openai(self) -> OpenAIConfig:
+        openai = OpenAIConfig(
+            api_key=_optional("OPENAI_API_KEY", ""),
+            base_url=_optional("OPENAI_BASE_URL", "https://api.openai.com/v1"),
+            model=_optional("OPENAI_MODEL", "gpt-4o-mini")
+        )
+        logger.debug(f"OpenAI config loaded: model={openai.model}")
+        return openai
+
+    @cached_property
+    def llm_endpoint(self) -> tuple[str, Optional[str]]:
+        """
+        ``(api_key, base_url)`` for the configured provider, resolved once.
+
+        ``base_url`` is None for the stock OpenAI endpoint so the client
+        uses its built-in default. Raises ValueError when OpenAI is the
+        active provider and OPENAI_API_KEY is unset; model-name lookups
+        (``primary_model``) don't need the key and never raise.
+        """
+        if self.llm_provider == "openai":
+            if not self.openai.api_key:
+                error_msg = (
+                    "LLM_PROVIDER is 'openai' but OPENAI_API_KEY is not set. Please set the API key "
+                    "in .env or switch LLM_PROVIDER to 'featherless'."
+                )
+                logger.error(error_msg)
+                raise ValueError(error_msg)
+            base_url = self.openai.base_url
+            return self.openai.api_key, None if base_url == "https://api.openai.com/v1" else base_url
+        return self.featherless.api_key, self.featherless.base_url
+
+    @property
+    def primary_model(self) -> str:
+        """Default chat model for the configured provider."""
+        if self.llm_provider == "openai":
+            return self.openai.model
+        return self.featherless.model_primary
 
 
 def load_config(env_path: Optional[str] = None) -> Config:
@@ -88,8 +192,8 @@ def load_config(env_path: Optional[str] = None) -> Config:
     Returns:
         Config object with all settings loaded.
     
-    Raises:
-        ValueError: If required environment variables are missing.
+    Required variables are checked when the section that needs them is
+    first accessed (``config.postgres`` etc.), which raises ValueError.
     """
     # Find and load .env file
     if env_path:
@@ -115,91 +219,27 @@ def load_config(env_path: Optional[str] = None) -> Config:
                 load_dotenv(datathon_env)
                 logger.info(f"Loaded environment from: {datathon_env}")
     
-    # Helper to get required env var
-    def get_required(key: str) -> str:
-        value = os.getenv(key)
-        if not value:
-            raise ValueError(f"Required environment variable '{key}' is not set")
-        return value
-    
-    # Helper to get optional env var with default
-    def get_optional(key: str, default: str = "") -> str:
-        return os.getenv(key, default)
-    
-    # Build configuration objects
-    try:
-        postgres = PostgresConfig(
-            host=get_required("POSTGRES_HOST"),
-            port=int(get_optional("POSTGRES_PORT", "5432")),
-            database=get_required("POSTGRES_DATABASE"),
-            user=get_required("POSTGRES_USER"),
-            password=get_required("POSTGRES_PASSWORD")
-        )
-        logger.debug(f"PostgreSQL config loaded: {postgres.host}:{postgres.port}/{postgres.database}")
-        
-        neo4j = Neo4jConfig(
-            uri=get_required("NEO4J_URI"),
-            username=get_required("NEO4J_USERNAME"),
-            password=get_required("NEO4J_PASSWORD"),
-            database=get_optional("NEO4J_DATABASE", "neo4j")
-        )
-        logger.debug(f"Neo4j config loaded: {neo4j.uri}")
-        
-        clickhouse = ClickHouseConfig(
-            host=get_required("CLICKHOUSE_HOST"),
-            port=int(get_optional("CLICKHOUSE_PORT", "8443")),
-            database=get_optional("CLICKHOUSE_DATABASE", "default"),
-            username=get_optional("CLICKHOUSE_USERNAME", "default"),
-            password=get_required("CLICKHOUSE_PASSWORD")
-        )
-        logger.debug(f"ClickHouse config loaded: {clickhouse.host}:{clickhouse.port}")
-        
-        featherless = FeatherlessConfig(
-            api_key=get_optional("FEATHERLESS_API_KEY", ""),
-            base_url=get_optional("FEATHERLESS_BASE_URL", "https://api.featherless.ai/v1"),
-            model_primary=get_optional("FEATHERLESS_MODEL_PRIMARY", "Qwen/Qwen2.5-72B-Instruct"),
-            model_code=get_optional("FEATHERLESS_MODEL_CODE", "deepseek-ai/DeepSeek-Coder-V2-Instruct"),
-            model_fast=get_optional("FEATHERLESS_MODEL_FAST", "NousResearch/Hermes-3-Llama-3.1-8B"),
-            model_analytics=get_optional("FEATHERLESS_MODEL_ANALYTICS", "meta-llama/Llama-3.1-70B-Instruct")
-        )
-        logger.debug(f"Featherless config loaded: {featherless.base_url}")
-        
-        openai = OpenAIConfig(
-            api_key=get_optional("OPENAI_API_KEY", ""),
-            base_url=get_optional("OPENAI_BASE_URL", "https://api.openai.com/v1"),
-            model=get_optional("OPENAI_MODEL", "gpt-4o-mini")
-        )
-        logger.debug(f"OpenAI config loaded: model={openai.model}")
-        
-        # Determine LLM provider (default to openai)
-        llm_provider = get_optional("LLM_PROVIDER", "openai")
-        
-        config = Config(
-            postgres=postgres,
-            neo4j=neo4j,
-            clickhouse=clickhouse,
-            featherless=featherless,
-            openai=openai,
-            llm_provider=llm_provider,
-            debug=get_optional("DEBUG", "false").lower() == "true",
-            log_level=get_optional("LOG_LEVEL", "INFO")
-        )
-        
-        logger.info(f"✓ Configuration loaded successfully (LLM provider: {llm_provider})")
-        return config
-        
-    except ValueError as e:
-        logger.error(f"Configuration error: {e}")
-        raise
-
-
-# Singleton instance - initialized on first import
-_config: Optional[Config] = None
-
-
+    # Determine LLM provider (default to openai). Service sections are
+    # resolved lazily by Config on first access.
+    llm_provider = _optional("LLM_PROVIDER", "openai")
+    config = Config(
+        llm_provider=llm_provider,
+        debug=_optional("DEBUG", "false").lower() == "true",
+        log_level=_optional("LOG_LEVEL", DEFAULT_LOG_LEVEL)
+    )
+    # The logger module read LOG_LEVEL before .env was loaded
+    set_log_level(config.log_level)
+
+    logger.info(f"✓ Configuration loaded successfully (LLM provider: {llm_provider})")
+    return config
+
+
+@lru_cache(maxsize=1)
 def get_config() -> Config:
-    """Get the singleton configuration instance."""
-    global _config
-    if _config is None:
-        _config = load_config()
-    return _config
+    """
+    Get the singleton configuration instance.
+
+    Loaded on first call rather than at import, so importing a module never
+    reads .env or the environment.
+    """
+    return load_config()
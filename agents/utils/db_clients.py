@@ -3,11 +3,15 @@ Database Client Connections
 Provides singleton connection clients for all databases.
 """
 
-from typing import Optional, Any, List, Dict
+import threading
+from contextlib import contextmanager
+from typing import Optional, Any, Iterator, List, Dict
+import orjson
 import psycopg2
-from psycopg2.extras import RealDictCursor
+from psycopg2.extras import RealDictCursor, register_default_json, register_default_jsonb
 from neo4j import GraphDatabase
 import clickhouse_connect
+from clickhouse_connect.driver.httputil import get_pool_manager
 
 from agents.utils.logger import get_logger, PhaseLogger
 from agents.utils.config import get_config, Config
@@ -21,29 +25,51 @@ class PostgresClient:
     def __init__(self, config: Config):
         self.config = config.postgres
         self._connection: Optional[psycopg2.extensions.connection] = None
+        # Names PREPAREd on the current connection (server-side, per session)
+        self._prepared: set = set()
+        # The connection is shared by the server's executor threads; two first
+        # calls must not both PREPARE the same name (DuplicatePreparedStatement)
+        self._prepare_lock = threading.Lock()
         logger.debug(f"PostgresClient initialized for {self.config.host}")
     
+    def _connect(self) -> psycopg2.extensions.connection:
+        """Open a new connection with orjson json/jsonb decoding."""
+        conn = psycopg2.connect(
+            host=self.config.host,
+            port=self.config.port,
+            database=self.config.database,
+            user=self.config.user,
+            password=self.config.password
+        )
+        # Decode json/jsonb columns (json_agg results, metadata) with
+        # orjson rather than the stdlib parser psycopg2 uses by default
+        register_default_json(conn, loads=orjson.loads)
+        register_default_jsonb(conn, loads=orjson.loads)
+        return conn
+
     def _get_connection(self) -> psycopg2.extensions.connection:
         """Get or create a database connection."""
         if self._connection is None or self._connection.closed:
             logger.debug("Creating new PostgreSQL connection...")
-            self._connection = psycopg2.connect(
-                host=self.config.host,
-                port=self.config.port,
-                database=self.config.database,
-                user=self.config.user,
-                password=self.config.password
-            )
+            self._connection = self._connect()
+            # Each standalone statement commits on its own: no implicit BEGIN
+            # before reads, no separate COMMIT after writes, and no connection
+            # left idle-in-transaction between agent calls. Multi-statement
+            # work opts into a transaction via transaction().
+            self._connection.autocommit = True
+            self._prepared.clear()
             logger.info("✓ PostgreSQL connection established")
         return self._connection
     
-    def execute_query(self, query: str, params: tuple = None) -> List[Dict[str, Any]]:
+    def execute_query(self, query: str, params: tuple = None, max_rows: Optional[int] = None) -> List[Dict[str, Any]]:
         """
         Execute a SELECT query and return results as list of dicts.
         
         Args:
             query: SQL query string
             params: Optional query parameters
+            max_rows: Only convert the first N rows to dicts (for unbounded,
+                      e.g. LLM-generated, queries)
         
         Returns:
             List of row dictionaries
@@ -51,16 +77,50 @@ class PostgresClient:
         conn = self._get_connection()
         try:
             with conn.cursor(cursor_factory=RealDictCursor) as cur:
-                logger.debug(f"Executing query: {query[:100]}...")
+                logger.debug("Executing query: %.100s...", query)
                 cur.execute(query, params)
-                results = [dict(row) for row in cur.fetchall()]
-                logger.debug(f"Query returned {len(results)} rows")
+                fetched = cur.fetchall() if max_rows is None else cur.fetchmany(max_rows)
+                results = [dict(row) for row in fetched]
+                logger.debug("Query returned %d rows", len(results))
                 return results
         except Exception as e:
             logger.error(f"PostgreSQL query failed: {e}")
             conn.rollback()
             raise
     
+    def execute_prepared(self, name: str, statement: str, params: tuple = ()) -> List[Dict[str, Any]]:
+        """
+        Run a SELECT as a server-side prepared statement.
+
+        ``statement`` uses Postgres ``$1, $2, …`` placeholders. It is parsed and
+        planned once per connection (PREPARE on first use); later calls only
+        send ``EXECUTE name(...)`` with the values.
+
+        Returns:
+            List of row dictionaries
+        """
+        conn = self._get_connection()
+        try:
+            with conn.cursor(cursor_factory=RealDictCursor) as cur:
+                if name not in self._prepared:
+                    with self._prepare_lock:
+                        if name not in self._prepared:
+                            logger.debug("Preparing statement %s", name)
+                            cur.execute(f"PREPARE {name} AS {statement}")
+                            self._prepared.add(name)
+                if params:
+                    placeholders = ", ".join(["%s"] * len(params))
+                    cur.execute(f"EXECUTE {name} ({placeholders})", params)
+                else:
+                    cur.execute(f"EXECUTE {name}")
+                results = [dict(row) for row in cur.fetchall()]
+                logger.debug("Prepared %s returned %d rows", name, len(results))
+                return results
+        except Exception as e:
+            logger.error(f"PostgreSQL prepared query {name} failed: {e}")
+            conn.rollback()
+            raise
+
     def execute_write(self, query: str, params: tuple = None) -> int:
         """
         Execute an INSERT/UPDATE/DELETE query.
@@ -71,17 +131,39 @@ class PostgresClient:
         conn = self._get_connection()
         try:
             with conn.cursor() as cur:
-                logger.debug(f"Executing write: {query[:100]}...")
+                logger.debug("Executing write: %.100s...", query)
                 cur.execute(query, params)
                 affected = cur.rowcount
                 conn.commit()
-                logger.debug(f"Write affected {affected} rows")
+                logger.debug("Write affected %d rows", affected)
                 return affected
         except Exception as e:
             logger.error(f"PostgreSQL write failed: {e}")
             conn.rollback()
             raise
     
+    @contextmanager
+    def transaction(self) -> Iterator[psycopg2.extensions.cursor]:
+        """
+        Cursor for a multi-statement write (staging tables, bulk loads).
+        Commits when the block exits cleanly, rolls back on error.
+
+        Runs on its own short-lived connection: the shared one stays in
+        autocommit, so queries from other threads never join or abort
+        this transaction.
+        """
+        conn = self._connect()
+        try:
+            with conn.cursor() as cur:
+                yield cur
+            conn.commit()
+        except Exception as e:
+            logger.error(f"PostgreSQL transaction failed: {e}")
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
     def close(self):
         """Close the database connection."""
         if self._connection and not self._connection.closed:
@@ -131,15 +213,40 @@ class Neo4jClient:
         driver = self._get_driver()
         try:
             with driver.session(database=self.config.database) as session:
-                logger.debug(f"Executing Cypher: {query[:100]}...")
+                logger.debug("Executing Cypher: %.100s...", query)
                 result = session.run(query, params or {})
                 records = [dict(record) for record in result]
-                logger.debug(f"Cypher returned {len(records)} records")
+                logger.debug("Cypher returned %d records", len(records))
                 return records
         except Exception as e:
             logger.error(f"Neo4j query failed: {e}")
             raise
     
+    def execute_many(self, queries: Dict[str, str], params: dict = None) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Run several read queries over one session (one pooled connection
+        checkout) instead of a session per query.
+
+        Args:
+            queries: Mapping of name → Cypher query string
+            params: Parameters shared by all queries
+
+        Returns:
+            Mapping of name → result records. A query that fails is logged
+            and maps to an empty list, so one bad query doesn't sink the rest.
+        """
+        driver = self._get_driver()
+        results: Dict[str, List[Dict[str, Any]]] = {}
+        with driver.session(database=self.config.database) as session:
+            for name, query in queries.items():
+                try:
+                    logger.debug("Executing Cypher (%s): %.100s...", name, query)
+                    results[name] = [dict(record) for record in session.run(query, params or {})]
+                except Exception as e:
+                    logger.debug("Cypher '%s' failed: %s", name, e)
+                    results[name] = []
+        return results
+
     def close(self):
         """Close the Neo4j driver."""
         if self._driver:
@@ -156,6 +263,12 @@ class Neo4jClient:
             return False
 
 
+# Keep-alive HTTPS connections to ClickHouse. Pipeline branches and the API's
+# executor threads query concurrently, so the pool is sized for that fan-out
+# instead of clickhouse_connect's shared default pool.
+_CLICKHOUSE_POOL_SIZE = 16
+
+
 class ClickHouseClient:
     """ClickHouse client for time-series queries."""
     
@@ -174,25 +287,42 @@ class ClickHouseClient:
                 username=self.config.username,
                 password=self.config.password,
                 database=self.config.database,
-                secure=True  # Use HTTPS
+                secure=True,  # Use HTTPS
+                # No shared session: lets pipeline branches query concurrently
+                autogenerate_session_id=False,
+                pool_mgr=get_pool_manager(maxsize=_CLICKHOUSE_POOL_SIZE, block=False),
             )
             logger.info("✓ ClickHouse client created")
         return self._client
     
-    def execute_query(self, query: str, params: dict = None) -> List[Dict[str, Any]]:
+    def execute_query(self, query: str, params: dict = None, max_rows: Optional[int] = None) -> List[Dict[str, Any]]:
         """
         Execute a ClickHouse query and return results.
         
         Args:
             query: SQL query string
             params: Optional query parameters
+            max_rows: Stop reading after N rows. The result is streamed in
+                      blocks and the response closed early, so a large result
+                      is never fully materialised.
         
         Returns:
             List of result rows as dictionaries
         """
         client = self._get_client()
         try:
-            logger.debug(f"Executing ClickHouse query: {query[:100]}...")
+            logger.debug("Executing ClickHouse query: %.100s...", query)
+            if max_rows is not None:
+                rows = []
+                with client.query_row_block_stream(query, parameters=params or {}) as stream:
+                    columns = stream.source.column_names
+                    for block in stream:
+                        rows.extend(dict(zip(columns, row)) for row in block[:max_rows - len(rows)])
+                        if len(rows) >= max_rows:
+                            break
+                logger.debug("ClickHouse streamed %d rows", len(rows))
+                return rows
+
             result = client.query(query, parameters=params or {})
             
             # Convert to list of dicts
@@ -201,11 +331,43 @@ class ClickHouseClient:
             for row in result.result_rows:
                 rows.append(dict(zip(columns, row)))
             
-            logger.debug(f"ClickHouse returned {len(rows)} rows")
+            logger.debug("ClickHouse returned %d rows", len(rows))
             return rows
         except Exception as e:
             logger.error(f"ClickHouse query failed: {e}")
             raise
+
+    def execute_command(self, statement: str, params: dict = None) -> Any:
+        """Execute a ClickHouse statement that returns no rows (DDL, INSERT ... SELECT)."""
+        client = self._get_client()
+        try:
+            logger.debug("Executing ClickHouse command: %.100s...", statement)
+            return client.command(statement, parameters=params or {})
+        except Exception as e:
+            logger.error(f"ClickHouse command failed: {e}")
+            raise
+
+    def execute_columns(self, query: str, params: dict = None) -> Dict[str, list]:
+        """
+        Execute a ClickHouse query and return results column-oriented.
+
+        Maps each column name to the list of its values, exactly as the
+        driver decodes the native blocks, with no per-row dict built.
+        Lets callers convert or transform a whole column at once.
+        """
+        client = self._get_client()
+        try:
+            logger.debug("Executing ClickHouse columnar query: %.100s...", query)
+            result = client.query(query, parameters=params or {}, column_oriented=True)
+            columns = {
+                name: list(values)
+                for name, values in zip(result.column_names, result.result_columns)
+            }
+            logger.debug("ClickHouse returned %d rows (%d columns)", result.row_count, len(columns))
+            return columns
+        except Exception as e:
+            logger.error(f"ClickHouse query failed: {e}")
+            raise
     
     def close(self):
         """Close the ClickHouse client."""
@@ -343,21 +505,18 @@ def diagnose_clickhouse() -> Dict[str, Any]:
     try:
         ch = get_clickhouse_client()
         
-        # Check tables
-        tables = ch.execute_query("SHOW TABLES")
+        # Table list and row counts in one statement: MergeTree tables keep
+        # an exact total_rows in system.tables, so no per-table count() scans
+        tables = ch.execute_query(
+            "SELECT name, total_rows FROM system.tables "
+            "WHERE database = currentDatabase() ORDER BY name"
+        )
         diagnostics['tables'] = [t['name'] for t in tables]
-        
-        # Count rows in key tables
-        counts = {}
-        for t in diagnostics['tables']:
-            if t in ['events', 'dora_daily_metrics']:
-                try:
-                    c = ch.execute_query(f"SELECT count() as c FROM {t}")
-                    counts[t] = c[0]['c']
-                except Exception as e:
-                    counts[t] = f"Error: {str(e)}"
-        
-        diagnostics['row_counts'] = counts
+        diagnostics['row_counts'] = {
+            t['name']: t['total_rows']
+            for t in tables
+            if t['name'] in ('events', 'dora_daily_metrics')
+        }
         
     except Exception as e:
         diagnostics['error'] = str(e)
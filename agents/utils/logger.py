@@ -11,16 +11,16 @@ Provides:
 
 import logging
 import logging.handlers
-import json
 import os
 import sys
-import uuid
+import secrets
 import time
 import threading
-from datetime import datetime
 from typing import Optional, Any
 from contextlib import contextmanager
 
+import orjson
+
 
 # ============================================================================
 # Correlation ID management (thread-local)
@@ -33,14 +33,14 @@ def get_correlation_id() -> str:
     """Get the current correlation ID for this thread, or create one."""
     cid = getattr(_local, "correlation_id", None)
     if cid is None:
-        cid = str(uuid.uuid4())[:8]
+        cid = secrets.token_hex(4)
         _local.correlation_id = cid
     return cid
 
 
 def set_correlation_id(cid: Optional[str] = None) -> str:
     """Set a new correlation ID for this request/thread. Returns the ID."""
-    cid = cid or str(uuid.uuid4())[:8]
+    cid = cid or secrets.token_hex(4)
     _local.correlation_id = cid
     return cid
 
@@ -72,7 +72,8 @@ class ColoredConsoleFormatter(logging.Formatter):
         phase = getattr(record, "phase", "")
         cid = getattr(record, "correlation_id", "")
 
-        ts = datetime.now().strftime("%H:%M:%S.%f")[:-3]
+        # The record already carries its creation time; no second clock read
+        ts = f"{time.strftime('%H:%M:%S', time.localtime(record.created))}.{int(record.msecs):03d}"
 
         parts = [f"{color}[{ts}]", f"[{record.levelname:<7}]", f"[{component}]"]
         if cid:
@@ -90,7 +91,10 @@ class JSONFormatter(logging.Formatter):
 
     def format(self, record):
         log_entry = {
-            "timestamp": datetime.utcnow().isoformat() + "Z",
+            "timestamp": (
+                f"{time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(record.created))}"
+                f".{int(record.msecs):03d}Z"
+            ),
             "level": record.levelname,
             "component": getattr(record, "component", "SYSTEM"),
             "correlation_id": getattr(record, "correlation_id", ""),
@@ -102,7 +106,7 @@ class JSONFormatter(logging.Formatter):
         }
         if record.exc_info and record.exc_info[0]:
             log_entry["exception"] = self.formatException(record.exc_info)
-        return json.dumps(log_entry, default=str)
+        return orjson.dumps(log_entry, default=str).decode()
 
 
 # ============================================================================
@@ -131,6 +135,14 @@ _LOG_DIR = os.path.join(
 )
 _configured_root = False
 
+# Default level for component loggers, from LOG_LEVEL (applied again by
+# load_config() once .env is loaded). Set LOG_LEVEL=INFO in production so
+# per-call DEBUG records are dropped before any formatting happens.
+DEFAULT_LOG_LEVEL = "DEBUG"
+_log_level = getattr(logging, os.getenv("LOG_LEVEL", DEFAULT_LOG_LEVEL).upper(), logging.DEBUG)
+# Loggers created without an explicit level follow set_log_level()
+_default_level_loggers: set[str] = set()
+
 
 def _ensure_root_configured():
     """Configure the root logger once with file + console handlers."""
@@ -176,20 +188,23 @@ def _ensure_root_configured():
         logging.getLogger(noisy).setLevel(logging.WARNING)
 
 
-def get_logger(name: str, component: Optional[str] = None, level: int = logging.DEBUG):
+def get_logger(name: str, component: Optional[str] = None, level: Optional[int] = None):
     """
     Get a configured logger for a specific component.
 
     Args:
         name:      Logger name (typically __name__)
         component: Component tag (e.g. 'POSTGRES_TOOLS', 'SUPERVISOR')
-        level:     Logging level
+        level:     Logging level (defaults to LOG_LEVEL, see ``set_log_level``)
     Returns:
         ComponentAdapter that injects component/phase into every record.
     """
     _ensure_root_configured()
 
     logger = logging.getLogger(name)
+    if level is None:
+        _default_level_loggers.add(name)
+        level = _log_level
     logger.setLevel(level)
 
     class ComponentAdapter(logging.LoggerAdapter):
@@ -202,6 +217,14 @@ def get_logger(name: str, component: Optional[str] = None, level: int = logging.
     return ComponentAdapter(logger, {"component": component or name.upper()})
 
 
+def set_log_level(level: str) -> None:
+    """Apply a level name (e.g. 'INFO') to every component logger on the default level."""
+    global _log_level
+    _log_level = getattr(logging, level.upper(), _log_level)
+    for name in _default_level_loggers:
+        logging.getLogger(name).setLevel(_log_level)
+
+
 # ============================================================================
 # Structured Logging Helpers
 # ============================================================================
@@ -209,6 +232,8 @@ def get_logger(name: str, component: Optional[str] = None, level: int = logging.
 class PhaseLogger:
     """Context manager that logs phase start/end with elapsed time."""
 
+    __slots__ = ("logger", "phase_name", "start_time")
+
     def __init__(self, logger, phase_name: str):
         self.logger = logger
         self.phase_name = phase_name
@@ -240,7 +265,7 @@ def log_tool_call(logger, tool_name: str, args: dict, result: Any = None, error:
         logger.error(f"🔧 TOOL FAILED | {tool_name} | args={_trunc(args)} | error={error}")
     elif result is not None:
         logger.info(f"🔧 TOOL OK     | {tool_name} | args={_trunc(args)} | result={_trunc(result)}")
-    else:
+    elif logger.isEnabledFor(logging.DEBUG):
         logger.debug(f"🔧 TOOL CALL   | {tool_name} | args={_trunc(args)}")
 
 
@@ -260,6 +285,9 @@ def log_llm_call(
     latency_ms: float = None,
 ):
     """Log an LLM API call with prompt/response previews and optional metrics."""
+    # DEBUG-only: skip building the previews when nothing would record them
+    if not logger.isEnabledFor(logging.DEBUG):
+        return
     parts = [f"🧠 LLM | model={model}", f"prompt={_trunc(prompt_preview, 120)}"]
     if response_preview:
         parts.append(f"response={_trunc(response_preview, 150)}")
@@ -274,6 +302,8 @@ def log_llm_call(
 
 def log_embedding_call(logger, model: str, text_preview: str, dimension: int, latency_ms: float = None):
     """Log an embedding generation call."""
+    if not logger.isEnabledFor(logging.DEBUG):
+        return
     parts = [f"📐 EMBED | model={model} | dim={dimension} | text={_trunc(text_preview, 80)}"]
     if latency_ms is not None:
         parts.append(f"lat={latency_ms:.0f}ms")
@@ -282,6 +312,8 @@ def log_embedding_call(logger, model: str, text_preview: str, dimension: int, la
 
 def log_db_query(logger, db_type: str, query_preview: str, row_count: int = None, latency_ms: float = None):
     """Log a database query execution."""
+    if not logger.isEnabledFor(logging.DEBUG):
+        return
     parts = [f"💾 DB | {db_type} | {_trunc(query_preview, 100)}"]
     if row_count is not None:
         parts.append(f"rows={row_count}")
@@ -10,7 +10,8 @@ Provides:
 
 from __future__ import annotations
 
-import uuid
+import threading
+import secrets
 from datetime import datetime, timezone
 from typing import Optional
 
@@ -66,6 +67,8 @@ class ConversationMemory:
         self._checkpointer = MemorySaver()
         self._threads: dict[str, ThreadInfo] = {}
         self._max_threads = max_threads
+        self._locks: dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
         logger.info("ConversationMemory initialised (in-memory checkpointer)")
 
     # ── Checkpointer access ─────────────────────────────────
@@ -79,7 +82,7 @@ class ConversationMemory:
 
     def new_thread(self, title: str = "") -> str:
         """Create a new conversation thread and return its ID."""
-        thread_id = uuid.uuid4().hex[:12]
+        thread_id = secrets.token_hex(6)
         info = ThreadInfo(thread_id, title=title or f"Thread {len(self._threads) + 1}")
         self._threads[thread_id] = info
         logger.info(f"New thread: {thread_id} — '{info.title}'")
@@ -96,7 +99,7 @@ class ConversationMemory:
         if thread_id not in self._threads:
             # Auto-create thread if referenced but not tracked
             self._threads[thread_id] = ThreadInfo(thread_id, title="Auto-created")
-            logger.debug(f"Auto-created thread: {thread_id}")
+            logger.debug("Auto-created thread: %s", thread_id)
 
         return {"configurable": {"thread_id": thread_id}}
 
@@ -106,6 +109,19 @@ class ConversationMemory:
         if info:
             info.touch(message_count)
 
+    def thread_lock(self, thread_id: str) -> threading.Lock:
+        """
+        Lock that serialises every turn on one thread, sync or async.
+
+        A plain (non-owner) lock: async turns acquire it from a worker thread
+        and release it on the event loop, which an RLock would reject.
+        """
+        with self._locks_guard:
+            lock = self._locks.get(thread_id)
+            if lock is None:
+                lock = self._locks[thread_id] = threading.Lock()
+            return lock
+
     def list_threads(self) -> list[dict]:
         """List all threads sorted by last_active (newest first)."""
         return [
@@ -121,6 +137,7 @@ class ConversationMemory:
         """Remove a thread."""
         if thread_id in self._threads:
             del self._threads[thread_id]
+            self._drop_lock(thread_id)
             logger.info(f"Deleted thread: {thread_id}")
             return True
         return False
@@ -141,11 +158,21 @@ class ConversationMemory:
         non_system = [m for m in messages if getattr(m, "type", "") != "system"]
 
         trimmed = system_msgs + non_system[-(max_messages - len(system_msgs)):]
-        logger.debug(f"Trimmed messages: {len(messages)} → {len(trimmed)}")
+        logger.debug("Trimmed messages: %d → %d", len(messages), len(trimmed))
         return trimmed
 
     # ── Internal helpers ────────────────────────────────────
 
+    def _drop_lock(self, thread_id: str):
+        """
+        Forget a thread's lock, unless a turn currently holds it: dropping a
+        held lock would let the next turn get a fresh one and overlap it.
+        """
+        with self._locks_guard:
+            lock = self._locks.get(thread_id)
+            if lock is not None and not lock.locked():
+                del self._locks[thread_id]
+
     def _evict_old_threads(self):
         """Remove oldest threads if over the limit."""
         if len(self._threads) <= self._max_threads:
@@ -156,7 +183,8 @@ class ConversationMemory:
         to_remove = len(self._threads) - self._max_threads
         for t in sorted_threads[:to_remove]:
             del self._threads[t.thread_id]
-            logger.debug(f"Evicted old thread: {t.thread_id}")
+            self._drop_lock(t.thread_id)
+            logger.debug("Evicted old thread: %s", t.thread_id)
 
 
 # ============================================================================
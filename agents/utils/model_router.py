@@ -18,11 +18,14 @@ from __future__ import annotations
 import re
 from dataclasses import dataclass
 from enum import Enum
+from functools import lru_cache
 from typing import Optional
 
+import httpx
+import tiktoken
 from langchain_openai import ChatOpenAI
 
-from agents.utils.config import get_config
+from agents.utils.config import Config, get_config
 from agents.utils.logger import get_logger
 
 logger = get_logger(__name__, "MODEL_ROUTER")
@@ -45,7 +48,7 @@ class TaskType(str, Enum):
 # Model Selection Result
 # ============================================================================
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ModelSelection:
     """Result of model routing — which model to use and why."""
     model_name: str        # Full model identifier (e.g. "Qwen/Qwen2.5-72B-Instruct")
@@ -134,16 +137,20 @@ _CLASSIFICATION_RULES: list[tuple[TaskType, re.Pattern, str]] = [
 ]
 
 
+@lru_cache(maxsize=256)
 def classify_task(query: str) -> tuple[TaskType, str]:
     """
     Classify a user query into a TaskType.
 
+    The supervisor re-plans after every specialist turn with the same user
+    query, so results are memoised rather than re-running the rule regexes.
+
     Returns:
         (task_type, reason) tuple.
     """
     for task_type, pattern, reason in _CLASSIFICATION_RULES:
         if pattern.search(query):
-            logger.debug(f"Task classified as {task_type.value}: {reason}")
+            logger.debug("Task classified as %s: %s", task_type.value, reason)
             return task_type, reason
 
     logger.debug("No specific pattern matched — defaulting to GENERAL")
@@ -154,58 +161,61 @@ def classify_task(query: str) -> tuple[TaskType, str]:
 # Model Selector
 # ============================================================================
 
-def select_model(task_type: TaskType) -> ModelSelection:
-    """
-    Given a task type, return the optimal model configuration.
-    Uses OpenAI (gpt-4o-mini) if configured, otherwise falls back to Featherless.
-    """
-    config = get_config()
-    
-    # If using OpenAI, return the same model for all task types
-    if config.llm_provider == "openai":
-        model = config.openai.model
-        return ModelSelection(
-            model_name=model,
-            display_name=model,
-            task_type=task_type,
-            reason=f"Using OpenAI {model} (unified model for all tasks)",
-            temperature=0.1,
-        )
-    
-    # Otherwise use Featherless with task-specific routing
-    f = config.featherless
-
-    routing_table: dict[TaskType, ModelSelection] = {
+@lru_cache(maxsize=4)
+def _build_routing_table(
+    provider: str,
+    openai_model: str,
+    model_code: str,
+    model_analytics: str,
+    model_primary: str,
+    model_fast: str,
+) -> dict[TaskType, ModelSelection]:
+    """Build (once per configuration) the task-type → ModelSelection table."""
+    if provider == "openai":
+        # Same model for all task types
+        return {
+            task_type: ModelSelection(
+                model_name=openai_model,
+                display_name=openai_model,
+                task_type=task_type,
+                reason=f"Using OpenAI {openai_model} (unified model for all tasks)",
+                temperature=0.1,
+            )
+            for task_type in TaskType
+        }
+
+    # Featherless with task-specific routing
+    return {
         TaskType.CODE_ANALYSIS: ModelSelection(
-            model_name=f.model_code,
+            model_name=model_code,
             display_name="DeepSeek Coder V2",
             task_type=TaskType.CODE_ANALYSIS,
             reason="Code-specialised model for SQL/Cypher generation and technical analysis",
             temperature=0.0,
         ),
         TaskType.ANALYTICS: ModelSelection(
-            model_name=f.model_analytics,
+            model_name=model_analytics,
             display_name="Llama 3.1 70B",
             task_type=TaskType.ANALYTICS,
             reason="Strong long-context analytics model for metrics and trend analysis",
             temperature=0.1,
         ),
         TaskType.PLANNING: ModelSelection(
-            model_name=f.model_primary,
+            model_name=model_primary,
             display_name="Qwen 72B",
             task_type=TaskType.PLANNING,
             reason="Top-tier reasoning model for complex planning and resource optimisation",
             temperature=0.1,
         ),
         TaskType.QUICK_LOOKUP: ModelSelection(
-            model_name=f.model_fast,
+            model_name=model_fast,
             display_name="Hermes 3 8B",
             task_type=TaskType.QUICK_LOOKUP,
             reason="Lightweight model for fast profile lookups and simple queries",
             temperature=0.1,
         ),
         TaskType.GENERAL: ModelSelection(
-            model_name=f.model_primary,
+            model_name=model_primary,
             display_name="Qwen 72B",
             task_type=TaskType.GENERAL,
             reason="General-purpose model for unclassified queries",
@@ -213,11 +223,35 @@ def select_model(task_type: TaskType) -> ModelSelection:
         ),
     }
 
-    selection = routing_table[task_type]
-    logger.info(
-        f"Model selected: {selection.display_name} "
-        f"(task={task_type.value}, reason={selection.reason})"
+
+@lru_cache(maxsize=4)
+def _routing_table_for(config: Config) -> dict[TaskType, ModelSelection]:
+    """
+    The routing table for one Config instance, keyed by the instance itself.
+
+    Config is a per-process singleton, so model names are read from it once
+    instead of being gathered and re-hashed on every select_model() call.
+    """
+    f = config.featherless
+    return _build_routing_table(
+        config.llm_provider, config.openai.model,
+        f.model_code, f.model_analytics, f.model_primary, f.model_fast,
     )
+
+
+def select_model(task_type: TaskType) -> ModelSelection:
+    """
+    Given a task type, return the optimal model configuration.
+    Uses OpenAI (gpt-4o-mini) if configured, otherwise falls back to Featherless.
+    """
+    config = get_config()
+    selection = _routing_table_for(config)[task_type]
+
+    if config.llm_provider != "openai":
+        logger.info(
+            f"Model selected: {selection.display_name} "
+            f"(task={task_type.value}, reason={selection.reason})"
+        )
     return selection
 
 
@@ -235,16 +269,51 @@ def route_query(query: str) -> ModelSelection:
 # LLM Factory
 # ============================================================================
 
+# One keep-alive connection pool shared by every LLM client, so model/temperature
+# variants reuse warm TCP+TLS connections to the provider.
+_HTTP_LIMITS = httpx.Limits(max_connections=64, max_keepalive_connections=32)
+_HTTP_TIMEOUT = httpx.Timeout(120.0, connect=10.0)
+_HTTP_CLIENT = httpx.Client(limits=_HTTP_LIMITS, timeout=_HTTP_TIMEOUT)
+_HTTP_ASYNC_CLIENT = httpx.AsyncClient(limits=_HTTP_LIMITS, timeout=_HTTP_TIMEOUT)
+
+
+@lru_cache(maxsize=16)
+def _build_llm(
+    model: str,
+    api_key: str,
+    base_url: Optional[str],
+    temperature: float,
+) -> ChatOpenAI:
+    """
+    Construct (once) a ChatOpenAI client for a given model/endpoint/temperature.
+
+    ChatOpenAI holds its own HTTP client and is safe to share across graph
+    nodes and threads, so callers asking for the same configuration reuse
+    a single instance instead of paying client construction on every node.
+    """
+    logger.info(f"Created LLM client: {model} (temperature={temperature})")
+    return ChatOpenAI(
+        model=model,
+        api_key=api_key,
+        base_url=base_url,
+        temperature=temperature,
+        http_client=_HTTP_CLIENT,
+        http_async_client=_HTTP_ASYNC_CLIENT,
+    )
+
+
 def get_llm(
     model_override: Optional[str] = None,
     temperature: float = 0.1,
     task_type: Optional[TaskType] = None,
 ) -> ChatOpenAI:
     """
-    Create a ChatOpenAI instance based on the configured provider.
+    Return a ChatOpenAI instance based on the configured provider.
     
     Uses OpenAI (gpt-4o-mini) if configured, otherwise falls back to Featherless.
     This is the main entry point for agents to get an LLM instance.
+    Instances are cached per (model, endpoint, temperature), so repeated
+    calls are cheap.
     
     Args:
         model_override: Specific model to use (overrides routing)
@@ -255,42 +324,46 @@ def get_llm(
         Configured ChatOpenAI instance
     """
     config = get_config()
-    
-    if config.llm_provider == "openai":
-        # Use OpenAI
-        if not config.openai.api_key:
-            error_msg = "LLM_PROVIDER is 'openai' but OPENAI_API_KEY is not set. Please set the API key in .env or switch LLM_PROVIDER to 'featherless'."
-            logger.error(error_msg)
-            # functionality relies on this, so we should raise to avoid silent failure
-            raise ValueError(error_msg)
-
-        model = model_override or config.openai.model
-        llm = ChatOpenAI(
-            model=model,
-            api_key=config.openai.api_key,
-            base_url=config.openai.base_url if config.openai.base_url != "https://api.openai.com/v1" else None,
-            temperature=temperature,
-        )
-        logger.info(f"Created OpenAI LLM: {model}")
-        return llm
+    # Provider credentials are resolved once per Config (llm_endpoint raises
+    # there if the OpenAI key is missing)
+    api_key, base_url = config.llm_endpoint
+
+    if model_override:
+        model = model_override
+    elif config.llm_provider != "openai" and task_type:
+        # Featherless: per-task model routing
+        selection = select_model(task_type)
+        model = selection.model_name
+        temperature = selection.temperature
     else:
-        # Use Featherless
-        f = config.featherless
-        
-        if model_override:
-            model = model_override
-        elif task_type:
-            selection = select_model(task_type)
-            model = selection.model_name
-            temperature = selection.temperature
-        else:
-            model = f.model_primary
-            
-        llm = ChatOpenAI(
-            model=model,
-            api_key=f.api_key,
-            base_url=f.base_url,
-            temperature=temperature,
-        )
-        logger.info(f"Created Featherless LLM: {model}")
-        return llm
+        model = config.primary_model
+
+    return _build_llm(model, api_key, base_url, temperature)
+
+
+# ============================================================================
+# Token Counting
+# ============================================================================
+
+@lru_cache(maxsize=8)
+def _get_encoding(model: str) -> tiktoken.Encoding:
+    """Resolve (once per model) the tiktoken encoding, defaulting to cl100k_base."""
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        # Featherless / open-weight models are unknown to tiktoken
+        return tiktoken.get_encoding("cl100k_base")
+
+
+def count_tokens(text: str, model: Optional[str] = None) -> int:
+    """
+    Count the tokens in ``text`` for ``model`` (defaults to the configured model).
+
+    Exact for OpenAI models; a close approximation for Featherless models,
+    which use cl100k_base here.
+    """
+    if not text:
+        return 0
+    if model is None:
+        model = get_config().primary_model
+    return len(_get_encoding(model).encode(text))
@@ -0,0 +1,238 @@
+"""
+Prompt Serialization
+Compact, token-efficient rendering of query results for LLM prompts.
+
+Implements a small TOON-style (Token-Oriented Object Notation) encoder:
+  - dicts are rendered as ``key: value`` lines, nesting by indentation
+  - uniform lists of flat dicts become tables — field names are declared
+    once in the header and each row is pipe-delimited
+  - lists of scalars are rendered inline
+
+For free-form payloads, ``to_json`` gives compact (no-indent) JSON via orjson,
+and ``prune_payload`` cuts raw blobs (event metadata) down before they reach a prompt.
+``parse_json_object`` / ``parse_json_array`` pull JSON back out of LLM replies.
+
+Example:
+    >>> print(to_toon({"dora": [{"project_id": "api", "deployments": 4},
+    ...                         {"project_id": "web", "deployments": 2}]}))
+    dora[2]{project_id|deployments}:
+      api|4
+      web|2
+"""
+
+from __future__ import annotations
+
+import json
+from typing import Any, Iterator
+
+import orjson
+
+# Two-line legend to put in front of TOON data in a prompt.
+TOON_LEGEND = (
+    "Data is in TOON format: `name[N]{a|b|c}:` declares a table of N rows with columns a, b, c;\n"
+    "each indented line below it is one pipe-delimited row. `name[N]: x,y` is an inline list."
+)
+
+_INDENT = "  "
+
+
+def _is_scalar(value: Any) -> bool:
+    return not isinstance(value, (dict, list, tuple))
+
+
+def _scalar(value: Any) -> str:
+    """Render a single scalar value, quoting only when needed."""
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, float):
+        return f"{value:.4f}".rstrip("0").rstrip(".") or "0"
+    s = str(value)
+    if not s or any(c in s for c in "|,\n\"") or s != s.strip():
+        return '"' + s.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") + '"'
+    return s
+
+
+def _is_table(items: list) -> bool:
+    """True if every item is a dict of scalars sharing the same keys."""
+    if not items or not all(isinstance(i, dict) for i in items):
+        return False
+    keys = list(items[0])
+    return bool(keys) and all(
+        list(i) == keys and all(_is_scalar(v) for v in i.values())
+        for i in items
+    )
+
+
+def _encode(key: str, value: Any, depth: int, out: list[str]) -> None:
+    pad = _INDENT * depth
+    label = key
+
+    if isinstance(value, dict):
+        if not value:
+            out.append(f"{pad}{label}: {{}}" if label else f"{pad}{{}}")
+            return
+        if label:
+            out.append(f"{pad}{label}:")
+            depth += 1
+        for k, v in value.items():
+            _encode(str(k), v, depth, out)
+        return
+
+    if isinstance(value, (list, tuple)):
+        items = list(value)
+        if _is_table(items):
+            fields = list(items[0])
+            out.append(f"{pad}{label}[{len(items)}]{{{'|'.join(fields)}}}:")
+            row_pad = pad + _INDENT
+            for item in items:
+                out.append(row_pad + "|".join(_scalar(item[f]) for f in fields))
+        elif all(_is_scalar(i) for i in items):
+            out.append(f"{pad}{label}[{len(items)}]: " + ",".join(_scalar(i) for i in items))
+        else:
+            out.append(f"{pad}{label}[{len(items)}]:")
+            for item in items:
+                if _is_scalar(item):
+                    out.append(f"{pad}{_INDENT}- {_scalar(item)}")
+                else:
+                    out.append(f"{pad}{_INDENT}-")
+                    _encode("", item, depth + 2, out)
+        return
+
+    out.append(f"{pad}{label}: {_scalar(value)}" if label else f"{pad}{_scalar(value)}")
+
+
+def to_toon(obj: Any) -> str:
+    """
+    Serialise a JSON-like object (dicts, lists, scalars) to TOON text.
+
+    Non-JSON scalars (datetimes, Decimals, UUIDs) are rendered with ``str()``.
+    """
+    out: list[str] = []
+    _encode("", obj, 0, out)
+    return "\n".join(out)
+
+
+def to_json(obj: Any) -> str:
+    """
+    Compact JSON for prompts: no indentation or separator padding.
+
+    Non-JSON values (Decimals, UUIDs, …) fall back to ``str()``;
+    datetimes are emitted natively as ISO-8601.
+    """
+    return orjson.dumps(obj, default=str, option=orjson.OPT_NON_STR_KEYS).decode()
+
+
+def prune_payload(
+    obj: Any,
+    max_items: int = 10,
+    max_str: int = 200,
+    max_depth: int = 3,
+    _depth: int = 0,
+) -> Any:
+    """
+    Shrink a raw JSON-like payload for an LLM prompt.
+
+    Lists keep their first ``max_items`` entries plus a ``"… +N more"`` marker,
+    strings are cut to ``max_str`` characters, and containers nested deeper
+    than ``max_depth`` collapse to a size summary. Scalars pass through.
+    """
+    if isinstance(obj, str):
+        return obj if len(obj) <= max_str else obj[:max_str] + "…"
+    if isinstance(obj, dict):
+        if _depth >= max_depth:
+            return f"{{…{len(obj)} keys}}"
+        return {
+            k: prune_payload(v, max_items, max_str, max_depth, _depth + 1)
+            for k, v in obj.items()
+        }
+    if isinstance(obj, (list, tuple)):
+        if _depth >= max_depth:
+            return f"[…{len(obj)} items]"
+        head = [
+            prune_payload(v, max_items, max_str, max_depth, _depth + 1)
+            for v in obj[:max_items]
+        ]
+        if len(obj) > max_items:
+            head.append(f"… +{len(obj) - max_items} more")
+        return head
+    return obj
+
+
+def parse_metadata(value: Any) -> Any:
+    """Decode a JSON-string metadata column (if needed) and prune it for prompts."""
+    if isinstance(value, (bytes, bytearray)):
+        # Text for the prompt, never a b'...' repr
+        value = bytes(value).decode("utf-8", errors="replace")
+    if isinstance(value, str):
+        # Only a JSON object/array is worth handing to the decoder; empty or
+        # plain-text metadata is pruned as a string
+        if value.lstrip()[:1] not in ("{", "["):
+            return prune_payload(value)
+        try:
+            value = orjson.loads(value)
+        except orjson.JSONDecodeError:
+            return prune_payload(value)
+    return prune_payload(value)
+
+
+# ============================================================================
+# Parsing JSON out of LLM output
+# ============================================================================
+
+_DECODER = json.JSONDecoder()
+
+
+def _iter_json_values(text: str, opener: str) -> Iterator[Any]:
+    """
+    Yield each top-level JSON value embedded in ``text`` (prose, code fences,
+    several concatenated objects) using ``raw_decode``. Candidates that fail to
+    decode are skipped; braces inside string literals are handled by the decoder.
+
+    ``opener`` is a single character (``{`` or ``[``), located with
+    ``str.find`` — a plain substring scan, no regex engine involved.
+    """
+    pos = text.find(opener)
+    while pos != -1:
+        try:
+            value, end = _DECODER.raw_decode(text, pos)
+        except json.JSONDecodeError:
+            pos = text.find(opener, pos + 1)
+            continue
+        yield value
+        pos = text.find(opener, end)
+
+
+def _loads_whole(text: str) -> Any:
+    """
+    Fast path for replies that are nothing but JSON: one ``orjson.loads`` of
+    the stripped text. Returns ``None`` when the text has prose or fences
+    around the value, leaving the scan to ``_iter_json_values``.
+    """
+    try:
+        return orjson.loads(text.strip())
+    except orjson.JSONDecodeError:
+        return None
+
+
+def parse_json_object(text: str) -> dict:
+    """Return the first JSON object found in LLM output, or ``{}``."""
+    value = _loads_whole(text)
+    if isinstance(value, dict):
+        return value
+    for value in _iter_json_values(text, "{"):
+        if isinstance(value, dict):
+            return value
+    return {}
+
+
+def parse_json_array(text: str) -> list:
+    """Return the first JSON array found in LLM output, or ``[]``."""
+    value = _loads_whole(text)
+    if isinstance(value, list):
+        return value
+    for value in _iter_json_values(text, "["):
+        if isinstance(value, list):
+            return value
+    return []
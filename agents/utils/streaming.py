@@ -15,7 +15,6 @@ Feature 4.2 — Streaming Responses with Tool Call Visualization
 from __future__ import annotations
 
 import time
-import json
 import queue
 import threading
 from dataclasses import dataclass, field, asdict
@@ -33,6 +32,7 @@ from typing import (
 )
 
 from agents.utils.logger import get_logger
+from agents.utils.serialization import to_json
 
 logger = get_logger(__name__, "STREAMING")
 
@@ -72,7 +72,7 @@ class StreamEventType(str, Enum):
     STATUS = "status"
 
 
-@dataclass
+@dataclass(slots=True)
 class StreamEvent:
     """
     A single streaming event emitted to the consumer.
@@ -195,8 +195,8 @@ class StreamEvent:
 
     def to_sse(self) -> str:
         """Format as a Server-Sent Event string (for HTTP streaming)."""
-        payload = json.dumps(self.to_dict(), default=str)
-        return f"event: {self.event_type.value}\ndata: {payload}\n\n"
+        body = self.to_dict()
+        return f"event: {body['event']}\ndata: {to_json(body)}\n\n"
 
 
 # ============================================================================
@@ -292,8 +292,19 @@ def render_stream_to_console(
     for event in events:
         etype = event.event_type
 
+        # ── Token (by far the most frequent event, so tested first) ──
+        if etype == StreamEventType.TOKEN:
+            text = (event.data or {}).get("text", "") if show_tokens else ""
+            if text:
+                if not response_started:
+                    print(f"\n{'─' * 50}")
+                    print(f"\n{_BOLD}🤖 Response:{_RESET}\n")
+                    response_started = True
+                print(text, end="", flush=True)
+                full_response.append(text)
+
         # ── Stream start ─────────────────
-        if etype == StreamEventType.STREAM_START:
+        elif etype == StreamEventType.STREAM_START:
             pass  # silent
 
         # ── Model selection ──────────────
@@ -347,17 +358,6 @@ def render_stream_to_console(
                 print(f"  {_GREEN}  ✓ {tool}{_RESET} {_DIM}({elapsed:.1f}s){_RESET}")
             active_tools.pop(tool, None)
 
-        # ── Token ────────────────────────
-        elif etype == StreamEventType.TOKEN and show_tokens:
-            text = (event.data or {}).get("text", "")
-            if text:
-                if not response_started:
-                    print(f"\n{'─' * 50}")
-                    print(f"\n{_BOLD}🤖 Response:{_RESET}\n")
-                    response_started = True
-                print(text, end="", flush=True)
-                full_response.append(text)
-
         # ── Complete response (fallback) ─
         elif etype == StreamEventType.RESPONSE:
             content = (event.data or {}).get("content", "")
@@ -0,0 +1,137 @@
+"""
+Create Postgres Indexes
+=======================
+Creates the indexes behind the agents' hot lookups. Each index is built
+with CREATE INDEX CONCURRENTLY IF NOT EXISTS, so the script is safe to re-run
+and doesn't block writes on a live database. An INVALID index left behind by
+an earlier failed concurrent build is dropped and rebuilt, and duplicate
+embeddings rows are removed before the unique index is built. Exits non-zero
+if the unique index is still missing at the end.
+
+  - UNIQUE embeddings (source_id, embedding_type)
+                                             ON CONFLICT target for seed upserts,
+                                             Graph RAG profile join
+  - embeddings HNSW (vector_cosine_ops)      ORDER BY embedding <=> query
+  - project_assignments (employee_id / project_id), employees (team_id)
+  - employees (email), projects (jira_project_key)   exact-match tool lookups
+  - lower(name) / lower(email) expression indexes    case-insensitive exact
+                                                     match tried before ILIKE
+  - pg_trgm GIN on the name columns searched with ILIKE '%x%'
+    (a b-tree index can never serve a leading-wildcard pattern)
+
+Usage:
+    python scripts/create_indexes.py
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agents.utils.db_clients import get_postgres_client
+
+EXTENSIONS = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+]
+
+# Backs the ON CONFLICT (source_id, embedding_type) upsert in seed_embeddings.py.
+UNIQUE_INDEXES = [
+    ("ux_embeddings_source",
+     "ON embeddings (source_id, embedding_type)"),
+]
+
+INDEXES = [
+    ("ix_embeddings_hnsw",
+     "ON embeddings USING hnsw (embedding vector_cosine_ops)"),
+    ("ix_project_assignments_employee",
+     "ON project_assignments (employee_id)"),
+    ("ix_project_assignments_project",
+     "ON project_assignments (project_id)"),
+    ("ix_employees_team",
+     "ON employees (team_id)"),
+    ("ix_employees_email",
+     "ON employees (email)"),
+    ("ix_projects_jira",
+     "ON projects (jira_project_key)"),
+    ("ix_employees_lower_name",
+     "ON employees (lower(name))"),
+    ("ix_employees_lower_email",
+     "ON employees (lower(email))"),
+    ("ix_projects_lower_name",
+     "ON projects (lower(name))"),
+    ("ix_employees_email_trgm",
+     "ON employees USING gin (email gin_trgm_ops)"),
+    ("ix_employees_name_trgm",
+     "ON employees USING gin (name gin_trgm_ops)"),
+    ("ix_projects_name_trgm",
+     "ON projects USING gin (name gin_trgm_ops)"),
+    ("ix_teams_name_trgm",
+     "ON teams USING gin (name gin_trgm_ops)"),
+]
+
+
+# Keep the most recently updated row of each (source_id, embedding_type) pair
+DEDUPE_EMBEDDINGS = """
+    DELETE FROM embeddings WHERE ctid IN (
+        SELECT ctid FROM (
+            SELECT ctid, row_number() OVER (
+                PARTITION BY source_id, embedding_type
+                ORDER BY updated_at DESC NULLS LAST, created_at DESC NULLS LAST
+            ) AS rn
+            FROM embeddings
+        ) ranked
+        WHERE rn > 1
+    )
+"""
+
+
+def _index_valid(pg, name: str):
+    """True/False for an existing index's pg_index.indisvalid, None if it doesn't exist."""
+    rows = pg.execute_query(
+        "SELECT i.indisvalid FROM pg_index i "
+        "JOIN pg_class c ON c.oid = i.indexrelid WHERE c.relname = %s",
+        (name,),
+    )
+    return rows[0]["indisvalid"] if rows else None
+
+
+def main():
+    pg = get_postgres_client()
+    # The client runs standalone statements in autocommit mode, which
+    # CREATE INDEX CONCURRENTLY requires (it cannot run in a transaction block)
+    for stmt in EXTENSIONS:
+        pg.execute_write(stmt)
+    statements = (
+        [("UNIQUE INDEX", name, spec) for name, spec in UNIQUE_INDEXES]
+        + [("INDEX", name, spec) for name, spec in INDEXES]
+    )
+    for kind, name, spec in statements:
+        try:
+            valid = _index_valid(pg, name)
+            if valid:
+                print(f"  – {name} (exists)")
+                continue
+            if valid is False:
+                # A failed concurrent build leaves an INVALID index that
+                # IF NOT EXISTS would otherwise skip forever
+                pg.execute_write(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+                print(f"  ↺ {name}: dropped invalid index")
+            if name == "ux_embeddings_source":
+                removed = pg.execute_write(DEDUPE_EMBEDDINGS)
+                if removed:
+                    print(f"  ↺ removed {removed} duplicate embeddings rows")
+            pg.execute_write(f"CREATE {kind} CONCURRENTLY IF NOT EXISTS {name} {spec}")
+            print(f"  ✓ {name}")
+        except Exception as e:
+            print(f"  ✗ {name}: {e}")
+    pg.execute_write("ANALYZE embeddings, project_assignments, employees, projects, teams")
+
+    missing = [name for name, _ in UNIQUE_INDEXES if not _index_valid(pg, name)]
+    if missing:
+        sys.exit(f"❌ Unique index missing or invalid: {', '.join(missing)} "
+                 f"(seed_embeddings upserts will fail)")
+    print("✅ Indexes ready")
+
+
+if __name__ == "__main__":
+    main()
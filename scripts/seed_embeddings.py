@@ -6,31 +6,51 @@ Pinecone Inference API with llama-text-embed-v2 (1024-dim).
 
 For each employee and project, it:
   1. Builds a rich text description from the structured data.
-  2. Generates a 1024-dim embedding vector via Pinecone's hosted inference.
-  3. UPSERTs into the embeddings table (updates if source_id + embedding_type exists).
+  2. Generates 1024-dim embedding vectors via Pinecone's hosted inference
+     (employees and projects share one batched pass).
+  3. Bulk-UPSERTs both sets into the embeddings table in one transaction
+     (updates if source_id + embedding_type exists).
+
+Rows whose title, content and metadata are unchanged since the last run are
+skipped before embedding, so a re-run only pays for what actually changed.
+Pass ``--force`` to re-embed everything.
 
 Requires:
   PINECONE_API_KEY environment variable set.
 
 Usage:
     cd /Users/rahul/Desktop/Datathon
-    .venv/bin/python scripts/seed_embeddings.py
+    .venv/bin/python scripts/seed_embeddings.py [--force]
 """
 
+import hashlib
+import io
 import sys
 import uuid
-import json
-from datetime import datetime, timezone
+from dataclasses import dataclass, field
+
+import orjson
 
 sys.path.insert(0, "/Users/rahul/Desktop/Datathon")
 
 from agents.utils.db_clients import get_postgres_client
 from agents.tools.embedding_tools import get_embedding, get_embeddings, format_vector_for_pg, EMBEDDING_DIM
 from agents.utils.logger import get_logger
+from agents.utils.serialization import to_json
 
 logger = get_logger(__name__, "SEED_EMBEDDINGS")
 
 
+def _assignment_text(a: dict) -> str:
+    """One project assignment as ``Name (role) 50%``."""
+    text = a["name"]
+    if a.get("project_role"):
+        text += f" ({a['project_role']})"
+    if a.get("allocated_percent"):
+        text += f" {a['allocated_percent']}%"
+    return text
+
+
 def build_employee_text(emp: dict) -> str:
     """Build a rich text description of an employee for embedding."""
     parts = [f"{emp['full_name']}"]
@@ -49,25 +69,10 @@ def build_employee_text(emp: dict) -> str:
     if emp.get("employment_type"):
         parts.append(f"Employment: {emp['employment_type']}")
 
-    # Get project assignments for this employee
-    pg = get_postgres_client()
-    assignments = pg.execute_query(
-        "SELECT p.name, pa.role AS project_role, pa.allocated_percent "
-        "FROM project_assignments pa "
-        "JOIN projects p ON pa.project_id = p.id "
-        "WHERE pa.employee_id = %s",
-        (emp["id"],),
-    )
+    # Project assignments come pre-joined by collect_employee_rows()
+    assignments = emp.get("assignments") or []
     if assignments:
-        proj_strs = []
-        for a in assignments:
-            proj_str = a["name"]
-            if a.get("project_role"):
-                proj_str += f" ({a['project_role']})"
-            if a.get("allocated_percent"):
-                proj_str += f" {a['allocated_percent']}%"
-            proj_strs.append(proj_str)
-        parts.append(f"Projects: {', '.join(proj_strs)}")
+        parts.append("Projects: " + ", ".join(_assignment_text(a) for a in assignments))
 
     return ". ".join(parts)
 
@@ -88,155 +93,242 @@ def build_project_text(proj: dict) -> str:
     if proj.get("target_date"):
         parts.append(f"Target: {proj['target_date']}")
 
-    # Get assigned team members
-    pg = get_postgres_client()
-    members = pg.execute_query(
-        "SELECT e.full_name, e.title, pa.role AS project_role "
-        "FROM project_assignments pa "
-        "JOIN employees e ON pa.employee_id = e.id "
-        "WHERE pa.project_id = %s",
-        (proj["id"],),
-    )
+    # Assigned team members come pre-joined by collect_project_rows()
+    members = proj.get("members") or []
     if members:
-        member_strs = [f"{m['full_name']} ({m.get('project_role', 'contributor')})" for m in members]
-        parts.append(f"Team: {', '.join(member_strs)}")
+        parts.append("Team: " + ", ".join(
+            f"{m['full_name']} ({m.get('project_role', 'contributor')})" for m in members
+        ))
 
     return ". ".join(parts)
 
 
-def upsert_embedding(
-    pg, source_id: str, source_table: str, embedding_type: str,
-    title: str, content: str, embedding_vec: list, metadata: dict,
-):
-    """Insert or update an embedding row."""
-    vec_str = format_vector_for_pg(embedding_vec)
-    now = datetime.now(timezone.utc)
-    metadata_json = json.dumps(metadata)
-
-    # Check if an embedding already exists for this source
-    existing = pg.execute_query(
-        "SELECT id FROM embeddings WHERE source_id = %s AND embedding_type = %s",
-        (source_id, embedding_type),
-    )
-
-    if existing:
-        # Update existing
-        pg.execute_write(
-            f"UPDATE embeddings SET embedding = '{vec_str}'::vector, "
-            "title = %s, content = %s, metadata = %s::jsonb, updated_at = %s "
-            "WHERE source_id = %s AND embedding_type = %s",
-            (title, content, metadata_json, now, source_id, embedding_type),
+@dataclass
+class EmbeddingBatch:
+    """
+    Embedding rows for one source table, stored column-wise.
+
+    ``embedding_type`` and ``source_table`` are shared by every row; the lists
+    are parallel (index ``i`` across them is one row). ``contents`` feeds
+    ``get_embeddings`` as-is and ``embeddings`` is filled by ``embed_batches``.
+    """
+    embedding_type: str
+    source_table: str
+    source_ids: list[str] = field(default_factory=list)
+    titles: list[str] = field(default_factory=list)
+    contents: list[str] = field(default_factory=list)
+    metadatas: list[dict] = field(default_factory=list)
+    embeddings: list[list[float]] = field(default_factory=list)
+
+    def append(self, source_id: str, title: str, content: str, metadata: dict) -> None:
+        self.source_ids.append(source_id)
+        self.titles.append(title)
+        self.contents.append(content)
+        self.metadatas.append(metadata)
+
+    def __len__(self) -> int:
+        return len(self.source_ids)
+
+    def keep(self, indices: list[int]) -> None:
+        """Retain only the rows at ``indices`` (before embedding)."""
+        self.source_ids = [self.source_ids[i] for i in indices]
+        self.titles = [self.titles[i] for i in indices]
+        self.contents = [self.contents[i] for i in indices]
+        self.metadatas = [self.metadatas[i] for i in indices]
+
+
+_EMBEDDING_COLUMNS = (
+    "id, embedding_type, source_id, source_table, "
+    "embedding, title, content, metadata, created_at, updated_at"
+)
+
+_COPY_COLUMNS = "id, embedding_type, source_id, source_table, embedding, title, content, metadata"
+
+# COPY text-format escapes: backslash first, then the field/row separators
+_COPY_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+
+
+def _copy_buffer(rows: list[tuple]) -> io.StringIO:
+    """Render rows as a COPY text-format stream (tab-separated, ``\\N`` for NULL)."""
+    buf = io.StringIO()
+    for row in rows:
+        buf.write("\t".join(
+            "\\N" if v is None else str(v).translate(_COPY_ESCAPES) for v in row
+        ))
+        buf.write("\n")
+    buf.seek(0)
+    return buf
+
+
+def upsert_embeddings(pg, *batches: EmbeddingBatch) -> dict[str, tuple[int, int]]:
+    """
+    Insert or update every batch's embeddings in one transaction.
+
+    All rows are streamed into a temp staging table with one ``COPY FROM
+    STDIN``, then applied with a single ``INSERT ... ON CONFLICT (source_id,
+    embedding_type) DO UPDATE`` (needs the unique index from
+    scripts/create_indexes.py).
+
+    Returns:
+        ``{embedding_type: (inserted, updated)}`` for each batch
+    """
+    values = [
+        (
+            str(uuid.uuid4()), batch.embedding_type, source_id, batch.source_table,
+            format_vector_for_pg(vec), title, content, to_json(metadata),
+        )
+        for batch in batches
+        for source_id, vec, title, content, metadata in zip(
+            batch.source_ids, batch.embeddings, batch.titles,
+            batch.contents, batch.metadatas,
+        )
+    ]
+    counts = {batch.embedding_type: [0, 0] for batch in batches}
+
+    with pg.transaction() as cur:
+        # Embeddings are re-derivable, so don't wait on the WAL flush at commit
+        cur.execute("SET LOCAL synchronous_commit = off")
+        cur.execute(
+            "CREATE TEMP TABLE embeddings_stage "
+            "(LIKE embeddings INCLUDING DEFAULTS) ON COMMIT DROP"
         )
-        return "updated"
-    else:
-        # Insert new
-        new_id = str(uuid.uuid4())
-        pg.execute_write(
-            f"INSERT INTO embeddings (id, embedding_type, source_id, source_table, "
-            f"embedding, title, content, metadata, created_at, updated_at) "
-            f"VALUES (%s, %s, %s, %s, '{vec_str}'::vector, %s, %s, %s::jsonb, %s, %s)",
-            (new_id, embedding_type, source_id, source_table,
-             title, content, metadata_json, now, now),
+        # created_at / updated_at are left to the column defaults (now())
+        cur.copy_expert(
+            f"COPY embeddings_stage ({_COPY_COLUMNS}) FROM STDIN",
+            _copy_buffer(values),
         )
-        return "inserted"
+        # xmax = 0 only on freshly inserted rows, which splits the counts
+        cur.execute(
+            f"INSERT INTO embeddings ({_EMBEDDING_COLUMNS}) "
+            f"SELECT {_EMBEDDING_COLUMNS} FROM embeddings_stage "
+            "ON CONFLICT (source_id, embedding_type) DO UPDATE SET "
+            "embedding = EXCLUDED.embedding, title = EXCLUDED.title, "
+            "content = EXCLUDED.content, metadata = EXCLUDED.metadata, "
+            "updated_at = EXCLUDED.updated_at "
+            "RETURNING embedding_type, (xmax = 0) AS inserted"
+        )
+        for embedding_type, inserted in cur.fetchall():
+            counts[embedding_type][0 if inserted else 1] += 1
 
+    return {t: (ins, upd) for t, (ins, upd) in counts.items()}
 
-def seed_employee_embeddings():
-    """Generate and upsert embeddings for all active employees."""
-    pg = get_postgres_client()
+
+def collect_employee_rows(pg) -> EmbeddingBatch:
+    """Build embedding rows (without vectors) for all active employees."""
+    # One query: each employee row carries its project assignments as a JSON array
     employees = pg.execute_query(
-        "SELECT e.*, t.name AS team_name "
+        "SELECT e.*, t.name AS team_name, "
+        "  COALESCE(("
+        "    SELECT json_agg(json_build_object("
+        "      'name', p.name, 'project_role', pa.role, 'allocated_percent', pa.allocated_percent))"
+        "    FROM project_assignments pa JOIN projects p ON pa.project_id = p.id"
+        "    WHERE pa.employee_id = e.id"
+        "  ), '[]'::json) AS assignments "
         "FROM employees e LEFT JOIN teams t ON e.team_id = t.id "
         "WHERE e.active = true "
         "ORDER BY e.full_name"
     )
-    logger.info(f"Generating embeddings for {len(employees)} employees...")
+    logger.info(f"Building texts for {len(employees)} employees...")
 
-    texts = []
-    emp_list = []
+    batch = EmbeddingBatch(embedding_type="developer_profile", source_table="employees")
     for emp in employees:
-        emp_dict = dict(emp)
-        text = build_employee_text(emp_dict)
-        texts.append(text)
-        emp_list.append(emp_dict)
-        logger.debug(f"  {emp_dict['full_name']}: {text[:80]}...")
-
-    # Batch embed
-    vectors = get_embeddings(texts)
-    logger.info(f"Generated {len(vectors)} employee embeddings (dim={len(vectors[0])})")
-
-    # Upsert
-    inserted, updated = 0, 0
-    for emp, text, vec in zip(emp_list, texts, vectors):
-        metadata = {
-            "role": emp.get("role") or emp.get("title"),
-            "team": emp.get("team_name"),
-            "email": emp.get("email"),
-        }
-        action = upsert_embedding(
-            pg,
-            source_id=str(emp["id"]),
-            source_table="employees",
-            embedding_type="developer_profile",
-            title=f"{emp['full_name']} - Developer Profile",
-            content=text,
-            embedding_vec=vec,
-            metadata=metadata,
+        text = build_employee_text(emp)
+        logger.debug(f"  {emp['full_name']}: {text[:80]}...")
+        batch.append(
+            str(emp["id"]),
+            f"{emp['full_name']} - Developer Profile",
+            text,
+            {
+                "role": emp.get("role") or emp.get("title"),
+                "team": emp.get("team_name"),
+                "email": emp.get("email"),
+            },
         )
-        if action == "inserted":
-            inserted += 1
-        else:
-            updated += 1
-
-    logger.info(f"Employee embeddings: {inserted} inserted, {updated} updated")
-    return inserted, updated
-
-
-def seed_project_embeddings():
-    """Generate and upsert embeddings for all projects."""
-    pg = get_postgres_client()
-    projects = pg.execute_query("SELECT * FROM projects ORDER BY name")
-    logger.info(f"Generating embeddings for {len(projects)} projects...")
+    return batch
+
+
+def collect_project_rows(pg) -> EmbeddingBatch:
+    """Build embedding rows (without vectors) for all projects."""
+    # One query: each project row carries its assigned members as a JSON array
+    projects = pg.execute_query(
+        "SELECT p.*, "
+        "  COALESCE(("
+        "    SELECT json_agg(json_build_object("
+        "      'full_name', e.full_name, 'title', e.title, 'project_role', pa.role))"
+        "    FROM project_assignments pa JOIN employees e ON pa.employee_id = e.id"
+        "    WHERE pa.project_id = p.id"
+        "  ), '[]'::json) AS members "
+        "FROM projects p ORDER BY p.name"
+    )
+    logger.info(f"Building texts for {len(projects)} projects...")
 
-    texts = []
-    proj_list = []
+    batch = EmbeddingBatch(embedding_type="project_doc", source_table="projects")
     for proj in projects:
-        proj_dict = dict(proj)
-        text = build_project_text(proj_dict)
-        texts.append(text)
-        proj_list.append(proj_dict)
-        logger.debug(f"  {proj_dict['name']}: {text[:80]}...")
-
-    # Batch embed
-    vectors = get_embeddings(texts)
-    logger.info(f"Generated {len(vectors)} project embeddings (dim={len(vectors[0])})")
-
-    # Upsert
-    inserted, updated = 0, 0
-    for proj, text, vec in zip(proj_list, texts, vectors):
-        metadata = {
-            "status": proj.get("status"),
-            "priority": proj.get("priority"),
-            "jira_key": proj.get("jira_project_key"),
-            "github_repo": proj.get("github_repo"),
-        }
-        action = upsert_embedding(
-            pg,
-            source_id=str(proj["id"]),
-            source_table="projects",
-            embedding_type="project_doc",
-            title=f"{proj['name']} - Project Overview",
-            content=text,
-            embedding_vec=vec,
-            metadata=metadata,
+        text = build_project_text(proj)
+        logger.debug(f"  {proj['name']}: {text[:80]}...")
+        batch.append(
+            str(proj["id"]),
+            f"{proj['name']} - Project Overview",
+            text,
+            {
+                "status": proj.get("status"),
+                "priority": proj.get("priority"),
+                "jira_key": proj.get("jira_project_key"),
+                "github_repo": proj.get("github_repo"),
+            },
         )
-        if action == "inserted":
-            inserted += 1
-        else:
-            updated += 1
-
-    logger.info(f"Project embeddings: {inserted} inserted, {updated} updated")
-    return inserted, updated
+    return batch
+
+
+def _row_digest(title: str, content: str, metadata) -> str:
+    """md5 over everything the upsert writes besides the vector."""
+    if isinstance(metadata, (str, bytes)):
+        metadata = orjson.loads(metadata) if metadata else {}
+    # jsonb stores keys in its own order, so hash them sorted
+    metadata = dict(sorted((metadata or {}).items()))
+    payload = "\x00".join((title or "", content or "", to_json(metadata)))
+    return hashlib.md5(payload.encode()).hexdigest()
+
+
+def drop_unchanged(pg, batch: EmbeddingBatch) -> int:
+    """
+    Remove rows whose stored embedding row would be rewritten unchanged.
+
+    Compares a digest of each row's title, content and metadata with the
+    row already in the table for the same ``(source_id, embedding_type)``.
+    Returns the number of rows dropped.
+    """
+    stored = pg.execute_query(
+        "SELECT source_id, title, content, metadata FROM embeddings WHERE embedding_type = %s",
+        (batch.embedding_type,),
+    )
+    seen = {
+        (r["source_id"], _row_digest(r["title"], r["content"], r["metadata"]))
+        for r in stored
+    }
+    changed = [
+        i for i, row in enumerate(zip(batch.source_ids, batch.titles, batch.contents, batch.metadatas))
+        if (row[0], _row_digest(*row[1:])) not in seen
+    ]
+    skipped = len(batch) - len(changed)
+    batch.keep(changed)
+    return skipped
+
+
+def embed_batches(*batches: EmbeddingBatch) -> None:
+    """
+    Fill ``embeddings`` on every batch with one ``get_embeddings`` pass.
+
+    Employee and project texts share the same request batches, so a partly
+    filled employee batch is topped up with project texts rather than each
+    source paying for its own trailing request.
+    """
+    vectors = get_embeddings([text for b in batches for text in b.contents])
+    start = 0
+    for b in batches:
+        b.embeddings = vectors[start:start + len(b)]
+        start += len(b)
+    logger.info(f"Generated {len(vectors)} embeddings (dim={EMBEDDING_DIM})")
 
 
 def main():
@@ -244,18 +336,29 @@ def main():
     print("Embedding Seed Script - Pinecone llama-text-embed-v2 (1024-dim)")
     print("=" * 60)
 
-    emp_ins, emp_upd = seed_employee_embeddings()
-    proj_ins, proj_upd = seed_project_embeddings()
+    pg = get_postgres_client()
+    emp_batch = collect_employee_rows(pg)
+    proj_batch = collect_project_rows(pg)
+    skipped = 0
+    if "--force" not in sys.argv:
+        skipped = drop_unchanged(pg, emp_batch) + drop_unchanged(pg, proj_batch)
+        logger.info(f"Skipping {skipped} rows with unchanged text")
+    embed_batches(emp_batch, proj_batch)
+
+    counts = upsert_embeddings(pg, emp_batch, proj_batch)
+    emp_ins, emp_upd = counts[emp_batch.embedding_type]
+    proj_ins, proj_upd = counts[proj_batch.embedding_type]
+    logger.info(f"Employee embeddings: {emp_ins} inserted, {emp_upd} updated")
+    logger.info(f"Project embeddings: {proj_ins} inserted, {proj_upd} updated")
 
     print("\n" + "=" * 60)
     print("SUMMARY")
     print("=" * 60)
     print(f"Employees: {emp_ins} inserted, {emp_upd} updated")
     print(f"Projects:  {proj_ins} inserted, {proj_upd} updated")
-    print(f"Total:     {emp_ins + proj_ins} new, {emp_upd + proj_upd} updated")
+    print(f"Total:     {emp_ins + proj_ins} new, {emp_upd + proj_upd} updated, {skipped} unchanged")
 
     # Verify
-    pg = get_postgres_client()
     cnt = pg.execute_query("SELECT count(*) as cnt FROM embeddings")
     dims = pg.execute_query("SELECT vector_dims(embedding) as dims FROM embeddings LIMIT 1")
     print(f"\nVerification: {cnt[0]['cnt']} total embeddings, {dims[0]['dims']}-dim vectors")
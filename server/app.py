@@ -32,15 +32,16 @@ from __future__ import annotations
 import os
 import sys
 import time
-import json
 import uuid
+import queue
 import asyncio
+import threading
 from contextlib import asynccontextmanager
 from typing import Optional
 
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse, JSONResponse
+from fastapi.responses import StreamingResponse, ORJSONResponse
 from pydantic import BaseModel, Field
 
 # ── Ensure the project root is on sys.path ─────────────────
@@ -63,6 +64,24 @@ logger = get_logger(__name__, "API")
 _supervisor: Optional[SupervisorAgent] = None
 
 
+def _warm_pipelines() -> None:
+    """
+    Import and compile the sub-graphs the feature endpoints call directly, so
+    the first /api/prep, /api/anomalies or /api/experts request doesn't pay
+    for module import and graph compilation.
+    """
+    from agents.pipelines.prep_pipeline import get_prep_graph
+    from agents.pipelines.anomaly_pipeline import get_anomaly_graph
+    from agents.pipelines.graph_rag_pipeline import get_graph_rag_graph
+
+    for build in (get_prep_graph, get_anomaly_graph, get_graph_rag_graph):
+        try:
+            build()
+        except Exception as e:
+            # Not fatal — the endpoint will retry the build on first use
+            logger.warning(f"Pipeline warm-up failed for {build.__name__}: {e}")
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Startup: initialise the supervisor agent (loads models, compiles graph)."""
@@ -70,6 +89,9 @@ async def lifespan(app: FastAPI):
     logger.info("🚀 Initialising supervisor agent…")
     _supervisor = SupervisorAgent()
     _supervisor.initialize()
+    _warm_pipelines()
+    threading.Thread(target=_health_worker, name="health-probe", daemon=True).start()
+    _request_health_refresh()
     logger.info("✓ Supervisor ready — accepting requests")
     yield
     logger.info("Shutting down…")
@@ -91,6 +113,9 @@ app = FastAPI(
     version="1.0.0",
     description="AI-native engineering analytics — multi-agent, multi-model, streaming.",
     lifespan=lifespan,
+    # Render JSON bodies with orjson (one native pass, datetimes included)
+    # instead of the stdlib encoder
+    default_response_class=ORJSONResponse,
 )
 
 # ── CORS — allow all origins for hackathon / dev convenience ────
@@ -106,6 +131,9 @@ app.add_middleware(
 # ============================================================================
 # Request / Response Models
 # ============================================================================
+# Endpoints build their response with ``model_construct``: FastAPI validates
+# the returned object against ``response_model`` anyway, so validating it at
+# construction as well would check every payload twice.
 
 class ChatRequest(BaseModel):
     """Body for /api/chat and /api/chat/sync."""
@@ -257,8 +285,7 @@ _start_time = time.time()
 
 def _sse_line(event: StreamEvent) -> str:
     """Format a StreamEvent as an SSE text frame."""
-    payload = event.to_dict()
-    return f"event: {payload['event']}\ndata: {json.dumps(payload)}\n\n"
+    return event.to_sse()
 
 
 async def _stream_generator(supervisor: SupervisorAgent, message: str, thread_id: Optional[str]):
@@ -270,26 +297,37 @@ async def _stream_generator(supervisor: SupervisorAgent, message: str, thread_id
     loop = asyncio.get_event_loop()
 
     # We iterate the sync generator from a thread.  Each event is placed
-    # onto an asyncio.Queue so the SSE response can yield it.
+    # onto an asyncio.Queue so the SSE response can yield it.  put_nowait via
+    # call_soon_threadsafe: no coroutine + future per event.
     q: asyncio.Queue[Optional[StreamEvent]] = asyncio.Queue()
+    put = q.put_nowait
 
     def _run_sync():
         try:
             for event in supervisor.stream_query(message, thread_id=thread_id):
-                asyncio.run_coroutine_threadsafe(q.put(event), loop)
+                loop.call_soon_threadsafe(put, event)
         except Exception as exc:
             err = StreamEvent.error(message=str(exc))
-            asyncio.run_coroutine_threadsafe(q.put(err), loop)
+            loop.call_soon_threadsafe(put, err)
         finally:
-            asyncio.run_coroutine_threadsafe(q.put(None), loop)  # sentinel
+            loop.call_soon_threadsafe(put, None)  # sentinel
 
     loop.run_in_executor(None, _run_sync)
 
     while True:
+        # Wait for one event, then drain whatever else has already arrived
+        # and send it as a single chunk instead of one write per event.
+        frames = []
         event = await q.get()
+        while event is not None:
+            frames.append(_sse_line(event))
+            if q.empty():
+                break
+            event = q.get_nowait()
+        if frames:
+            yield "".join(frames)
         if event is None:
             break
-        yield _sse_line(event)
 
 
 # ============================================================================
@@ -340,19 +378,15 @@ async def chat_message(req: ChatRequest):
     Just sends a message and gets a text response.
     """
     supervisor = get_supervisor()
-    loop = asyncio.get_event_loop()
 
-    # Use the robust query() method that returns the final string directly
+    # aquery() runs the graph on the event loop and returns the final string
     try:
-        response_text = await loop.run_in_executor(
-            None, 
-            lambda: supervisor.query(req.message, thread_id=req.thread_id)
-        )
+        response_text = await supervisor.aquery(req.message, thread_id=req.thread_id)
     except Exception as e:
         logger.error(f"Chat error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-    return SimpleChatResponse(
+    return SimpleChatResponse.model_construct(
         response=response_text,
         thread_id=req.thread_id,
     )
@@ -365,7 +399,7 @@ async def create_thread(body: ThreadCreate):
     """Create a new conversation thread."""
     supervisor = get_supervisor()
     tid = supervisor.new_thread(title=body.title)
-    return ThreadInfo(thread_id=tid, title=body.title)
+    return ThreadInfo.model_construct(thread_id=tid, title=body.title)
 
 
 @app.get("/api/threads", response_model=list[ThreadInfo])
@@ -373,8 +407,11 @@ async def list_threads():
     """List all conversation threads."""
     supervisor = get_supervisor()
     raw = supervisor.list_threads()
+    # Thread records come from our own memory store, already well-typed, and
+    # response_model validates the list on the way out; constructing without
+    # validation avoids checking every thread twice.
     return [
-        ThreadInfo(
+        ThreadInfo.model_construct(
             thread_id=t.get("thread_id", ""),
             title=t.get("title", ""),
             created_at=t.get("created_at"),
@@ -432,7 +469,7 @@ async def prep_one_on_one(req: PrepRequest):
         raise HTTPException(status_code=404, detail=f"Developer '{req.developer_name}' not found")
 
     dev_info = result.get("developer_info", {})
-    return PrepResponse(
+    return PrepResponse.model_construct(
         status=status,
         developer_name=dev_info.get("full_name", req.developer_name),
         team=dev_info.get("team_name"),
@@ -474,7 +511,7 @@ async def detect_anomalies(req: AnomalyRequest):
     elapsed = time.time() - t0
     anomalies = result.get("anomalies", [])
 
-    return AnomalyResponse(
+    return AnomalyResponse.model_construct(
         status=result.get("status", "ok"),
         anomaly_count=len(anomalies),
         anomalies=anomalies,
@@ -519,7 +556,7 @@ async def find_experts(req: ExpertRequest):
                     })
 
             elapsed = time.time() - t0
-            return ExpertResponse(
+            return ExpertResponse.model_construct(
                 status="ok",
                 mode="quick",
                 query=req.query,
@@ -549,7 +586,7 @@ async def find_experts(req: ExpertRequest):
                 })
 
             elapsed = time.time() - t0
-            return ExpertResponse(
+            return ExpertResponse.model_construct(
                 status=result.get("status", "ok"),
                 mode="full",
                 query=req.query,
@@ -598,7 +635,7 @@ async def semantic_search_endpoint(req: SearchRequest):
     if results and len(results) == 1 and "error" in results[0]:
         raise HTTPException(status_code=500, detail=results[0]["error"])
 
-    return SearchResponse(
+    return SearchResponse.model_construct(
         status="ok",
         query=req.query,
         result_count=len(results),
@@ -644,7 +681,7 @@ async def get_dora_metrics(req: DoraRequest):
     if isinstance(result, dict) and "error" in result:
         raise HTTPException(status_code=500, detail=result["error"])
 
-    return DoraResponse(
+    return DoraResponse.model_construct(
         status="ok",
         days=req.days,
         summary=result.get("summary", {}),
@@ -680,7 +717,7 @@ async def generate_weekly_report_endpoint(req: ReportRequest):
         
     elapsed = time.time() - t0
     
-    return ReportResponse(
+    return ReportResponse.model_construct(
         overview=report.get("overview", ""),
         risk_assessment=report.get("risk_assessment", ""),
         people_pulse=report.get("people_pulse", ""),
@@ -710,7 +747,7 @@ async def project_risks_endpoint():
         raise HTTPException(status_code=500, detail=str(e))
         
     elapsed = time.time() - t0
-    return RiskResponse(projects=risks, elapsed_s=round(elapsed, 2))
+    return RiskResponse.model_construct(projects=risks, elapsed_s=round(elapsed, 2))
 
 
 @app.post("/api/reports/strategy", response_model=StrategyResponse)
@@ -734,16 +771,20 @@ async def strategic_recommendations_endpoint():
         raise HTTPException(status_code=500, detail=str(e))
         
     elapsed = time.time() - t0
-    return StrategyResponse(recommendations=recs, elapsed_s=round(elapsed, 2))
+    return StrategyResponse.model_construct(recommendations=recs, elapsed_s=round(elapsed, 2))
 
 
 # ── Health Check ────────────────────────────────────────────
 
-@app.get("/api/health", response_model=HealthStatus)
-async def health_check():
-    """
-    Reports system health including DB connectivity.
-    """
+# DB probes run on a background worker thread; requests only read the latest
+# snapshot and post a refresh request when it is older than the TTL.
+_HEALTH_TTL_S = float(os.environ.get("HEALTH_CACHE_TTL_S", 30))
+_health_refresh: queue.Queue = queue.Queue(maxsize=1)
+_health_cache: dict = {"checked_at": 0.0, "databases": {}}
+
+
+def _probe_databases() -> dict:
+    """Run a trivial query against each database and report per-DB status."""
     db_status = {}
 
     # PostgreSQL
@@ -773,8 +814,45 @@ async def health_check():
     except Exception as e:
         db_status["neo4j"] = f"error: {e}"
 
+    return db_status
+
+
+def _health_worker():
+    """Drain refresh requests (coalescing bursts) and re-probe the databases."""
+    while True:
+        _health_refresh.get()
+        while not _health_refresh.empty():
+            _health_refresh.get_nowait()
+        _health_cache["databases"] = _probe_databases()
+        _health_cache["checked_at"] = time.time()
+
+
+def _request_health_refresh():
+    """Ask the worker for a fresh probe; no-op if one is already queued."""
+    try:
+        _health_refresh.put_nowait(True)
+    except queue.Full:
+        pass
+
+
+def _get_db_status() -> dict:
+    """Return the latest DB status snapshot, scheduling a refresh if stale."""
+    if time.time() - _health_cache["checked_at"] >= _HEALTH_TTL_S:
+        _request_health_refresh()
+    return dict(_health_cache["databases"])
+
+
+@app.get("/api/health", response_model=HealthStatus)
+async def health_check():
+    """
+    Reports system health including DB connectivity.
+    """
+    db_status = _get_db_status()
+
     agent_ok = _supervisor is not None and _supervisor._initialized
-    overall = "healthy" if agent_ok and all(v == "ok" for v in db_status.values()) else "degraded"
+    # An empty snapshot means the first background probe hasn't finished yet
+    dbs_ok = bool(db_status) and all(v == "ok" for v in db_status.values())
+    overall = "healthy" if agent_ok and dbs_ok else "degraded"
 
     return HealthStatus(
         status=overall,
@@ -813,6 +891,8 @@ if __name__ == "__main__":
     )
 
 # ── Debug ──────────────────────────────────────────────────
+# The diagnostics make blocking round trips to every database, so they run in
+# the thread pool like the feature endpoints instead of stalling the event loop.
 
 @app.get("/api/debug/connections")
 async def debug_connections():
@@ -821,7 +901,8 @@ async def debug_connections():
     Returns detailed success/failure status for each database.
     """
     from agents.utils.db_clients import diagnose_connections
-    return diagnose_connections()
+    loop = asyncio.get_event_loop()
+    return await loop.run_in_executor(None, diagnose_connections)
 
 
 @app.get("/api/debug/tools")
@@ -830,7 +911,8 @@ async def debug_tools():
     Debug endpoint to check tool execution.
     """
     from agents.utils.db_clients import diagnose_tools
-    return diagnose_tools()
+    loop = asyncio.get_event_loop()
+    return await loop.run_in_executor(None, diagnose_tools)
 
 
 @app.get("/api/debug/schema")
@@ -839,7 +921,8 @@ async def debug_schema():
     Debug endpoint to inspect database schema.
     """
     from agents.utils.db_clients import diagnose_schema
-    return diagnose_schema()
+    loop = asyncio.get_event_loop()
+    return await loop.run_in_executor(None, diagnose_schema)
 
 
 @app.get("/api/debug/clickhouse")
@@ -848,4 +931,5 @@ async def debug_clickhouse():
     Debug endpoint to check ClickHouse tables and data.
     """
     from agents.utils.db_clients import diagnose_clickhouse
-    return diagnose_clickhouse()
+    loop = asyncio.get_event_loop()
+    return await loop.run_in_executor(None, diagnose_clickhouse)